@@ -1,80 +1,106 @@
 import threading
 import time
-import ctypes
-from datetime import datetime
-from pymodbus.client import ModbusTcpClient
+from datetime import time as dt_time
+from client_pool import DeviceClient
+from register_cache import CachedClient
 from py_rw_registers import readwrite_registers
 from py_r_register import read_registers
-from errors import error_codes
+from fault_events import FaultTracker, print_event
+from register_index import get_index
+from register_decoder import compile_blocks, read_values, decode_words, encode_words
+from composite_types import is_composite, parse as parse_composite
+from deadband import DeadbandFilter
+from adaptive_polling import AdaptiveInterval, budget_for, read_cost
+from transports import make_transport
+# scan_scheduler, energy_accounting, write_planner e sequence_runner são importados
+# apenas pelos comandos que os usam, para o arranque ser rápido
 
 # Configuration
 IP_ADDRESS = "192.168.31.238"
 PORT = 502
 UNIT_ID = 1
+# IP (Modbus TCP) ou URL de transporte, ex.: "rtu:///dev/ttyUSB0?baudrate=9600"
+# (RS485) ou "rtu+tcp://192.168.31.240:8899" (conversor série-Ethernet)
+TRANSPORT = IP_ADDRESS
 
 energy_thread = None
 energy_stop_event = None
+scan_scheduler = None
+sequence_thread = None
+sequence_cancel = None
+stats_engine = None
+timebase = None
+device_transport = None
+device_budget = None
+fault_tracker = None
+power_blocks = None
+# Os objetos partilhados acima são criados no primeiro uso (get_*), não na importação
+_shared_lock = threading.RLock()
+
+# Só se imprimem estados/falhas que mudaram (com repetição ao fim do heartbeat)
+STATUS_DEADBAND = DeadbandFilter()
+
+
+def get_transport():
+    """Return the transport of TRANSPORT/PORT, built on first use."""
+    global device_transport
+    with _shared_lock:
+        if device_transport is None:
+            device_transport = make_transport(TRANSPORT, PORT)
+    return device_transport
+
+
+def get_budget():
+    """Return the inverter's bandwidth budget, shared by the listener, the scan and reading_powers."""
+    global device_budget
+    with _shared_lock:
+        if device_budget is None:
+            device_budget = budget_for(get_transport())
+    return device_budget
+
+
+def get_fault_tracker():
+    """Return the fault tracker of the passive listener (prints every transition)."""
+    global fault_tracker
+    with _shared_lock:
+        if fault_tracker is None:
+            fault_tracker = FaultTracker()
+            fault_tracker.add_listener(print_event)
+    return fault_tracker
 
 
 def start_passive_listener(client):
     """Reads inverter and battery status every 5 seconds, prints only on fault/status events."""
 
     monitored_registers = {
-        'Time': {'address': 0x4000, 'scale': 0, 'size': 4, 'datatype': 'HEX'},
+        'Time': {'address': 0x4000, 'scale': 1, 'size': 4, 'datatype': 'DateTime'},
         'Battery_StatusDisp': {'address': 0x4027, 'scale': 1, 'size': 1, 'datatype': 'UInt16'},
         'Inverter_MPVMode': {'address': 0x4004, 'scale': 1, 'size': 1, 'datatype': 'UInt16'},
-        'HFaultMSG (Board/Slave)': {'address': 0x4005, 'scale': 1, 'size': 1, 'datatype': 'UInt32'},
-        'MFaultMSG (Master)': {'address': 0x4007, 'scale': 1, 'size': 1, 'datatype': 'UInt32'},
-        'MFaultMSG2 (Master)': {'address': 0x4009, 'scale': 1, 'size': 1, 'datatype': 'UInt32'},
+        'HFaultMSG (Board/Slave)': {'address': 0x4005, 'scale': 1, 'size': 2, 'datatype': 'UInt32'},
+        'MFaultMSG (Master)': {'address': 0x4007, 'scale': 1, 'size': 2, 'datatype': 'UInt32'},
+        'MFaultMSG2 (Master)': {'address': 0x4009, 'scale': 1, 'size': 2, 'datatype': 'UInt32'},
         'Error_Count (Inverter)': {'address': 0x400F, 'scale': 1, 'size': 1, 'datatype': 'UInt16'}
     }
+    # Relógio e estado lidos em blocos e já descodificados (datetime, inteiros)
+    transport = get_transport()
+    blocks = compile_blocks(monitored_registers, **transport.plan_kwargs())
 
     printed_time = False  # garante que o "Time" só é impresso uma vez
+    # 120 s em repouso; mais rápido quando o estado/falhas mudam, backoff quando o inversor falha
+    interval = AdaptiveInterval(120, min_factor=0.25, max_factor=2.5)
+    # Atividade = mudanças reais de estado (sem heartbeat, que republica valores iguais)
+    activity = DeadbandFilter(heartbeat=None)
+    cost = read_cost(blocks, transport)
 
     while True:
-        values = {}
         trigger_print = False  # só ativa quando condições críticas forem diferentes de 0
+        get_budget().acquire(cost)
 
-        # Lê todos os registos
-        for key, reg in monitored_registers.items():
-            try:
-                result = client.read_holding_registers(
-                    address=reg['address'], count=reg['size'])
-                if not result.isError():
-                    raw = result.registers
-                    value = 0
-
-                    if key != 'Time':
-                        for word in raw:
-                            value = (value << 16) + word
-                        values[key] = value
-                    else:
-                        # Junta todos os words em bytes
-                        bytes_list = []
-                        for word in raw:
-                            high = (word >> 8) & 0xFF
-                            low = word & 0xFF
-                            bytes_list.extend([high, low])
-
-                        year = (bytes_list[0] << 8) + bytes_list[1]
-                        month = bytes_list[2]
-                        day = bytes_list[3]
-                        hour = bytes_list[4]
-                        minute = bytes_list[5]
-                        second = bytes_list[6]
-
-                        try:
-                            timestamp = datetime(
-                                year, month, day, hour, minute, second)
-                            values[key] = timestamp
-                        except ValueError:
-                            values[key] = f"Invalid datetime -> {bytes_list}"
-
-                else:
-                    values[key] = f"⚠️ Error: {result}"
-
-            except Exception as e:
-                values[key] = f"❌ Exception: {e}"
+        values, errors = read_values(client, blocks, slave=UNIT_ID, fresh=True)
+        for address, error in errors.items():
+            print(f"⚠️ Error reading status block at {address}: {error}")
+        if values.get("Time", 0) is None:
+            values["Time"] = "Invalid datetime"
 
         # Decide se imprime
         if (values.get("Battery_StatusDisp", 0) != 0 or
@@ -84,8 +110,16 @@ def start_passive_listener(client):
                 values.get("Error_Count (Inverter)", 0) > 1):
             trigger_print = True
 
-        # Impressão condicional
-        if trigger_print:
+        # Falhas: só as transições de cada bit (raised/cleared)
+        fault_events = get_fault_tracker().update(values)
+        ok = not errors
+
+        # Impressão condicional, apenas dos valores que mudaram
+        status = {key: val for key, val in values.items() if key != "Time"}
+        changed = STATUS_DEADBAND.update(status)
+        seen = set(activity.last)
+        moved = [key for key in activity.update(status) if key in seen]
+        if trigger_print and changed:
             print("\n🔄 Reading inverter & battery status...\n")
 
             for key, val in values.items():
@@ -93,99 +127,98 @@ def start_passive_listener(client):
                     if not printed_time:  # imprime só a primeira vez
                         print(f"📖 {key}: {val}")
                         printed_time = True
-                else:
+                elif key in changed:
                     print(f"📖 {key}: {val}")
 
-                    if key.startswith("Error_Count") and isinstance(val, int) and val != 0:
-                        decode_fault_bits(val, error_codes["display"], key)
-                    elif key == "MFaultMSG (Master)" and isinstance(val, int) and val != 0:
-                        decode_fault_bits(val, error_codes["master_1"], key)
-                    elif key == "MFaultMSG2 (Master)" and isinstance(val, int) and val != 0:
-                        decode_fault_bits(val, error_codes["master_2"], key)
+        time.sleep(interval.next_interval(ok, active=bool(fault_events or moved)))
+
 
-        time.sleep(120)
+POWER_REGISTERS = {
+    'Meter_A_PowerWatt1 [W]': {'address': 41023, 'scale': 1, 'size': 1, 'datatype': 'Int16'},
+    'BatPower [W]': {'address': 16493, 'scale': 1, 'size': 1, 'datatype': 'Int16'},
+    'RGridPowerWatt [W]': {'address': 16437, 'scale': 1, 'size': 1, 'datatype': 'Int16'},
+    'PV1Power [W]': {'address': 16499, 'scale': 1, 'size': 1, 'datatype': 'UInt16'},
+    'PV2Power [W]': {'address': 16502, 'scale': 1, 'size': 1, 'datatype': 'UInt16'},
+    'BatEnergyPercent [%]': {'address': 16495, 'scale': 0.01, 'size': 1, 'datatype': 'UInt16'},
+    'BatVolt [V]': {'address': 16489, 'scale': 0.1, 'size': 1, 'datatype': 'UInt16'},
+    'BatCurr [A]': {'address': 16490, 'scale': 0.01, 'size': 1, 'datatype': 'Int16'},
+    'BatTempC [℃]': {'address': 16494, 'scale': 0.1, 'size': 1, 'datatype': 'Int16'},
+    'SinkTemp [℃]': {'address': 16400, 'scale': 0.1, 'size': 1, 'datatype': 'Int16'},
+    'AmbTemp [ºC]': {'address': 16401, 'scale': 0.1, 'size': 1, 'datatype': 'Int16'}
+}
+# Potências só são reimpressas quando variam pelo menos 10 W
+POWER_DEADBAND = DeadbandFilter(
+    absolute={key: 10 for key in POWER_REGISTERS if key.endswith("[W]")})
 
 
-def decode_fault_bits(bitfield, error_dict, label):
-    print(f"⚠️ Active faults in {label}:")
-    for bit in range(32):
-        if (bitfield >> bit) & 1:
-            description = error_dict.get(bit, f"Unknown error at bit {bit}")
-            print(f"  ⚠️ Bit {bit}: {description}")
+def get_power_blocks():
+    """Return the compiled blocks of POWER_REGISTERS for the configured transport."""
+    global power_blocks
+    with _shared_lock:
+        if power_blocks is None:
+            power_blocks = compile_blocks(POWER_REGISTERS, **get_transport().plan_kwargs())
+    return power_blocks
 
 
 def reading_powers(client, keys_to_read):
     """Reads inverter and battery status every 60 seconds."""
 
     i = 0
-    monitored_registers = {
-        'Meter_A_PowerWatt1 [W]': {'address': 41023, 'scale': 1, 'size': 1, 'datatype': 'Int16'},
-        'BatPower [W]': {'address': 16493, 'scale': 1, 'size': 1, 'datatype': 'Int16'},
-        'RGridPowerWatt [W]': {'address': 16437, 'scale': 1, 'size': 1, 'datatype': 'Int16'},
-        'PV1Power [W]': {'address': 16499, 'scale': 1, 'size': 1, 'datatype': 'UInt16'},
-        'PV2Power [W]': {'address': 16502, 'scale': 1, 'size': 1, 'datatype': 'UInt16'},
-        'BatEnergyPercent [%]': {'address': 16495, 'scale': 0.01, 'size': 1, 'datatype': 'UInt16'},
-        'BatVolt [V]': {'address': 16489, 'scale': 0.1, 'size': 1, 'datatype': 'UInt16'},
-        'BatCurr [A]': {'address': 16490, 'scale': 0.01, 'size': 1, 'datatype': 'UInt16'},
-        'BatTempC [℃]': {'address': 16494, 'scale': 0.1, 'size': 1, 'datatype': 'UInt16'},
-        'SinkTemp [℃]': {'address': 16400, 'scale': 0.1, 'size': 1, 'datatype': 'UInt16'},
-        'AmbTemp [ºC]': {'address': 16401, 'scale': 0.1, 'size': 1, 'datatype': 'UInt16'}
-    }
 
     while i < 3:
         print("\n🔄 Reading monitored registers...")
         i = i+1
-        for key in monitored_registers:
-            if key in monitored_registers:
-                reg_info = monitored_registers[key]
-                read_register(client, key, reg_info)
-            else:
-                print(f"⚠️ Key '{key}' not found in monitored_registers.")
+        blocks = get_power_blocks()
+        get_budget().acquire(read_cost(blocks, get_transport()))
+        values, errors = read_values(client, blocks, slave=UNIT_ID, fresh=True)
+        for address, error in errors.items():
+            print(f"⚠️ {error}")
+        changed = POWER_DEADBAND.update(values)
+        for key, reg_info in POWER_REGISTERS.items():
+            if key in changed:
+                print(
+                    f"📖 Read value from '{key}' (Addr {reg_info['address']}): {values[key]}")
 
 
-def display_register_options():
-    """Print available register options for read and write."""
-    print("Available read registers:")
-    read_keys = list(read_registers.keys())
-    for i, name in enumerate(read_keys):
-        print(f"{i}: {name}")
+PAGE_SIZE = 25
+
+
+def display_register_options(page=0, query=None, page_size=PAGE_SIZE):
+    """
+    Print one page of the register options, optionally filtered by name.
+
+    Args:
+        page: Page number, starting at 0.
+        query: Name prefix (or approximate name) to filter by, see RegisterIndex.search.
+    """
+    index = get_index()
+    options = index.search(query) if query else index.entries
+    pages = max(1, -(-len(options) // page_size))
+    page = min(max(page, 0), pages - 1)
+    for entry in options[page * page_size:(page + 1) * page_size]:
+        print(f"{entry['number']}: {entry['key']}" + (" (rw)" if entry["kind"] == "w" else ""))
+    print(f"📄 Page {page}/{pages - 1} ({len(options)} registers). "
+          f"Use 'list <page>' or 'find <text>'.")
+
 
-    print("\nAvailable write registers:")
-    readwrite_keys = list(readwrite_registers.keys())
-    offset = len(read_keys)
-    for i, name in enumerate(readwrite_keys):
-        print(f"{i + offset}: {name}")
-    return read_keys, readwrite_keys, offset
+def interpret_value(words, reg_info):
+    """Decode the raw words of a register (HEX registers shown in hexadecimal)."""
+    value = decode_words(words, reg_info)
+    if reg_info.get("datatype", "UInt16") == "HEX":
+        value = hex(value)
+    return value
 
 
 def read_register(client, key, reg_info):
     """Read and interpret register value from device."""
     address = reg_info["address"]
     size = reg_info["size"]
-    scale = reg_info["scale"]
-    data_type = reg_info.get("datatype", "UInt16")
 
     try:
         result = client.read_holding_registers(
-            address=address, count=size)
+            address=address, count=size, slave=UNIT_ID)
         if not result.isError():
-            read_values = result.registers
-            combined_value = 0
-            for i in range(size):
-                combined_value = (combined_value << 16) + read_values[i]
-
-            if data_type == "Int16" and size == 1:
-                value = ctypes.c_int16(combined_value).value
-            elif data_type == "Int32" and size == 2:
-                value = ctypes.c_int32(combined_value).value
-            elif data_type == "HEX":
-                value = hex(combined_value)
-            else:
-                value = combined_value
-
-            if data_type != "HEX":
-                value *= scale
-
+            value = interpret_value(result.registers, reg_info)
             print(f"📖 Read value from '{key}' (Addr {address}): {value}")
         else:
             print(f"⚠️ Error reading '{key}' (Addr {address}): {result}")
@@ -193,65 +226,35 @@ def read_register(client, key, reg_info):
         print(f"⚠️ Exception reading '{key}': {e}")
 
 
+def start_sequence(client, profile):
+    """Run a progressive test profile in the background so the REPL stays available."""
+    global sequence_thread, sequence_cancel
+    if sequence_thread is not None and sequence_thread.is_alive():
+        print("⚠️ A test sequence is already running! Use 'stop_sequence' first.")
+        return
+    print(f"\n⚡ Starting {profile['name']} in the background "
+          f"({len(profile['steps_w'])} steps of {profile['step_duration']} s)...")
+    from sequence_runner import start_in_background
+    # Mesmo cliente (transporte, pool, saúde da unidade) e unidade que o resto do REPL
+    sequence_thread, sequence_cancel = start_in_background([(client, UNIT_ID)], profile)
+
+
 def progressive_charge(client):
     """
-    Charge battery progressively from 500W to 5000W in 500W steps.
-    Each step lasts 15 minutes, and reading_powers is called at minute 4, 8, and 12.
+    Charge battery progressively from 500W to 4500W in 500W steps.
+    Each step lasts 2 minutes and the powers are read at minute 2.
     """
-    print("\n⚡ Starting progressive CHARGE test...")
-    reg_info = readwrite_registers['BatChargePower [%]']
-
-    for power in range(500, 4501, 500):  # 500W to 5000W, step 500W
-        raw_value = int(power / (reg_info['scale']*5000))
-        print(f"\n🔋 Setting charge power to {power} W (raw {raw_value})")
-
-        # Write register
-        result = client.write_register(
-            address=reg_info['address'],
-            value=raw_value
-        )
-        if result.isError():
-            print(f"⚠️ Failed to write charge power {power}W: {result}")
-            continue
-
-        # 15-minute cycle for this power step
-        for minute in range(1, 3):
-            time.sleep(60)  # wait one minute
-            if minute in [2]:
-                print(
-                    f"\n📊 Reading powers at minute {minute} (charge {power}W)...")
-                reading_powers(client, read_registers)
+    from sequence_runner import CHARGE_PROFILE
+    start_sequence(client, CHARGE_PROFILE)
 
 
 def progressive_discharge(client):
     """
-    Discharge battery progressively from 500W to 5000W in 500W steps.
-    Each step lasts 15 minutes, and reading_powers is called at minute 4, 8, and 12.
+    Discharge battery progressively from 2000W to 4500W in 500W steps.
+    Each step lasts 3 minutes and the powers are read at minutes 1 and 3.
     """
-    print("\n🔋 Starting progressive DISCHARGE test...")
-    # ⚠️ Replace with the correct register if it's different
-    reg_info = readwrite_registers['BatDischargePower [%]']
-
-    for power in range(2000, 4501, 500):  # 500W to 5000W, step 500W
-        raw_value = int(power / (5000*reg_info['scale']))
-        print(f"\n⚡ Setting discharge power to {power} W (raw {raw_value})")
-
-        # Write register
-        result = client.write_register(
-            address=reg_info['address'],
-            value=raw_value
-        )
-        if result.isError():
-            print(f"⚠️ Failed to write discharge power {power}W: {result}")
-            continue
-
-        # 15-minute cycle for this power step
-        for minute in range(1, 4):
-            time.sleep(60)  # wait one minute
-            if minute in [1, 3]:
-                print(
-                    f"\n📊 Reading powers at minute {minute} (discharge {power}W)...")
-                reading_powers(client, read_registers)
+    from sequence_runner import DISCHARGE_PROFILE
+    start_sequence(client, DISCHARGE_PROFILE)
 
 
 def write_register(client, key, reg_info):
@@ -261,13 +264,19 @@ def write_register(client, key, reg_info):
     scale = reg_info["scale"]
 
     try:
-        user_val = float(
-            input(f"✍️ Enter value for '{key}' (will be scaled): "))
-        value = int(user_val / scale)
+        if is_composite(reg_info):
+            user_val = parse_composite(input(f"✍️ Enter value for '{key}' "
+                                             f"({COMPOSITE_HINTS[reg_info['datatype']]}): "),
+                                       reg_info)
+            value = encode_words(user_val, reg_info)[0]
+        else:
+            user_val = float(
+                input(f"✍️ Enter value for '{key}' (will be scaled): "))
+            value = int(user_val / scale)
         # value = int(user_val)
         print(value)
         result = client.write_register(
-            address=address, value=value)
+            address=address, value=value, slave=UNIT_ID)
         if not result.isError():
             print(
                 f"✅ Wrote {user_val} (raw {value}) to '{key}' (Addr {address}) successfully.")
@@ -280,15 +289,11 @@ def write_register(client, key, reg_info):
     # Confirm by reading after writing
     try:
         result = client.read_holding_registers(
-            address=address, count=size)
+            address=address, count=size, slave=UNIT_ID)
         if not result.isError():
-            read_values = result.registers
-            combined_value = 0
-            for i in range(size):
-                combined_value = (combined_value << 16) + read_values[i]
-            scaled_value = combined_value * scale
             print(
-                f"📖 Confirmed value from '{key}' (Addr {address}): {scaled_value}")
+                f"📖 Confirmed value from '{key}' (Addr {address}): "
+                f"{interpret_value(result.registers, reg_info)}")
         else:
             print(
                 f"⚠️ Error reading after write to '{key}' (Addr {address}): {result}")
@@ -296,40 +301,28 @@ def write_register(client, key, reg_info):
         print(f"⚠️ Exception reading after write: {e}")
 
 
-def handle_user_command(client, user_input, read_keys, readwrite_keys, offset):
-    """Handle a read or write command issued by the user."""
-    cmd_type, _, idx_str = user_input.partition(":")
-    idx_str = idx_str.strip()
-
-    if not idx_str.isdigit():
-        print("⚠️ Invalid index. Must be a number.")
+def handle_user_command(client, user_input, index):
+    """Handle a read or write command issued by the user (register number or name)."""
+    cmd_type, _, query = user_input.partition(":")
+    if cmd_type not in ("r", "w"):
+        print("⚠️ Unknown command. Use 'r: number' or 'w: number'.")
         return
 
-    idx = int(idx_str)
-
-    if cmd_type == "r":
-        if idx >= len(read_keys) + len(readwrite_keys):
-            print("⚠️ Index out of range for reading.")
-            return
-        elif idx < len(read_keys):
-            key = read_keys[idx]
-            reg_info = read_registers[key]
+    entry, candidates = index.resolve(query)
+    if entry is None:
+        if candidates:
+            print(f"⚠️ Ambiguous register '{query.strip()}': "
+                  + ", ".join(f"{c['number']}: {c['key']}" for c in candidates[:10]))
         else:
-            key = readwrite_keys[idx - offset]
-            reg_info = readwrite_registers[key]
-
-        read_register(client, key, reg_info)
-
-    elif cmd_type == "w":
-        if idx < offset or idx >= offset + len(readwrite_keys):
-            print("⚠️ Index out of range for writing.")
-            return
-        key = readwrite_keys[idx - offset]
-        reg_info = readwrite_registers[key]
-        write_register(client, key, reg_info)
+            print("⚠️ Unknown register. Use a number from 'list' or a register name.")
+        return
 
+    if cmd_type == "r":
+        read_register(client, entry["key"], entry["info"])
+    elif entry["kind"] != "w":
+        print(f"⚠️ '{entry['key']}' is read-only.")
     else:
-        print("⚠️ Unknown command. Use 'r: number' or 'w: number'.")
+        write_register(client, entry["key"], entry["info"])
 
 
 def start_passive_charge_discharge(client, mode="charge", coulomb_counting=False):
@@ -346,7 +339,8 @@ def start_passive_charge_discharge(client, mode="charge", coulomb_counting=False
         reg_appmode = readwrite_registers['AppMode']
         result = client.write_register(
             address=reg_appmode['address'],
-            value=3
+            value=3,
+            slave=UNIT_ID
         )
         if result.isError():
             print("❌ Failed to set AppMode to 3")
@@ -366,7 +360,8 @@ def start_passive_charge_discharge(client, mode="charge", coulomb_counting=False
 
         result = client.write_register(
             address=reg_passive['address'],
-            value=value
+            value=value,
+            slave=UNIT_ID
         )
         if result.isError():
             print(f"❌ Failed to enable {mode}")
@@ -387,68 +382,88 @@ def start_passive_charge_discharge(client, mode="charge", coulomb_counting=False
         print(f"⚠️ Exception in start_charge_discharge: {e}")
 
 
+def get_scan_scheduler(client):
+    """Return the shared scan scheduler, starting it on first use."""
+    global scan_scheduler
+    with _shared_lock:
+        if scan_scheduler is None:
+            from scan_scheduler import ScanScheduler, RATE_CLASSES
+            from adaptive_polling import AdaptivePolicy
+            policy = AdaptivePolicy(RATE_CLASSES, budget=get_budget(), transport=get_transport())
+            scan_scheduler = ScanScheduler(
+                client, slave=UNIT_ID, policy=policy,
+                timebase=get_timebase(client))
+            scan_scheduler.start()
+    return scan_scheduler
+
+
+def get_timebase(client):
+    """Return the shared inverter timebase, starting the periodic clock sync on first use."""
+    global timebase
+    with _shared_lock:
+        if timebase is None:
+            from timebase import Timebase
+            timebase = Timebase(client, slave=UNIT_ID)
+            timebase.start()
+    return timebase
+
+
+def show_clock(client):
+    """Print the inverter clock estimate, its offset to this host and its drift."""
+    tb = get_timebase(client)
+    if not tb.synced:
+        try:
+            tb.sync()
+        except Exception as e:
+            print(f"⚠️ Clock sync failed: {e}")
+            return
+    print(f"🕒 Inverter clock: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(tb.device_time()))}"
+          f" | offset {tb.offset():+.3f} s | drift {tb.drift_ppm():+.1f} ppm"
+          f" ({len(tb.points)} sync points)")
+
+
 def energy_counting_worker(client, stop_event, polling_interval=1.0):
     """
     Worker thread for energy counting.
-    Reads BatPower, integrates until power <100 W, then exits.
+    Integrates BatPower from the shared scan until power <200 W, then exits.
     """
-    reg_info = {
-        'address': 16493,
-        'scale': 1,
-        'size': 1,
-        'datatype': 'Int16'
-    }
-
-    total_energy_Wh = 0.0
-    last_time = time.time()
-    help_time1 = time.time()
-    help_time2 = time.time()
+    from energy_accounting import EnergyAccountant
+    scheduler = get_scan_scheduler(client)
+    accountant = EnergyAccountant()
+    scheduler.add_listener(accountant.record)
+    help_time2 = time.monotonic()
 
     print("\n🔋 Energy counting thread started...")
 
-    while not stop_event.is_set():
-        try:
-            # Read BatPower
-            result = client.read_holding_registers(
-                address=reg_info['address'],
-                count=reg_info['size']
-            )
-            if result.isError():
-                print(f"⚠️ Error reading BatPower: {result}")
-                time.sleep(polling_interval)
+    try:
+        while not stop_event.wait(polling_interval):
+            energy = accountant.snapshot()
+            bat_power = energy["last_power_w"]
+            if bat_power is None:
                 continue
 
-            raw_value = result.registers[0]
-            bat_power = ctypes.c_int16(
-                raw_value).value * reg_info['scale']  # [W]
-
-            now = time.time()
-            dt_hours = (now - last_time) / 3600.0
-            last_time = now
-            help_time1 = now
-
-            # Integrate
-            total_energy_Wh += abs(bat_power) * dt_hours
-
-            if (help_time1-help_time2) > 60*8:
+            now = time.monotonic()
+            if (now - help_time2) > 60*8:
                 print(
-                    f"📖 BatPower: {bat_power} W | Accumulated: {total_energy_Wh:.2f} Wh")
+                    f"📖 BatPower: {bat_power} W | Accumulated: {energy['total_wh']:.2f} Wh "
+                    f"(charge {energy['charge_wh']:.2f} Wh, discharge {energy['discharge_wh']:.2f} Wh)")
                 reading_powers(client, read_registers)
                 help_time2 = now
 
             # Stop condition
             if abs(bat_power) < 200:
-                print(
-                    f"\n✅ Energy counting finished. Final Energy: {total_energy_Wh:.2f} Wh")
                 break
+    finally:
+        scheduler.remove_listener(accountant.record)
 
-        except Exception as e:
-            print(f"⚠️ Exception in energy_counting_worker: {e}")
-
-        time.sleep(polling_interval)
-
+    energy = accountant.snapshot()
     print(
-        f"\n✅ Energy counting finished. Final Energy: {total_energy_Wh:.2f} Wh")
+        f"\n✅ Energy counting finished. Final Energy: {energy['total_wh']:.2f} Wh "
+        f"(charge {energy['charge_wh']:.2f} Wh, discharge {energy['discharge_wh']:.2f} Wh)")
+    if energy["charge_drift_wh"] is not None or energy["discharge_drift_wh"] is not None:
+        print(
+            f"📊 Corrected with inverter counters: charge {energy['charge_corrected_wh']:.2f} Wh, "
+            f"discharge {energy['discharge_corrected_wh']:.2f} Wh")
 
 
 def start_energy_counting(client, polling_interval=1.0):
@@ -473,68 +488,66 @@ def start_energy_counting(client, polling_interval=1.0):
 
 def read_registers_average_pv_eff(client, keys, register_dict):
     """
-    Read three registers five times and calculate the average for each one.
+    Print rolling statistics of some registers and the efficiency ratios.
+
+    The statistics engine is attached to the shared scan the first time this
+    is called and keeps running, so later calls report on the data collected
+    since then instead of reading in a burst.
 
     Args:
         client: Modbus client.
-        keys: List of 3 register names (strings).
-        register_dict: Dictionary of available registers (e.g. read_registers or readwrite_registers).
+        keys: List of register names (strings).
+        register_dict: Dictionary of available registers (e.g. read_registers).
 
     Returns:
-        Dictionary with average values per register.
+        Dictionary with the mean of each register over the shortest window.
     """
+    global stats_engine
+    if stats_engine is None:
+        from window_stats import StatsEngine
+        tracked = {key for key in keys if key in register_dict}
+        stats_engine = StatsEngine(keys=lambda key: key in tracked)
+        get_scan_scheduler(client).add_listener(stats_engine.record)
+        print("📊 Statistics engine attached to the scan; run 'read_eff_pv' again for results.")
+        return {}
+
+    window = min(stats_engine.windows, key=stats_engine.windows.get)
+    averages = {}
+    for name in stats_engine.windows:
+        print(f"\n📊 Window {name}:")
+        for key in keys:
+            summary = stats_engine.summary(key, name)
+            if not summary["count"]:
+                print(f"🔸 {key}: no samples")
+                continue
+            print(f"🔸 {key}: mean {summary['mean']:.1f}, min {summary['min']}, "
+                  f"max {summary['max']}, std {summary['std']:.1f}, p95 {summary['p95']}, "
+                  f"ewma {summary['ewma']:.1f} ({summary['count']} samples)")
+            if name == window:
+                averages[key] = summary["mean"]
+        for efficiency in stats_engine.efficiencies:
+            ratio = stats_engine.efficiency(efficiency, name)
+            print(f"⚡ {efficiency}: " + ("n/a" if ratio is None else f"{ratio * 100:.1f} %"))
+    return averages
 
-    results = {key: [] for key in keys}
 
-    for i in range(5):
-        print(f"\n🔁 Reading cycle {i + 1}/5...")
-        for key in keys:
-            reg_info = register_dict[key]
-            address = reg_info["address"]
-            size = reg_info["size"]
-            scale = reg_info["scale"]
-            data_type = reg_info.get("datatype", "UInt16")
-
-            try:
-                result = client.read_holding_registers(
-                    address=address, count=size)
-                if not result.isError():
-                    read_values = result.registers
-                    combined_value = 0
-                    for j in range(size):
-                        combined_value = (combined_value <<
-                                          16) + read_values[j]
-
-                    if data_type == "Int16" and size == 1:
-                        value = ctypes.c_int16(combined_value).value
-                    elif data_type == "Int32" and size == 2:
-                        value = ctypes.c_int32(combined_value).value
-                    elif data_type == "HEX":
-                        value = int(combined_value)
-                    else:
-                        value = combined_value
-
-                    if data_type != "HEX":
-                        value *= scale
-
-                    print(f"📖 {key}: {value}")
-                    results[key].append(value)
-                else:
-                    print(f"⚠️ Error reading '{key}': {result}")
-            except Exception as e:
-                print(f"⚠️ Exception reading '{key}': {e}")
-
-        # time.sleep(1)  # Optional pause between cycles
-
-    # Compute average
-    averages = {key: sum(values) / len(values)
-                if values else None for key, values in results.items()}
-
-    print("\n📊 Averages:")
-    for key, avg in averages.items():
-        print(f"🔸 {key}: {avg}")
+COMPOSITE_HINTS = {"DateTime": "YYYY-MM-DDTHH:MM:SS", "HHMM": "HH:MM",
+                   "DayPercent": "weekday mask,percent e.g. 0b0010000,50",
+                   "Bitfield": "mask e.g. 0b1 or bit list e.g. 0,2"}
 
-    return averages
+
+def show_schedule(client):
+    """Read the enable masks and every schedule slot in one block and print them typed."""
+    from write_planner import SCHEDULE_REGISTERS
+    # Máscaras de ativação e os slots de carga/descarga: um só bloco de leitura
+    blocks = compile_blocks(SCHEDULE_REGISTERS, max_count=get_transport().max_count, max_gap=16)
+    values, errors = read_values(client, blocks, slave=UNIT_ID)
+    for address, error in errors.items():
+        print(f"⚠️ Error reading schedule block at {address}: {error}")
+    for key in SCHEDULE_REGISTERS:
+        if key in values:
+            print(f"📅 {key}: {values[key]}")
+    return values
 
 
 def scheduled_charge(client, write_dict, read_dict):
@@ -550,41 +563,21 @@ def scheduled_charge(client, write_dict, read_dict):
             input("📅 Weekday bitmask (Ex: 0b010000 for Wednesday = 16): "), 2)
         power_percent = int(input("🔋 Power (% of rated power, e.g. 50): "))
 
-        # Compor valores
-        start_time = (start_hour << 8) + start_minute
-        end_time = (end_hour << 8) + end_minute
-        power_time = (weekday << 8) + power_percent
-
-        # start_time = hex(start_hour) + hex(start_minute)
-        # end_time = hex(end_hour) + hex(end_minute)
-        # power_time = hex(weekday) + hex(power_percent)
-
-        print(f"{hex(start_time)},{hex(end_time)},{hex(power_time)}")
-
-        # Ativar bit 0 (primeiro horário de carga) do registo de controlo
-        result = client.write_register(
-            address=write_dict['Charge_time_enable_control']['address'],
-            value=0b00000001
-        )
-        if result.isError():
-            print("❌ Failed to enable charge time control.")
+        # Ativar bit 0 (primeiro horário) e escrever o horário numa só trama, com verificação;
+        # valores tipados que o write_planner codifica (HH:MM, dias + %)
+        from write_planner import apply_writes, schedule_writes, WriteError
+        writes = schedule_writes("charge", dt_time(start_hour, start_minute),
+                                 dt_time(end_hour, end_minute), weekday, power_percent)
+        try:
+            frames = apply_writes(client, writes, write_dict, slave=UNIT_ID)
+        except WriteError as e:
+            print(f"❌ Failed to program charge schedule: {e}")
             return
 
-        # Escrever restantes registos
-        writes = {
-            'First_charge_start_time': start_time,
-            'First_charge_end_time': end_time,
-            'First_charge_power_time': power_time
-        }
-
         for key, value in writes.items():
             addr = write_dict[key]['address']
-            result = client.write_register(
-                address=addr, value=value)
-            if not result.isError():
-                print(f"✅ {key} set to {hex(value)} at address {hex(addr)}")
-            else:
-                print(f"⚠️ Failed to write {key}: {result}")
+            print(f"✅ {key} set to {value} at address {hex(addr)}")
+        print(f"📦 Schedule written in {frames} frame(s).")
     except Exception as e:
         print(f"❌ Exception during charge scheduling: {e}")
 
@@ -602,39 +595,21 @@ def scheduled_discharge(client, read_dict, write_dict):
             input("📅 Weekday bitmask (Ex: 0b010000 for Wednesday = 16): "), 2)
         power_percent = int(input("⚡ Power (% of rated power, e.g. 80): "))
 
-        # Compor valores
-        start_time = (start_hour << 8) + start_minute
-        end_time = (end_hour << 8) + end_minute
-        power_time = (weekday << 8) + power_percent
-
-        # start_time = hex(start_hour) + hex(start_minute)
-        # end_time = hex(end_hour) + hex(end_minute)
-        # power_time = hex(weekday) + hex(power_percent)
-
-        # Ativar bit 0 (primeiro horário de descarga) do registo de controlo
-        result = client.write_register(
-            address=write_dict['Discharge_time_enable_control']['address'],
-            value=0b00000001
-        )
-        if result.isError():
-            print("❌ Failed to enable discharge time control.")
+        # Ativar bit 0 (primeiro horário) e escrever o horário numa só trama, com verificação;
+        # valores tipados que o write_planner codifica (HH:MM, dias + %)
+        from write_planner import apply_writes, schedule_writes, WriteError
+        writes = schedule_writes("discharge", dt_time(start_hour, start_minute),
+                                 dt_time(end_hour, end_minute), weekday, power_percent)
+        try:
+            frames = apply_writes(client, writes, write_dict, slave=UNIT_ID)
+        except WriteError as e:
+            print(f"❌ Failed to program discharge schedule: {e}")
             return
 
-        # Escrever restantes registos
-        writes = {
-            'First_discharge_start_time': start_time,
-            'First_discharge_end_time': end_time,
-            'First_discharge_power_time': power_time
-        }
-
         for key, value in writes.items():
             addr = write_dict[key]['address']
-            result = client.write_register(
-                address=addr, value=value)
-            if not result.isError():
-                print(f"✅ {key} set to {hex(value)} at address {hex(addr)}")
-            else:
-                print(f"⚠️ Failed to write {key}: {result}")
+            print(f"✅ {key} set to {value} at address {hex(addr)}")
+        print(f"📦 Schedule written in {frames} frame(s).")
     except Exception as e:
         print(f"❌ Exception during discharge scheduling: {e}")
 
@@ -643,21 +618,21 @@ def main():
 
     last_power_reading_time = 0
     extra_listening = 0
-    client = ModbusTcpClient(IP_ADDRESS, port=PORT)
+    # Leituras interativas servidas da cache quando o scan/listener leu há pouco
+    client = CachedClient(DeviceClient(get_transport()))
     if not client.connect():
         print("❌ Failed to connect to Modbus server.")
         return
 
-    print(f"✅ Connected to {IP_ADDRESS}:{PORT}\n")
+    print(f"✅ Connected to {get_transport()}\n")
 
     # Start passive listener thread
     listener_thread = threading.Thread(
         target=start_passive_listener, args=(client,), daemon=True)
     listener_thread.start()
 
-    # Show available registers
-    read_keys, readwrite_keys, offset = display_register_options()
-
+    print(f"📖 {len(read_registers)} read and {len(readwrite_registers)} write registers "
+          f"available ('list [page]' or 'find <text>' to show them).")
     print("\nEnter 'r: number' to read or 'w: number' to write (or 'exit' to quit).\n")
 
     while True:
@@ -671,7 +646,14 @@ def main():
             #    energy_stop_event.set()
             break
 
-        if user_input == "read_eff_pv":
+        if user_input == "list" or user_input.startswith("list "):
+            page = user_input[4:].strip()
+            display_register_options(int(page) if page.isdigit() else 0)
+            continue
+        elif user_input.startswith("find "):
+            display_register_options(query=user_input[5:].strip(), page_size=len(get_index().entries))
+            continue
+        elif user_input == "read_eff_pv":
             keys_to_read = ["Meter_A_PowerWatt1 [W]", "RGridPowerWatt [W]",
                             "ROnGridOutPowerWatt [W]", "PV1Power [W]"]  # Replace with actual register names
             averages = read_registers_average_pv_eff(
@@ -681,6 +663,12 @@ def main():
             extra_listening = 1
         elif user_input == "start listening" or user_input == "stl":
             extra_listening = 0
+        elif user_input == "clock":
+            show_clock(client)
+            continue
+        elif user_input == "show_schedule":
+            show_schedule(client)
+            continue
         elif user_input == "scheduled_charge":
             scheduled_charge(client, readwrite_registers, read_registers)
             continue
@@ -688,13 +676,15 @@ def main():
             scheduled_discharge(client, read_registers, readwrite_registers,)
             continue
         elif user_input == "progressive_charge":
-            start_passive_charge_discharge(client, mode="charge")
             progressive_charge(client)
             continue
         elif user_input == "progressive_discharge":
-            start_passive_charge_discharge(client, mode="discharge")
             progressive_discharge(client)
             continue
+        elif user_input == "stop_sequence":
+            if sequence_cancel is not None:
+                sequence_cancel()
+            continue
         elif user_input == "energy_counting":
             start_energy_counting(client, polling_interval=1.0)
             continue
@@ -719,8 +709,7 @@ def main():
             print("⚠️ Invalid format. Use 'r: number' or 'w: number'.")
             continue
         else:
-            handle_user_command(client, user_input,
-                                read_keys, readwrite_keys, offset)
+            handle_user_command(client, user_input, get_index())
 
     client.close()
     print("🚪 Connection closed.")
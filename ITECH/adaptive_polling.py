@@ -0,0 +1,201 @@
+# Intervalos de leitura adaptativos: backoff com jitter, aceleração com atividade e orçamento de banda
+import random
+import threading
+import time
+from deadband import DeadbandFilter
+from transports import TCP_REQUEST_BYTES, TCP_RESPONSE_BYTES
+
+BACKOFF_BASE = 1.0        # segundos após a primeira falha (mínimo; cada ciclo recua a partir do seu intervalo)
+BACKOFF_MAX = 300.0
+TIGHTEN = 0.5             # fator aplicado ao intervalo quando há atividade
+RELAX = 1.25              # fator aplicado a cada leitura sem atividade
+MIN_FACTOR = 0.25         # intervalo mínimo = 0.25 x intervalo nominal
+MAX_FACTOR = 4.0
+POWER_DEADBAND = 50.0     # [W] variação de potência considerada atividade
+BUDGET_BYTES_PER_S = 2000 # orçamento de banda por inversor (tramas Modbus TCP)
+BUDGET_BURST = 4000       # bytes que podem ser gastos de uma vez
+BUS_BURST_SECONDS = 2.0   # num barramento série o burst é o tempo de barramento acumulável
+
+
+def is_activity_key(key):
+    """Power and fault registers: the ones whose changes tighten the polling interval."""
+    return key.endswith("[W]") or "Fault" in key or key.startswith("Error_Count")
+
+
+def read_cost(blocks, transport=None):
+    """Bytes on the wire for one read of the given blocks (character times on a serial bus)."""
+    if transport is not None:
+        return sum(transport.read_cost(block["count"]) for block in blocks)
+    return sum(TCP_REQUEST_BYTES + TCP_RESPONSE_BYTES + 2 * block["count"] for block in blocks)
+
+
+def budget_for(transport=None):
+    """
+    Bandwidth budget of one link: the whole bus of a serial transport (it is
+    the bottleneck, and read_cost already counts silences and turnaround),
+    the default politeness budget on Modbus TCP.
+    """
+    rate = getattr(transport, "bus_rate", None)
+    if rate is None:
+        return BandwidthBudget()
+    return BandwidthBudget(rate=rate, burst=rate * BUS_BURST_SECONDS)
+
+
+class Backoff:
+    """
+    Exponential backoff with jitter: delay in [d/2, d], d = base * 2**failures,
+    capped at `maximum`.
+
+    A loop that already polls slowly passes its interval as the base, so a
+    failure never makes it poll faster than it did before: the delay is at
+    least that base and the cap is raised to it if needed.
+    """
+
+    def __init__(self, base=BACKOFF_BASE, maximum=BACKOFF_MAX, rng=None):
+        self.base = base
+        self.maximum = maximum
+        self.failures = 0
+        self.random = rng or random.Random()
+
+    def delay(self, base=None):
+        """Delay before the next attempt after the failures recorded so far."""
+        floor = 0.0 if base is None else max(self.base, base)
+        base = floor or self.base
+        delay = min(max(self.maximum, base), base * 2 ** self.failures)
+        return max(floor, self.random.uniform(delay / 2, delay))
+
+    def failure(self, base=None):
+        """Record a failure and return the delay before the next attempt."""
+        delay = self.delay(base)
+        self.failures += 1
+        return delay
+
+    def reset(self):
+        self.failures = 0
+
+
+class AdaptiveInterval:
+    """
+    Polling interval of one loop: shorter while values move, longer when idle.
+
+    next_interval(ok, active) returns the time to wait before the next read:
+    a backoff delay from the current interval after a failure, otherwise the
+    nominal interval scaled by a factor that is multiplied by `tighten` on
+    activity and by `relax` on idle reads, within [min_factor, max_factor].
+    """
+
+    def __init__(self, interval, tighten=TIGHTEN, relax=RELAX, min_factor=MIN_FACTOR,
+                 max_factor=MAX_FACTOR, backoff=None):
+        self.interval = interval
+        self.tighten = tighten
+        self.relax = relax
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.factor = 1.0
+        self.backoff = backoff or Backoff()
+
+    @property
+    def current(self):
+        return self.interval * self.factor
+
+    def next_interval(self, ok=True, active=False):
+        if not ok:
+            return self.backoff.failure(self.current)
+        self.backoff.reset()
+        self.factor *= self.tighten if active else self.relax
+        self.factor = min(self.max_factor, max(self.min_factor, self.factor))
+        return self.current
+
+
+class BandwidthBudget:
+    """Token bucket in bytes per second, shared by every poller of one device."""
+
+    def __init__(self, rate=BUDGET_BYTES_PER_S, burst=BUDGET_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost, now=None):
+        """Seconds until `cost` bytes can be spent (0 if they can be spent now)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(now)
+            missing = min(cost, self.burst) - self.tokens
+            return max(0.0, missing / self.rate)
+
+    def consume(self, cost, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(now)
+            self.tokens -= cost
+
+    def acquire(self, cost):
+        """Block until `cost` bytes are available, then spend them."""
+        wait = self.wait_time(cost)
+        if wait > 0:
+            time.sleep(wait)
+        self.consume(cost)
+
+
+class AdaptivePolicy:
+    """
+    Rate control of a ScanScheduler.
+
+    Each rate class gets an AdaptiveInterval around its nominal rate; a class
+    is active when one of its power or fault registers moved beyond the
+    activity deadband. A tick in which no block could be read backs every
+    class off together, each from its own current interval. Reads are charged to a BandwidthBudget, and a tick is
+    postponed while the budget cannot pay for it.
+    """
+
+    def __init__(self, rates, budget=None, power_deadband=POWER_DEADBAND, transport=None,
+                 **interval_kwargs):
+        backoff = Backoff()
+        self.intervals = {name: AdaptiveInterval(rate, backoff=backoff, **interval_kwargs)
+                          for name, rate in rates.items()}
+        self.backoff = backoff
+        self.transport = transport   # define o custo das leituras (None = Modbus TCP)
+        self.budget = budget or budget_for(transport)
+        self.activity = DeadbandFilter(heartbeat=None)
+        self.power_deadband = power_deadband
+
+    def budget_wait(self, blocks, now=None):
+        return self.budget.wait_time(read_cost(blocks, self.transport), now)
+
+    def observe(self, due, sample, blocks, classes, now=None):
+        """
+        Account one tick and return {class: seconds until it is due again}.
+        After a failed tick every class is backed off, not only the due ones.
+
+        Args:
+            due: Rate classes read in this tick.
+            sample: The scan sample.
+            blocks: Blocks that were read (charged to the budget).
+            classes: {class: {key: reg_info}} of the scheduler.
+        """
+        self.budget.consume(read_cost(blocks, self.transport), now)
+        ok = bool(sample["values"]) or not sample["errors"]
+        if not ok:
+            delays = {name: self.backoff.delay(self.intervals[name].current)
+                      for name in classes}
+            self.backoff.failures += 1
+            return delays
+
+        moving = {key: value for key, value in sample["values"].items() if is_activity_key(key)}
+        for key in moving:
+            if key.endswith("[W]"):
+                self.activity.absolute.setdefault(key, self.power_deadband)
+        seen = set(self.activity.last)
+        changed = {key for key in self.activity.update(moving) if key in seen}
+
+        delays = {}
+        for name in due:
+            active = any(key in classes[name] for key in changed)
+            delays[name] = self.intervals[name].next_interval(True, active)
+        return delays
@@ -0,0 +1,155 @@
+# Motor de leitura assíncrono: muitos inversores SAJ a partir de um único event loop
+import asyncio
+import sys
+import time
+from pymodbus.client import AsyncModbusTcpClient
+from register_decoder import READ_BLOCKS, decode_block
+
+# Configuration
+PORT = 502
+UNIT_ID = 1
+DEFAULT_INTERVAL = 5.0   # segundos entre varrimentos de cada agenda
+MAX_IN_FLIGHT = 1        # pedidos simultâneos por inversor (o SAJ H2 serve um de cada vez)
+QUEUE_SIZE = 1000        # amostras em espera antes de aplicar backpressure
+TIMEOUT = 3.0
+
+
+def make_device(host, name=None, port=PORT, slave=UNIT_ID, schedules=None):
+    """
+    Build a device description for AsyncPoller.
+
+    Args:
+        host: IP address of the inverter.
+        name: Label used in the samples (defaults to host).
+        port: Modbus TCP port.
+        slave: Modbus unit ID.
+        schedules: List of {'blocks': compiled blocks, 'interval': seconds}.
+            Defaults to the full read_registers map every DEFAULT_INTERVAL.
+    """
+    return {
+        "name": name or host,
+        "host": host,
+        "port": port,
+        "slave": slave,
+        "schedules": schedules or [{"blocks": READ_BLOCKS, "interval": DEFAULT_INTERVAL}],
+    }
+
+
+class AsyncPoller:
+    """
+    Poll many inverters concurrently with AsyncModbusTcpClient.
+
+    Each device gets its own connection and one task per schedule. A semaphore
+    bounds the requests in flight per device and decoded samples go to a
+    bounded queue: when consumers fall behind, the polling tasks block on
+    put() instead of piling up work.
+    """
+
+    def __init__(self, devices, max_in_flight=MAX_IN_FLIGHT, queue_size=QUEUE_SIZE,
+                 timeout=TIMEOUT):
+        self.devices = devices
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.samples = asyncio.Queue(maxsize=queue_size)
+        self.clients = {}
+        self._tasks = []
+
+    async def start(self):
+        """Open the connections and launch one polling task per device schedule."""
+        for device in self.devices:
+            client = AsyncModbusTcpClient(
+                device["host"], port=device["port"], timeout=self.timeout)
+            self.clients[device["name"]] = client
+            in_flight = asyncio.Semaphore(self.max_in_flight)
+            for schedule in device["schedules"]:
+                self._tasks.append(asyncio.create_task(
+                    self._poll_schedule(device, client, in_flight, schedule)))
+
+    async def stop(self):
+        """Cancel the polling tasks and close every connection."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for client in self.clients.values():
+            client.close()
+        self.clients = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def read_block(self, client, in_flight, block, slave):
+        """Read one compiled block, holding a slot of the device in-flight budget."""
+        async with in_flight:
+            result = await client.read_holding_registers(
+                address=block["address"], count=block["count"], slave=slave)
+        if result.isError():
+            raise IOError(f"Error reading block at {block['address']}: {result}")
+        return result.registers
+
+    async def poll_once(self, device, client, in_flight, blocks):
+        """Read and decode a list of blocks once. Returns a sample dict."""
+        if not client.connected and not await client.connect():
+            return {"device": device["name"], "timestamp": time.time(), "values": {},
+                    "errors": {None: f"Failed to connect to {device['host']}:{device['port']}"},
+                    "latency": 0.0}
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.read_block(client, in_flight, block, device["slave"]) for block in blocks),
+            return_exceptions=True)
+
+        values = {}
+        errors = {}
+        for block, words in zip(blocks, results):
+            if isinstance(words, BaseException):
+                errors[block["address"]] = str(words)
+            else:
+                values.update(decode_block(block, words))
+
+        return {"device": device["name"], "timestamp": time.time(), "values": values,
+                "errors": errors, "latency": time.perf_counter() - started}
+
+    async def _poll_schedule(self, device, client, in_flight, schedule):
+        loop = asyncio.get_running_loop()
+        interval = schedule["interval"]
+        next_run = loop.time()
+        while True:
+            sample = await self.poll_once(device, client, in_flight, schedule["blocks"])
+            await self.samples.put(sample)
+
+            # Salta ciclos perdidos em vez de acumular atrasos
+            next_run += interval
+            now = loop.time()
+            if next_run < now:
+                next_run = now
+            await asyncio.sleep(next_run - now)
+
+    async def __aiter__(self):
+        while True:
+            yield await self.samples.get()
+
+
+async def run(hosts):
+    """Poll every host and print a one-line summary per sample."""
+    async with AsyncPoller([make_device(host) for host in hosts]) as poller:
+        async for sample in poller:
+            status = "✅" if not sample["errors"] else f"⚠️ {len(sample['errors'])} errors"
+            print(f"📖 {sample['device']}: {len(sample['values'])} values in "
+                  f"{sample['latency'] * 1000:.1f} ms {status}")
+
+
+def main():
+    hosts = sys.argv[1:] or ["192.168.31.238"]
+    try:
+        asyncio.run(run(hosts))
+    except KeyboardInterrupt:
+        print("🚪 Polling stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Agrupa os registos em blocos contíguos para ler muitos registos numa só trama Modbus
+MAX_BLOCK_WORDS = 125   # limite do protocolo para read_holding_registers (FC03)
+MAX_GAP_WORDS = 8       # palavras não mapeadas toleradas dentro de um bloco
+
+
+def plan_blocks(register_dict, max_count=MAX_BLOCK_WORDS, max_gap=MAX_GAP_WORDS):
+    """
+    Group a register map into gap-tolerant contiguous read blocks.
+
+    Args:
+        register_dict: Dictionary of registers (e.g. read_registers).
+        max_count: Maximum number of words per block.
+        max_gap: Maximum number of unused words allowed between two registers
+            of the same block.
+
+    Returns:
+        List of blocks sorted by address. Each block is a dict with 'address',
+        'count' and 'registers', a list of (key, offset, size) tuples.
+    """
+    entries = sorted(
+        ((reg["address"], reg["size"], key) for key, reg in register_dict.items()),
+        key=lambda entry: (entry[0], -entry[1]))
+
+    blocks = []
+    block = None
+    for address, size, key in entries:
+        if size > max_count:
+            raise ValueError(
+                f"Register '{key}' ({size} words) does not fit in a {max_count} word block")
+
+        if block is not None:
+            end = block["address"] + block["count"]
+            new_end = max(end, address + size)
+            if address - end <= max_gap and new_end - block["address"] <= max_count:
+                block["count"] = new_end - block["address"]
+                block["registers"].append((key, address - block["address"], size))
+                continue
+
+        block = {"address": address, "count": size, "registers": [(key, 0, size)]}
+        blocks.append(block)
+
+    return blocks
+
+
+def slice_block(block, words):
+    """Split the raw words of a block back into {key: [words]} per register."""
+    return {key: words[offset:offset + size]
+            for key, offset, size in block["registers"]}
+
+
+def read_block(client, block, slave=1, fresh=False):
+    """
+    Read one planned block with a single read_holding_registers request.
+
+    With fresh=True a caching client (register_cache.CachedClient) is read
+    through read_fresh, so the words always come from the device.
+
+    Returns:
+        The list of raw words of the block.
+
+    Raises:
+        IOError if the device answers with an error or a short response.
+    """
+    read = (getattr(client, "read_fresh", None) if fresh else None) or client.read_holding_registers
+    result = read(address=block["address"], count=block["count"], slave=slave)
+    if result.isError():
+        raise IOError(f"Error reading block at {block['address']}: {result}")
+    if len(result.registers) < block["count"]:
+        raise IOError(
+            f"Short response for block at {block['address']}: "
+            f"{len(result.registers)}/{block['count']} words")
+    return result.registers
+
+
+def read_blocks(client, blocks, slave=1):
+    """
+    Read every planned block once and slice the values back out.
+
+    Args:
+        client: Modbus client.
+        blocks: Blocks returned by plan_blocks.
+        slave: Modbus unit ID.
+
+    Returns:
+        Tuple (words, errors): words maps each register key to its raw words,
+        errors maps the start address of each failed block to its message.
+    """
+    words = {}
+    errors = {}
+    for block in blocks:
+        try:
+            words.update(slice_block(block, read_block(client, block, slave)))
+        except Exception as e:
+            errors[block["address"]] = str(e)
+    return words, errors
@@ -0,0 +1,344 @@
+# Cliente Modbus partilhado entre threads: fila de pedidos por inversor e pool de ligações
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from adaptive_polling import Backoff
+from transports import make_transport
+
+# Configuration
+PORT = 502
+POOL_SIZE = 1            # ligações abertas por inversor
+KEEPALIVE = 30.0         # segundos sem tráfego antes de enviar um pedido de keepalive
+KEEPALIVE_ADDRESS = 0x4004   # Inverter_MPVMode, leitura barata de 1 palavra
+REQUEST_TIMEOUT = 10.0
+TIMEOUT = 3.0
+RETRIES = 1
+SUSPEND_AFTER = 3        # falhas seguidas de uma unidade antes de a suspender
+SUSPEND_BASE = 5.0       # [s] primeira suspensão (depois duplica, com jitter)
+SUSPEND_MAX = 300.0
+
+
+class TransactionMismatch(IOError):
+    """The response does not belong to the request that was sent."""
+
+
+class UnitUnavailable(IOError):
+    """The unit ID is suspended after repeated failures; the request was not sent."""
+
+
+def is_no_response(result):
+    """True for a pymodbus 'no response' result (a Modbus exception response means the unit is alive)."""
+    return result.isError() and not hasattr(result, "exception_code")
+
+
+class FairQueue:
+    """
+    Request queue with one FIFO per unit ID, served round-robin.
+
+    A unit with a long backlog (e.g. a full scan) only gets one request in
+    turn, so the other units behind the same gateway keep their cadence.
+    put(None) queues a stop marker, returned only once every queue is empty.
+    """
+
+    def __init__(self):
+        self.queues = OrderedDict()   # unidade -> deque de pedidos
+        self.stops = 0
+        self._cond = threading.Condition()
+
+    def put(self, item, unit=None):
+        with self._cond:
+            if item is None:
+                self.stops += 1
+            else:
+                self.queues.setdefault(unit, deque()).append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Next request in round-robin order (None = stop). Raises queue.Empty after timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.stops or any(self.queues.values()), timeout):
+                raise queue.Empty
+            for unit, pending in self.queues.items():
+                if pending:
+                    item = pending.popleft()
+                    self.queues.move_to_end(unit)   # a próxima vez começa pela unidade seguinte
+                    return item
+            self.stops -= 1
+            return None
+
+    def pending(self):
+        with self._cond:
+            return {unit: len(pending) for unit, pending in self.queues.items() if pending}
+
+    def drain(self):
+        """Remove and return every queued request (stop markers are dropped)."""
+        with self._cond:
+            items = [item for pending in self.queues.values() for item in pending]
+            self.queues.clear()
+            self.stops = 0
+            return items
+
+
+class UnitHealth:
+    """
+    Per-unit timeout and circuit breaker: suspended after `suspend_after`
+    failures in a row, or at once when failure() is told to suspend.
+    """
+
+    def __init__(self, timeout, suspend_after=SUSPEND_AFTER):
+        self.timeout = timeout
+        self.suspend_after = suspend_after
+        self.failures = 0
+        self.suspended_until = 0.0
+        self.backoff = Backoff(SUSPEND_BASE, SUSPEND_MAX)
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now=None):
+        return (time.monotonic() if now is None else now) >= self.suspended_until
+
+    def success(self):
+        self.requests += 1
+        self.failures = 0
+        self.backoff.reset()
+
+    def failure(self, now=None, suspend=False):
+        self.requests += 1
+        self.errors += 1
+        self.failures += 1
+        if suspend or self.failures >= self.suspend_after:
+            # Suspensa: depois do prazo passa um pedido de teste; se falhar volta a suspender
+            now = time.monotonic() if now is None else now
+            self.suspended_until = now + self.backoff.failure()
+
+
+class DeviceClient:
+    """
+    Thread-safe drop-in replacement for ModbusTcpClient, over any transport.
+
+    Every request goes through a per-device queue and is executed by one of
+    pool_size worker threads, each owning its own connection. A connection
+    only ever carries one transaction at a time, so concurrent callers (the
+    passive listener, the energy counter, the REPL) can share a device without
+    interleaving frames. Workers reconnect on failure, check that the
+    transaction ID of every response matches the request and send a cheap read
+    when a connection has been idle for `keepalive` seconds.
+
+    `host` is an IP address (Modbus TCP on `port`), a transport URL such as
+    'rtu:///dev/ttyUSB0?baudrate=9600' or 'rtu+tcp://host:8899', or a
+    transport object (see transports.make_transport). Serial transports
+    get a single worker, and the transport's inter-frame silence is kept
+    between transactions.
+
+    Behind a gateway, several unit IDs (the slave= of each request) share the
+    connection: requests are queued per unit and served round-robin, each
+    unit has its own response timeout (unit_timeouts) and a unit that keeps
+    failing is suspended with backoff, its requests failing immediately
+    with UnitUnavailable, so a dead inverter does not stall the others.
+    A unit that does not answer is not retried (only connection errors
+    are), and while other units share the client it is suspended after
+    its first timeout.
+    """
+
+    def __init__(self, host, port=PORT, pool_size=POOL_SIZE, keepalive=KEEPALIVE,
+                 timeout=TIMEOUT, request_timeout=REQUEST_TIMEOUT, retries=RETRIES,
+                 unit_timeouts=None):
+        self.transport = make_transport(host, port)
+        self.host = getattr(self.transport, "host", None) or self.transport.device
+        self.port = getattr(self.transport, "port", None)
+        if self.transport.max_connections is not None:
+            pool_size = min(pool_size, self.transport.max_connections)
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.retries = retries
+        self.requests = FairQueue()
+        self.units = {}          # unidade -> UnitHealth
+        self.unit_timeouts = dict(unit_timeouts or {})
+        self._last_unit = None
+        self._workers = []
+        self._stop_event = threading.Event()
+        self._last_frame = 0.0   # instante monotónico do fim da última transação
+
+    def new_connection(self):
+        return self.transport.connection(self.timeout)  # pymodbus só é importado aqui
+
+    # --- Ciclo de vida ---
+
+    def connect(self):
+        """Start the worker threads and open the first connection. Returns True on success."""
+        if not self._workers:
+            self._stop_event.clear()
+            for i in range(self.pool_size):
+                worker = threading.Thread(
+                    target=self._worker, name=f"modbus-{self.host}-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        try:
+            self.submit("connect").result(self.request_timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        """
+        Stop the workers once the queued requests have been served.
+
+        Requests still queued when the workers are gone (a worker did not
+        finish within request_timeout, or the client was never connected)
+        fail with ConnectionError instead of waiting forever.
+        """
+        # Os marcadores de paragem só saem da fila depois dos pedidos pendentes
+        for _ in self._workers:
+            self.requests.put(None)
+        for worker in self._workers:
+            worker.join(self.request_timeout)
+        self._stop_event.set()
+        self._workers = []
+        for future, *_ in self.requests.drain():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(ConnectionError(f"Client of {self.transport} closed"))
+
+    @property
+    def connected(self):
+        return bool(self._workers) and not self._stop_event.is_set()
+
+    # --- Pedidos ---
+
+    def health(self, unit):
+        """UnitHealth of a unit ID (created on first use)."""
+        health = self.units.get(unit)
+        if health is None:
+            health = self.units.setdefault(
+                unit, UnitHealth(self.unit_timeouts.get(unit, self.timeout)))
+        return health
+
+    def shared(self):
+        """True when requests for more than one unit ID go through this client."""
+        return len(self.units) > 1
+
+    def set_unit_timeout(self, unit, timeout):
+        self.unit_timeouts[unit] = timeout
+        self.health(unit).timeout = timeout
+
+    def unit_status(self):
+        """{unit: {'requests', 'errors', 'failures', 'suspended_for', 'pending'}}."""
+        now = time.monotonic()
+        pending = self.requests.pending()
+        return {unit: {"requests": health.requests, "errors": health.errors,
+                       "failures": health.failures,
+                       "suspended_for": max(0.0, health.suspended_until - now),
+                       "pending": pending.get(unit, 0)}
+                for unit, health in list(self.units.items())}
+
+    def submit(self, method, *args, **kwargs):
+        """Queue a client method call (e.g. 'read_holding_registers'). Returns a Future."""
+        future = Future()
+        unit = None if method == "connect" else kwargs.get("slave", 1)
+        self.requests.put((future, method, args, kwargs), unit=unit)
+        return future
+
+    def call(self, method, *args, **kwargs):
+        """Queue a client method call and wait for its result."""
+        return self.submit(method, *args, **kwargs).result(self.request_timeout)
+
+    def read_holding_registers(self, address, count=1, **kwargs):
+        return self.call("read_holding_registers", address=address, count=count, **kwargs)
+
+    def write_register(self, address, value, **kwargs):
+        return self.call("write_register", address=address, value=value, **kwargs)
+
+    def write_registers(self, address, values, **kwargs):
+        return self.call("write_registers", address=address, values=values, **kwargs)
+
+    # --- Worker ---
+
+    def _execute(self, connection, method, args, kwargs):
+        if not connection.connected and not connection.connect():
+            raise ConnectionError(f"Failed to connect to {self.transport}")
+        if method == "connect":
+            return True
+
+        silence = self._last_frame + self.transport.inter_frame - time.monotonic()
+        if silence > 0:
+            time.sleep(silence)
+        unit = kwargs.get("slave", 1)
+        # O timeout de resposta do pymodbus é lido a cada receção: ajusta-o à unidade
+        connection.comm_params.timeout_connect = self.health(unit).timeout
+        try:
+            result = getattr(connection, method)(*args, **kwargs)
+        finally:
+            self._last_frame = time.monotonic()
+        if is_no_response(result):
+            raise TimeoutError(f"No response from unit {unit}: {result}")
+        self._last_unit = unit
+        if not self.transport.checks_tid:
+            return result
+
+        # Compara o transaction ID da resposta com o último enviado nesta ligação
+        expected = getattr(getattr(connection, "transaction", None), "tid", None)
+        if expected is None:
+            raise TransactionMismatch(
+                f"Cannot check the transaction ID: {type(connection).__name__} does not "
+                f"expose the TID of the request it sent")
+        received = getattr(result, "transaction_id", None)
+        if received not in (0, expected):
+            raise TransactionMismatch(
+                f"Transaction ID mismatch (sent {expected}, received {received})")
+        return result
+
+    def _worker(self):
+        connection = self.new_connection()
+        while not self._stop_event.is_set():
+            try:
+                request = self.requests.get(timeout=self.keepalive)
+            except queue.Empty:
+                self._send_keepalive(connection)
+                continue
+            if request is None:
+                break
+
+            future, method, args, kwargs = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            health = None if method == "connect" else self.health(kwargs.get("slave", 1))
+            if health is not None and not health.available():
+                future.set_exception(UnitUnavailable(
+                    f"Unit {kwargs.get('slave', 1)} suspended after {health.failures} failures"))
+                continue
+
+            for attempt in range(self.retries + 1):
+                try:
+                    future.set_result(self._execute(connection, method, args, kwargs))
+                    if health is not None:
+                        health.success()
+                    break
+                except Exception as e:
+                    # Ligação possivelmente corrompida (ou resposta atrasada a caminho):
+                    # fecha e volta a ligar no próximo pedido
+                    connection.close()
+                    # Uma unidade que não responde não é repetida: cada tentativa
+                    # ocuparia a ligação das outras unidades durante o seu timeout
+                    timed_out = isinstance(e, TimeoutError)
+                    if timed_out or attempt == self.retries:
+                        # Uma falha por pedido, não por tentativa
+                        if health is not None:
+                            health.failure(suspend=timed_out and self.shared())
+                        future.set_exception(e)
+                        break
+
+        connection.close()
+
+    def _send_keepalive(self, connection):
+        if not connection.connected:
+            return
+        try:
+            result = connection.read_holding_registers(
+                address=KEEPALIVE_ADDRESS, count=1, slave=self._last_unit or 1)
+            if result.isError():
+                connection.close()
+        except Exception:
+            connection.close()
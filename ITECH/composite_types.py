@@ -0,0 +1,113 @@
+# Tipos compostos dos registos SAJ: relógio, HH:MM, máscara de dias + percentagem e campos de bits
+from collections import namedtuple
+from datetime import datetime, time
+
+
+class Bitfield(int):
+    """An int that also exposes its set bits (e.g. the schedule enable masks)."""
+
+    @property
+    def bits(self):
+        return tuple(bit for bit in range(self.bit_length()) if self >> bit & 1)
+
+    def __repr__(self):
+        return f"Bitfield({bin(self)}, bits={list(self.bits)})"
+
+    __str__ = __repr__
+
+
+class DayPercent(namedtuple("DayPercent", "days percent")):
+    """Schedule power word: weekday bitmask in the high byte, % of rated power in the low byte."""
+
+    def __str__(self):
+        return f"days {self.days:#09b}, {self.percent} %"
+
+
+def decode_datetime(value):
+    """4-word clock: year (2 bytes), month, day, hour, minute, second, spare. None if invalid."""
+    data = value.to_bytes(8, "big")
+    try:
+        return datetime((data[0] << 8) + data[1], data[2], data[3], data[4], data[5], data[6])
+    except ValueError:
+        return None
+
+
+def encode_datetime(value):
+    data = bytes([value.year >> 8, value.year & 0xFF, value.month, value.day,
+                  value.hour, value.minute, value.second, 0])
+    return int.from_bytes(data, "big")
+
+
+def decode_hhmm(value):
+    """hour << 8 | minute -> datetime.time (None if out of range)."""
+    try:
+        return time(value >> 8, value & 0xFF)
+    except ValueError:
+        return None
+
+
+def encode_hhmm(value):
+    """Accepts a datetime.time, an (hour, minute) pair or an 'HH:MM' string."""
+    if isinstance(value, str):
+        value = tuple(int(part) for part in value.split(":"))
+    if isinstance(value, tuple):
+        value = time(*value)
+    return (value.hour << 8) | value.minute
+
+
+def decode_day_percent(value):
+    return DayPercent(value >> 8, value & 0xFF)
+
+
+def encode_day_percent(value):
+    days, percent = value
+    if not (0 <= days <= 0xFF and 0 <= percent <= 0xFF):
+        raise ValueError(f"Invalid days/percent: {value}")
+    return (days << 8) | percent
+
+
+def encode_bitfield(value):
+    """Accepts an int mask or an iterable of bit numbers."""
+    if isinstance(value, int):
+        return int(value)
+    mask = 0
+    for bit in value:
+        mask |= 1 << bit
+    return mask
+
+
+def parse(text, reg_info):
+    """Parse user input for a composite register into a value its encoder accepts."""
+    data_type = reg_info["datatype"]
+    text = text.strip()
+    if data_type == "DateTime":
+        return datetime.fromisoformat(text)
+    if data_type == "HHMM":
+        return text
+    if data_type == "DayPercent":
+        days, percent = text.split(",")
+        return DayPercent(int(days.strip(), 0), int(percent))
+    if "," in text:
+        return [int(bit) for bit in text.split(",")]
+    return int(text, 0)
+
+
+# datatype -> (nº de palavras, descodificador, codificador)
+COMPOSITES = {
+    "DateTime": (4, decode_datetime, encode_datetime),
+    "HHMM": (1, decode_hhmm, encode_hhmm),
+    "DayPercent": (1, decode_day_percent, encode_day_percent),
+    "Bitfield": (None, Bitfield, encode_bitfield),   # 1 ou 2 palavras
+}
+
+
+def is_composite(reg_info):
+    return reg_info.get("datatype") in COMPOSITES
+
+
+def decoder(reg_info):
+    return COMPOSITES[reg_info["datatype"]][1]
+
+
+def encoder(reg_info):
+    return COMPOSITES[reg_info["datatype"]][2]
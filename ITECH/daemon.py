@@ -0,0 +1,411 @@
+# Modo daemon: scan, gravação, falhas e contagem de energia sem terminal; comandos por socket local
+import argparse
+import configparser
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from datetime import time as dt_time
+from client_pool import DeviceClient
+from composite_types import is_composite, parse as parse_composite
+from energy_accounting import EnergyAccountant
+from fault_events import FaultTracker, print_event
+from gateway import UNIT_TIMEOUT, GatewayScanner, parse_units
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_cache import CachedClient
+from register_decoder import compile_blocks, decode_words, read_values
+from register_index import get_index
+from transports import plan_kwargs
+from window_stats import default_keys
+from write_planner import SCHEDULE_REGISTERS, WriteError, apply_writes, schedule_writes
+
+CONFIG_PATH = "saj_daemon.ini"
+
+# Configuração por omissão; o ficheiro só precisa das chaves que mudam
+DEFAULT_CONFIG = {
+    "device": {
+        "target": "192.168.31.238",   # IP ou URL de transporte (rtu://..., rtu+tcp://...)
+        "port": "502",
+        "units": "1",                 # ex.: 1,2,5-8 atrás de um gateway
+        "unit_timeout": str(UNIT_TIMEOUT),
+    },
+    "scan": {
+        "timebase": "yes",            # sincronizar com o relógio do inversor
+        "status_interval": "300",     # segundos entre linhas de estado no log (0 = nunca)
+    },
+    "recorder": {
+        "path": "",                   # vazio = sem gravação; {unit} com várias unidades
+        "columns": "",                # vazio = potências e percentagens
+    },
+    "faults": {"enabled": "yes"},
+    "energy": {"enabled": "yes"},
+    "control": {"socket": "/tmp/saj_daemon.sock"},
+    "metrics": {"listen": "127.0.0.1", "port": "0"},   # 0 = sem endpoint /metrics
+}
+
+HELP = """Commands (prefix with '@<unit> ' to address another unit):
+  r: <register>                      read a register (number or name)
+  w: <register> = <value>            write a register (verified, rolled back on failure)
+  scheduled_charge HH:MM HH:MM <days mask> <percent>
+  scheduled_discharge HH:MM HH:MM <days mask> <percent>
+  show_schedule | status | energy | faults | clock | help | shutdown"""
+
+
+def load_config(path=None):
+    """Defaults overlaid with the INI file at `path` (if given)."""
+    config = configparser.ConfigParser(inline_comment_prefixes=(";", "#"))
+    config.read_dict(DEFAULT_CONFIG)
+    if path is not None:
+        with open(path, encoding="utf-8") as f:
+            config.read_file(f)
+    return config
+
+
+def format_value(words, reg_info):
+    value = decode_words(words, reg_info)
+    return hex(value) if reg_info.get("datatype", "UInt16") == "HEX" else value
+
+
+class Daemon:
+    """
+    Unattended acquisition: scan, recorder, fault watcher and energy accounting.
+
+    Everything the REPL did on demand runs continuously from the scan
+    listeners; commands (the REPL's r:/w:/scheduled_charge...) come from the
+    control socket and run in the socket's threads, next to acquisition.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        device = config["device"]
+        self.unit_ids = parse_units(device["units"])
+        self.client = CachedClient(DeviceClient(device["target"], port=device.getint("port")))
+        self.stop_event = threading.Event()
+        self.units = {}            # unidade -> {'faults', 'energy', 'recorder', 'timebase'}
+        self.scanner = None
+        self.control = None
+        self.metrics = None
+        self._stops = []
+        self._stopped = False
+        self.started = None
+
+    # --- Ciclo de vida ---
+
+    def start(self):
+        config = self.config
+        if not self.client.connect():
+            print(f"⚠️ Failed to connect to {self.client.transport}, will keep retrying.")
+        unit_timeout = (config["device"].getfloat("unit_timeout")
+                        if len(self.unit_ids) > 1 else None)
+        self.scanner = GatewayScanner(self.client, self.unit_ids, unit_timeout=unit_timeout)
+
+        registry = None
+        if config["metrics"].getint("port"):
+            from metrics_exporter import MetricsRegistry, serve
+            registry = MetricsRegistry()
+            self.metrics = serve(registry, config["metrics"]["listen"],
+                                 config["metrics"].getint("port"))
+
+        for unit, scheduler in self.scanner.schedulers.items():
+            state = self.units[unit] = {"faults": None, "energy": None, "recorder": None,
+                                        "timebase": None}
+            if config["faults"].getboolean("enabled"):
+                state["faults"] = FaultTracker()
+                state["faults"].add_listener(
+                    lambda event, unit=unit: print_event(dict(event, word=f"@{unit} {event['word']}")))
+                scheduler.add_listener(state["faults"].record)
+            if config["energy"].getboolean("enabled"):
+                state["energy"] = EnergyAccountant()
+                scheduler.add_listener(state["energy"].record)
+            if config["recorder"]["path"]:
+                state["recorder"] = self._open_recorder(unit)
+                scheduler.add_listener(state["recorder"].record)
+            if config["scan"].getboolean("timebase"):
+                from timebase import Timebase
+                state["timebase"] = scheduler.timebase = Timebase(self.client, slave=unit)
+                self._stops.append(state["timebase"].start())
+            if registry is not None:
+                device = self.device_name(unit)
+                registry.attach(device, scheduler, state["faults"])
+
+        self.scanner.start()
+        self.control = self._serve_control(config["control"]["socket"])
+        self.started = time.time()
+        print(f"✅ Daemon scanning units {self.unit_ids} through {self.client.transport}"
+              + (f", control socket {config['control']['socket']}" if self.control else ""))
+
+    def _open_recorder(self, unit):
+        from recorder import open_recorder
+        path = self.config["recorder"]["path"]
+        if len(self.unit_ids) > 1 and "{unit}" not in path:
+            raise ValueError("recorder.path needs a {unit} placeholder with several units")
+        names = [name.strip() for name in self.config["recorder"]["columns"].split(",")
+                 if name.strip()]
+        columns = names or [key for key in read_registers if default_keys(key)]
+        recorder = open_recorder(path.format(unit=unit), columns)
+        if getattr(recorder, "rotated", None):
+            print(f"ℹ️ Recorder columns changed: previous data kept in {recorder.rotated}")
+        return recorder
+
+    def device_name(self, unit):
+        host = self.client.host
+        return host if len(self.unit_ids) == 1 else f"{host}/{unit}"
+
+    def stop(self):
+        """Stop acquisition and release everything (safe to call more than once)."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.stop_event.set()
+        if self.control is not None:
+            self.control.shutdown()
+            self.control.server_close()
+            path = self.config["control"]["socket"]
+            if os.path.exists(path):
+                os.unlink(path)
+        if self.scanner is not None:
+            self.scanner.stop()
+        for stop_event in self._stops:
+            stop_event.set()
+        for state in self.units.values():
+            if state["recorder"] is not None:
+                state["recorder"].close()
+        if self.metrics is not None:
+            self.metrics.shutdown()
+        self.client.close()
+        print("🚪 Daemon stopped.")
+
+    def run(self):
+        """Start, then block until SIGTERM/SIGINT (SIGHUP logs the status and flushes)."""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop_event.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop_event.set())
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.log_status(flush=True))
+        self.start()
+        interval = self.config["scan"].getfloat("status_interval")
+        try:
+            while not self.stop_event.wait(interval or None):
+                self.log_status()
+        finally:
+            self.stop()
+
+    def log_status(self, flush=False):
+        if flush:
+            for state in self.units.values():
+                if state["recorder"] is not None:
+                    state["recorder"].flush()
+        for line in self.status():
+            print(line)
+
+    # --- Comandos ---
+
+    def execute(self, line):
+        """Run one control command. Returns the reply lines."""
+        line = line.strip()
+        unit = self.unit_ids[0]
+        if line.startswith("@"):
+            target, _, line = line[1:].partition(" ")
+            if not target.isdigit() or int(target) not in self.units:
+                return [f"⚠️ Unknown unit '{target}' (scanning {self.unit_ids})."]
+            unit, line = int(target), line.strip()
+        command, _, args = line.partition(" ")
+        command = command.lower()
+        try:
+            if command.startswith("r:") or command.startswith("w:"):
+                return self.command_rw(unit, line)
+            if command in ("scheduled_charge", "scheduled_discharge"):
+                return self.command_schedule(unit, command.split("_")[1], args.split())
+            handler = {"show_schedule": self.command_show_schedule,
+                       "status": lambda unit: self.status(),
+                       "energy": self.command_energy, "faults": self.command_faults,
+                       "clock": self.command_clock}.get(command)
+            if handler is not None:
+                return handler(unit)
+            if command == "shutdown":
+                self.stop_event.set()
+                return ["🚪 Shutting down."]
+            if command in ("help", ""):
+                return HELP.splitlines()
+            return [f"⚠️ Unknown command '{command}'. Send 'help'."]
+        except Exception as e:
+            return [f"❌ {type(e).__name__}: {e}"]
+
+    def command_rw(self, unit, line):
+        cmd_type, _, query = line.partition(":")
+        query, _, value_text = query.partition("=")
+        entry, candidates = get_index().resolve(query)
+        if entry is None:
+            if candidates:
+                return [f"⚠️ Ambiguous register '{query.strip()}': "
+                        + ", ".join(f"{c['number']}: {c['key']}" for c in candidates[:10])]
+            return [f"⚠️ Unknown register '{query.strip()}'."]
+        key, info = entry["key"], entry["info"]
+
+        if cmd_type.strip().lower() == "r":
+            result = self.client.read_holding_registers(
+                address=info["address"], count=info["size"], slave=unit)
+            if result.isError():
+                return [f"⚠️ Error reading '{key}': {result}"]
+            return [f"📖 {key} = {format_value(result.registers, info)}"]
+
+        if entry["kind"] != "w":
+            return [f"⚠️ '{key}' is read-only."]
+        if not value_text.strip():
+            return ["⚠️ Use 'w: <register> = <value>'."]
+        if is_composite(info):
+            value = raw = parse_composite(value_text, info)
+        else:
+            value = float(value_text)
+            raw = int(round(value / info["scale"]))
+            if not info.get("min", raw) <= raw <= info.get("max", raw):
+                return [f"⚠️ {value} is outside [{info['min'] * info['scale']}, "
+                        f"{info['max'] * info['scale']}] for '{key}'."]
+        try:
+            apply_writes(self.client, {key: raw}, readwrite_registers, slave=unit)
+        except WriteError as e:
+            return [f"❌ Failed to write '{key}': {e}"]
+        return [f"✅ Wrote {value} to '{key}' (Addr {info['address']})."]
+
+    def command_schedule(self, unit, mode, args):
+        if len(args) != 4:
+            return [f"⚠️ Use 'scheduled_{mode} HH:MM HH:MM <days mask> <percent>'."]
+        start, end = (dt_time(*(int(part) for part in arg.split(":"))) for arg in args[:2])
+        writes = schedule_writes(mode, start, end, int(args[2], 0), int(args[3]))
+        try:
+            frames = apply_writes(self.client, writes, readwrite_registers, slave=unit)
+        except WriteError as e:
+            return [f"❌ Failed to program {mode} schedule: {e}"]
+        return ([f"✅ {key} set to {value}" for key, value in writes.items()]
+                + [f"📦 Schedule written in {frames} frame(s)."])
+
+    def command_show_schedule(self, unit):
+        blocks = compile_blocks(SCHEDULE_REGISTERS,
+                                **dict(plan_kwargs(self.client), max_gap=16))
+        values, errors = read_values(self.client, blocks, slave=unit)
+        return ([f"⚠️ Error reading schedule block at {address}: {error}"
+                 for address, error in errors.items()]
+                + [f"📅 {key}: {values[key]}" for key in SCHEDULE_REGISTERS if key in values])
+
+    def command_energy(self, unit):
+        accountant = self.units[unit]["energy"]
+        if accountant is None:
+            return ["ℹ️ Energy accounting is disabled."]
+        energy = accountant.snapshot()
+        lines = [f"🔋 @{unit} charge {energy['charge_wh']:.2f} Wh, discharge "
+                 f"{energy['discharge_wh']:.2f} Wh, last BatPower {energy['last_power_w']} W "
+                 f"({energy['samples']} samples, {energy['gap_seconds']:.0f} s in gaps)"]
+        if energy["charge_drift_wh"] is not None or energy["discharge_drift_wh"] is not None:
+            lines.append(f"📊 Corrected with inverter counters: charge "
+                         f"{energy['charge_corrected_wh']:.2f} Wh, discharge "
+                         f"{energy['discharge_corrected_wh']:.2f} Wh")
+        return lines
+
+    def command_faults(self, unit):
+        tracker = self.units[unit]["faults"]
+        if tracker is None:
+            return ["ℹ️ Fault watcher is disabled."]
+        active = tracker.active()
+        if not active:
+            return [f"✅ @{unit} no active faults."]
+        return [f"⚠️ @{unit} {word} bit {bit}: {message}"
+                for word, faults in active.items() for bit, message in faults]
+
+    def command_clock(self, unit):
+        tb = self.units[unit]["timebase"]
+        if tb is None or not tb.synced:
+            return ["ℹ️ Inverter clock not synced (yet)."]
+        return [f"🕒 @{unit} inverter clock "
+                f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(tb.device_time()))}"
+                f" | offset {tb.offset():+.3f} s | drift {tb.drift_ppm():+.1f} ppm"]
+
+    def status(self):
+        uptime = time.time() - self.started if self.started else 0.0
+        lines = [f"📡 {self.client.transport} | up {uptime:.0f} s | cache {self.client.stats()}"]
+        for unit, status in sorted(self.scanner.status().items()):
+            state = (f"suspended {status['suspended_for']:.0f} s"
+                     if status.get("suspended_for") else "ok")
+            lines.append(f"  🔌 unit {unit}: {state} | requests {status.get('requests', 0)}, "
+                         f"errors {status.get('errors', 0)}, registers {status['registers']}")
+        return lines
+
+    # --- Socket de controlo ---
+
+    def _serve_control(self, path):
+        """Unix socket server, one line per command, reply terminated by an empty line."""
+        if not path or not hasattr(socket, "AF_UNIX"):
+            return None
+        if os.path.exists(path):
+            try:
+                send_command(path, "help", timeout=1.0)
+            except OSError:
+                os.unlink(path)   # socket de um daemon que já não existe
+            else:
+                raise RuntimeError(f"Another daemon is listening on {path}")
+        daemon = self
+
+        class ControlHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    reply = daemon.execute(raw.decode("utf-8", "replace"))
+                    self.wfile.write(("\n".join(reply) + "\n\n").encode("utf-8"))
+                    if daemon.stop_event.is_set():
+                        break
+
+        # Os comandos escrevem no inversor: o socket nasce já só para o próprio utilizador
+        # (um chmod depois do bind deixaria uma janela com as permissões do umask)
+        previous_umask = os.umask(0o177)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(path, ControlHandler)
+        finally:
+            os.umask(previous_umask)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def send_command(path, command, timeout=30.0):
+    """Send one command to a running daemon and return its reply text."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(command.strip().encode("utf-8") + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n\n"):
+            data = sock.recv(4096)
+            if not data:
+                break
+            reply += data
+    return reply.decode("utf-8").rstrip("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless SAJ H2 acquisition daemon")
+    parser.add_argument("--config", help=f"INI file (e.g. {CONFIG_PATH})")
+    parser.add_argument("--print-config", action="store_true",
+                        help="print the default configuration and exit")
+    parser.add_argument("--command", "-c",
+                        help="send a command to the running daemon instead, e.g. 'r: BatPower'")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.print_config:
+        config.write(sys.stdout)
+        return
+    if args.command:
+        try:
+            print(send_command(config["control"]["socket"], args.command))
+        except OSError as e:
+            print(f"❌ Daemon not reachable on {config['control']['socket']}: {e}")
+            sys.exit(1)
+        return
+
+    sys.stdout.reconfigure(line_buffering=True)   # o log chega ao journal linha a linha
+    Daemon(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Publica apenas valores que mudaram (banda morta absoluta/relativa + heartbeat)
+import threading
+import time
+
+HEARTBEAT = 300.0   # segundos máximos sem publicar um registo, mesmo que não mude
+
+
+class DeadbandFilter:
+    """
+    Per-register last-value cache that drops unchanged readings.
+
+    A numeric value is published when it moves away from the last published
+    value by at least max(absolute, relative * |last|) (any change when both
+    are 0), or when the register has been silent for `heartbeat` seconds.
+    Non-numeric values (HEX strings, datetimes, errors) are published whenever
+    they differ from the last one.
+
+    Args:
+        absolute: {key: deadband} in engineering units.
+        relative: {key: fraction}, e.g. 0.01 for 1 %.
+        default_absolute / default_relative: Deadbands for unlisted registers.
+        heartbeat: Maximum silence per register in seconds (None disables it).
+    """
+
+    def __init__(self, absolute=None, relative=None, default_absolute=0.0,
+                 default_relative=0.0, heartbeat=HEARTBEAT):
+        self.absolute = absolute or {}
+        self.relative = relative or {}
+        self.default_absolute = default_absolute
+        self.default_relative = default_relative
+        self.heartbeat = heartbeat
+        self.last = {}   # key -> (instante publicado, valor publicado)
+        self._lock = threading.Lock()
+
+    def changed(self, key, value, now):
+        previous = self.last.get(key)
+        if previous is None:
+            return True
+        last_time, last_value = previous
+        if self.heartbeat is not None and now - last_time >= self.heartbeat:
+            return True
+
+        numeric = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                   and isinstance(last_value, (int, float)))
+        if not numeric:
+            return value != last_value
+
+        delta = abs(value - last_value)
+        threshold = max(self.absolute.get(key, self.default_absolute),
+                        self.relative.get(key, self.default_relative) * abs(last_value))
+        return delta >= threshold if threshold > 0 else delta != 0
+
+    def update(self, values, now=None):
+        """Return the subset of {key: value} that should be published and remember it."""
+        now = time.monotonic() if now is None else now
+        published = {}
+        with self._lock:
+            for key, value in values.items():
+                if self.changed(key, value, now):
+                    self.last[key] = (now, value)
+                    published[key] = value
+        return published
+
+    def wrap(self, callback):
+        """
+        Wrap a scan listener so it only receives changed values.
+
+        Samples in which nothing changed (and that carry no errors) are not
+        forwarded at all.
+        """
+        def listener(sample):
+            values = self.update(sample["values"])
+            if values or sample.get("errors"):
+                callback(dict(sample, values=values))
+        return listener
+
+    def reset(self, key=None):
+        """Forget the last published value of one register (or all of them)."""
+        with self._lock:
+            if key is None:
+                self.last.clear()
+            else:
+                self.last.pop(key, None)
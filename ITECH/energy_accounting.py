@@ -0,0 +1,147 @@
+# Contagem de energia da bateria a partir das amostras do scan (integração trapezoidal)
+import threading
+from timebase import block_stamp
+
+POWER_KEY = "BatPower [W]"
+CHARGE_COUNTER_KEY = "Today_BatChgEnergy [Kwh]"
+DISCHARGE_COUNTER_KEY = "Today_BatDisEnergy [Kw h]"
+MAX_GAP = 10.0   # segundos sem amostras a partir dos quais não se integra o intervalo
+
+
+class EnergyAccountant:
+    """
+    Streaming charge/discharge energy integration of BatPower.
+
+    Consecutive samples are integrated with the trapezoidal rule on monotonic
+    timestamps; a segment that crosses zero is split at the crossing so each
+    accumulator only gets its own sign (BatPower > 0 is discharge). Intervals
+    longer than `max_gap` are not integrated and are counted in gap_seconds.
+
+    Whenever the inverter's Today_BatChgEnergy / Today_BatDisEnergy counters
+    are present in a sample, the totals are reconciled: the corrected total is
+    the counter increase since start plus what was integrated after the last
+    counter update, and the drift (integrated - counter) is kept for reporting.
+    """
+
+    def __init__(self, power_key=POWER_KEY, max_gap=MAX_GAP, scale=1.0):
+        self.power_key = power_key
+        self.max_gap = max_gap
+        self.scale = scale  # multiplicador da potência (ex.: -1 se o sinal estiver invertido)
+        self.charge_wh = 0.0
+        self.discharge_wh = 0.0
+        self.gap_seconds = 0.0
+        self.samples = 0
+        self.last = None       # (instante monotónico, potência)
+        self.counters = {"charge": _Counter(CHARGE_COUNTER_KEY),
+                         "discharge": _Counter(DISCHARGE_COUNTER_KEY)}
+        self._lock = threading.Lock()
+
+    def add_power(self, t, power):
+        """Integrate one power sample [W] taken at monotonic time t [s]."""
+        with self._lock:
+            self.samples += 1
+            if self.last is not None:
+                t0, p0 = self.last
+                dt = t - t0
+                if dt > self.max_gap:
+                    self.gap_seconds += dt
+                elif dt > 0:
+                    self._integrate(p0, power, dt)
+            self.last = (t, power)
+
+    def _integrate(self, p0, p1, dt):
+        if p0 * p1 < 0:
+            # Divide o trapézio no cruzamento por zero
+            t_cross = dt * abs(p0) / (abs(p0) + abs(p1))
+            self._accumulate(p0 / 2 * t_cross)
+            self._accumulate(p1 / 2 * (dt - t_cross))
+        else:
+            self._accumulate((p0 + p1) / 2 * dt)
+
+    def _accumulate(self, energy_ws):
+        energy_wh = energy_ws / 3600.0
+        if energy_wh > 0:
+            self.discharge_wh += energy_wh
+        else:
+            self.charge_wh -= energy_wh
+
+    def record(self, sample):
+        """
+        Scan listener: integrate BatPower and reconcile against the inverter counters.
+
+        The power sample is placed at the request/response midpoint of the
+        block that contained it rather than at the start of the tick. (The
+        device-time estimate is not used here: each clock re-sync moves it by
+        a few ms, which would show up as integration error.)
+        """
+        values = sample["values"]
+        t = sample.get("monotonic", sample["timestamp"])
+        stamp = block_stamp(sample, self.power_key)
+        if stamp is not None:
+            t = stamp["monotonic"]
+        if self.power_key in values:
+            self.add_power(t, values[self.power_key] * self.scale)
+        with self._lock:
+            for name, counter in self.counters.items():
+                if counter.key in values:
+                    integrated = self.charge_wh if name == "charge" else self.discharge_wh
+                    counter.update(values[counter.key] * 1000.0, integrated)
+
+    def corrected(self, name):
+        """Charge or discharge energy [Wh] corrected with the inverter counter."""
+        integrated = self.charge_wh if name == "charge" else self.discharge_wh
+        return self.counters[name].corrected(integrated)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "charge_wh": self.charge_wh,
+                "discharge_wh": self.discharge_wh,
+                "total_wh": self.charge_wh + self.discharge_wh,
+                "charge_corrected_wh": self.corrected("charge"),
+                "discharge_corrected_wh": self.corrected("discharge"),
+                "charge_drift_wh": self.counters["charge"].drift,
+                "discharge_drift_wh": self.counters["discharge"].drift,
+                "last_power_w": None if self.last is None else self.last[1],
+                "gap_seconds": self.gap_seconds,
+                "samples": self.samples,
+            }
+
+
+class _Counter:
+    """Tracks one Today_ energy counter of the inverter (reset at midnight)."""
+
+    def __init__(self, key):
+        self.key = key
+        self.base = None          # valor do contador no início
+        self.offset = 0.0         # energia acumulada antes de reinícios do contador
+        self.value = None         # último valor do contador [Wh]
+        self.integrated_at_base = 0.0
+        self.integrated_at_update = 0.0
+        self.drift = None
+
+    def update(self, value_wh, integrated_wh):
+        if self.base is None:
+            self.base = value_wh
+            self.value = value_wh
+            self.integrated_at_base = integrated_wh
+            self.integrated_at_update = integrated_wh
+            self.drift = 0.0
+            return
+        if value_wh < self.value:
+            # Contador diário voltou a zero
+            self.offset += self.value - self.base
+            self.base = 0.0
+        if value_wh != self.value:
+            self.value = value_wh
+            self.integrated_at_update = integrated_wh
+        self.drift = integrated_wh - self.integrated_at_base - self.counted()
+
+    def counted(self):
+        return 0.0 if self.base is None else self.offset + self.value - self.base
+
+    def corrected(self, integrated_wh):
+        if self.base is None:
+            return integrated_wh
+        return (self.integrated_at_base + self.counted()
+                + integrated_wh - self.integrated_at_update)
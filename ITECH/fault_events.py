@@ -0,0 +1,102 @@
+# Descodificação das palavras de falha por máscaras pré-calculadas e fluxo de eventos raise/clear
+import time
+from collections import deque
+from errors import error_codes
+
+# Palavra de falha (chave em read_registers) -> grupo em errors.error_codes
+FAULT_WORDS = {
+    "HFaultMSG (Board/Slave)": "display",
+    "MFaultMSG (Master)": "master_1",
+    "MFaultMSG2 (Master)": "master_2",
+}
+HISTORY = 1000   # eventos guardados em FaultTracker.events
+
+
+def compile_table(messages, width=32):
+    """Turn a {bit: message} table into {mask: message}, with a message for every bit."""
+    return {1 << bit: messages.get(bit, f"Unknown error at bit {bit}") for bit in range(width)}
+
+
+FAULT_TABLES = {group: compile_table(messages) for group, messages in error_codes.items()}
+
+
+def iter_masks(bitfield):
+    """Yield the mask of every set bit, lowest first (one step per set bit)."""
+    while bitfield:
+        mask = bitfield & -bitfield
+        yield mask
+        bitfield ^= mask
+
+
+def active_faults(bitfield, group):
+    """List of (bit, message) set in a fault word of a group of errors.error_codes."""
+    table = FAULT_TABLES[group]
+    return [(mask.bit_length() - 1, table[mask]) for mask in iter_masks(bitfield)]
+
+
+class FaultTracker:
+    """
+    Turns successive fault-word readings into raise/clear events.
+
+    Each word is XORed with its previous value, so only the bits that changed
+    are looked up. The first reading of a word is compared against 0 (every
+    active fault is raised once). Events are dicts
+    {'timestamp', 'word', 'group', 'bit', 'message', 'event'} with event
+    'raised' or 'cleared'; they are returned by update(), passed to the
+    listeners and kept in the bounded `events` history.
+    """
+
+    def __init__(self, fault_words=FAULT_WORDS, history=HISTORY):
+        self.fault_words = fault_words
+        self.previous = {}
+        self.events = deque(maxlen=history)
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def update(self, values, timestamp=None):
+        """Diff the fault words present in values. Returns the new events."""
+        timestamp = time.time() if timestamp is None else timestamp
+        events = []
+        for word, group in self.fault_words.items():
+            value = values.get(word)
+            if not isinstance(value, int):
+                continue
+            previous = self.previous.get(word, 0)
+            self.previous[word] = value
+            table = FAULT_TABLES[group]
+            for mask in iter_masks(value ^ previous):
+                events.append({
+                    "timestamp": timestamp, "word": word, "group": group,
+                    "bit": mask.bit_length() - 1, "message": table[mask],
+                    "event": "raised" if value & mask else "cleared",
+                })
+        self.events.extend(events)
+        for event in events:
+            for callback in self._listeners:
+                callback(event)
+        return events
+
+    def record(self, sample):
+        """Scan listener: diff the fault words of a scan sample."""
+        self.update(sample["values"], sample["timestamp"])
+
+    def active(self):
+        """Currently active faults: {word: [(bit, message)]}."""
+        return {word: active_faults(value, self.fault_words[word])
+                for word, value in self.previous.items() if value}
+
+    def reset(self):
+        self.previous.clear()
+
+
+def format_event(event):
+    icon = "⚠️" if event["event"] == "raised" else "✅"
+    stamp = time.strftime("%H:%M:%S", time.localtime(event["timestamp"]))
+    return (f"{icon} [{stamp}] {event['word']} bit {event['bit']} "
+            f"{event['event']}: {event['message']}")
+
+
+def print_event(event):
+    print(format_event(event))
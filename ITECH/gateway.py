@@ -0,0 +1,136 @@
+# Vários inversores (unit IDs) atrás de um só gateway: um scan por unidade sobre uma ligação partilhada
+import threading
+from adaptive_polling import AdaptivePolicy, budget_for
+from py_r_register import read_registers
+from scan_scheduler import RATE_CLASSES, ScanScheduler
+
+UNIT_TIMEOUT = 1.0   # [s] timeout de resposta de cada unidade num barramento partilhado
+
+
+def parse_units(text):
+    """'1,2,5-8' -> [1, 2, 5, 6, 7, 8] (Modbus unit IDs 1..247)."""
+    units = []
+    for part in text.split(","):
+        first, _, last = part.strip().partition("-")
+        units.extend(range(int(first), int(last or first) + 1))
+    invalid = [unit for unit in units if not 1 <= unit <= 247]
+    if invalid:
+        raise ValueError(f"Invalid unit IDs: {invalid}")
+    return sorted(set(units))
+
+
+class GatewayScanner:
+    """
+    Scan several unit IDs through one DeviceClient (one gateway or RS485 string).
+
+    Every unit gets its own ScanScheduler thread and AdaptivePolicy, all
+    charged to one bandwidth budget of the link. The client serves the units'
+    requests round-robin with a per-unit timeout and suspends units that keep
+    failing, and a failed tick only backs off that unit's scheduler, so a dead
+    inverter costs little more than its timeout while the others keep their
+    rates.
+
+    Args:
+        client: DeviceClient (or CachedClient around one) of the gateway.
+        units: Unit IDs to scan.
+        unit_timeout: Response timeout of each unit [s] (None keeps the client's).
+    """
+
+    def __init__(self, client, units, register_dict=read_registers, rates=RATE_CLASSES,
+                 unit_timeout=UNIT_TIMEOUT, budget=None):
+        self.client = client
+        transport = getattr(client, "transport", None)
+        self.budget = budget or budget_for(transport)
+        self.schedulers = {}
+        for unit in units:
+            if unit_timeout is not None and hasattr(client, "set_unit_timeout"):
+                client.set_unit_timeout(unit, unit_timeout)
+            policy = AdaptivePolicy(rates, budget=self.budget, transport=transport)
+            self.schedulers[unit] = ScanScheduler(client, register_dict, rates, slave=unit,
+                                                  policy=policy)
+        self._stop_events = []
+
+    def add_listener(self, callback):
+        """Register callback(unit, sample), called after every tick of any unit."""
+        for unit, scheduler in self.schedulers.items():
+            scheduler.add_listener(lambda sample, unit=unit: callback(unit, sample))
+
+    def get(self, unit, key):
+        """Latest (timestamp, value) of a register of one unit, or None."""
+        return self.schedulers[unit].get(key)
+
+    def status(self):
+        """Per-unit client health (see DeviceClient.unit_status) plus registers cached."""
+        health = self.client.unit_status() if hasattr(self.client, "unit_status") else {}
+        return {unit: dict(health.get(unit, {}), registers=len(scheduler.latest))
+                for unit, scheduler in self.schedulers.items()}
+
+    def start(self):
+        """Start every unit's scheduler thread."""
+        self._stop_events = [scheduler.start() for scheduler in self.schedulers.values()]
+        return self
+
+    def stop(self):
+        for stop_event in self._stop_events:
+            stop_event.set()
+        self._stop_events = []
+
+    def run(self, stop_event):
+        """Blocking variant of start(): scan until stop_event is set."""
+        self.start()
+        stop_event.wait()
+        self.stop()
+
+
+def print_status(scanner):
+    for unit, status in sorted(scanner.status().items()):
+        state = (f"suspended {status['suspended_for']:.0f} s" if status.get("suspended_for")
+                 else "ok")
+        print(f"  🔌 unit {unit}: {state} | requests {status.get('requests', 0)}, "
+              f"errors {status.get('errors', 0)}, registers {status['registers']}")
+
+
+def main():
+    import argparse
+    import logging
+    from client_pool import DeviceClient
+
+    parser = argparse.ArgumentParser(description="Scan several SAJ H2 unit IDs behind one gateway")
+    parser.add_argument("target", nargs="?", help="gateway IP or transport URL")
+    parser.add_argument("--port", type=int, default=502)
+    parser.add_argument("--units", default="1", help="unit IDs, e.g. 1,2,5-8")
+    parser.add_argument("--unit-timeout", type=float, default=UNIT_TIMEOUT)
+    parser.add_argument("--interval", type=float, default=10.0, help="status print interval [s]")
+    parser.add_argument("--simulate", action="store_true",
+                        help="scan a local simulator (with one dead unit) instead")
+    args = parser.parse_args()
+    units = parse_units(args.units)
+
+    target, port = args.target, args.port
+    if args.simulate:
+        from simulator import start_in_thread, SimulatedInverter, HOST as SIM_HOST, PORT as SIM_PORT
+        logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+        # A última unidade fica sem inversor para mostrar o isolamento
+        start_in_thread({unit: SimulatedInverter() for unit in units[:-1] or units},
+                        port=SIM_PORT, latency=0.02)
+        target, port = SIM_HOST, SIM_PORT
+    if target is None:
+        parser.error("no gateway given")
+
+    client = DeviceClient(target, port=port)
+    if not client.connect():
+        print(f"⚠️ Failed to connect to {client.transport}, will keep retrying.")
+    scanner = GatewayScanner(client, units, unit_timeout=args.unit_timeout).start()
+    print(f"✅ Scanning units {units} through {client.transport}")
+    stop_event = threading.Event()
+    try:
+        while not stop_event.wait(args.interval):
+            print_status(scanner)
+    except KeyboardInterrupt:
+        scanner.stop()
+        client.close()
+        print("🚪 Gateway scan stopped.")
+
+
+if __name__ == "__main__":
+    main()
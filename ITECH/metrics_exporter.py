@@ -0,0 +1,238 @@
+# Endpoint HTTP /metrics (Prometheus/OpenMetrics) com os últimos valores do scan, sem leituras Modbus
+import argparse
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOST = "0.0.0.0"
+PORT = 9105
+PREFIX = "saj"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+_UNIT = re.compile(r"^(.*?)\s*\[(.*)\]$")
+
+
+def split_key(key):
+    """'BatPower [W]' -> ('BatPower', 'W'); keys without a unit get ''."""
+    match = _UNIT.match(key)
+    return (match.group(1), match.group(2)) if match else (key, "")
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def labels(**items):
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in items.items()) + "}"
+
+
+class DeviceMetrics:
+    """Cached values and poll statistics of one device, updated by its scan listener."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.values = {}          # chave -> (timestamp, valor)
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.duration_sum = 0.0
+        self.polls = 0
+        self.block_errors = 0
+        self.failed_polls = 0
+        self.last_poll = None
+        self.fault_events = {}    # (palavra, evento) -> contagem
+
+
+class MetricsRegistry:
+    """
+    Telemetry of several devices, fed by scan listeners and rendered on scrape.
+
+    record(device, sample) copies the numeric values of a scan sample and
+    updates the latency histogram and error counters; render() only formats
+    that cache, so scrapes never cause Modbus traffic.
+    """
+
+    def __init__(self, prefix=PREFIX, buckets=LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.devices = {}
+        self._lock = threading.Lock()
+
+    def device(self, name):
+        with self._lock:
+            return self.devices.setdefault(name, DeviceMetrics(self.buckets))
+
+    def record(self, device, sample):
+        metrics = self.device(device)
+        with self._lock:
+            for key, value in sample["values"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metrics.values[key] = (sample["timestamp"], value)
+            metrics.polls += 1
+            metrics.block_errors += len(sample["errors"])
+            if sample["errors"] and not sample["values"]:
+                metrics.failed_polls += 1
+            metrics.last_poll = sample["timestamp"]
+            duration = sample.get("duration")
+            if duration is not None:
+                metrics.duration_sum += duration
+                for i, bound in enumerate(self.buckets):
+                    if duration <= bound:
+                        metrics.bucket_counts[i] += 1
+
+    def record_fault_event(self, device, event):
+        metrics = self.device(device)
+        with self._lock:
+            key = (event["word"], event["event"])
+            metrics.fault_events[key] = metrics.fault_events.get(key, 0) + 1
+
+    def attach(self, device, scheduler, fault_tracker=None):
+        """Feed this registry from a ScanScheduler (and optionally a FaultTracker)."""
+        scheduler.add_listener(lambda sample: self.record(device, sample))
+        if fault_tracker is not None:
+            fault_tracker.add_listener(lambda event: self.record_fault_event(device, event))
+
+    def render(self, openmetrics=False):
+        """Exposition text of every cached metric."""
+        p = self.prefix
+        lines = []
+
+        def family(name, kind, help_text):
+            # Em OpenMetrics o nome da família de um counter não leva o sufixo _total
+            family_name = name[:-6] if openmetrics and kind == "counter" else name
+            lines.append(f"# HELP {family_name} {help_text}")
+            lines.append(f"# TYPE {family_name} {kind}")
+
+        with self._lock:
+            devices = sorted(self.devices.items())
+
+            family(f"{p}_register_value", "gauge", "Latest decoded value of an inverter register.")
+            for device, m in devices:
+                for key, (_, value) in sorted(m.values.items()):
+                    name, unit = split_key(key)
+                    lines.append(f"{p}_register_value"
+                                 f"{labels(device=device, register=name, unit=unit)} {value}")
+
+            family(f"{p}_register_timestamp_seconds", "gauge",
+                   "Unix time at which the register was last read.")
+            for device, m in devices:
+                for key, (timestamp, _) in sorted(m.values.items()):
+                    name, unit = split_key(key)
+                    lines.append(f"{p}_register_timestamp_seconds"
+                                 f"{labels(device=device, register=name, unit=unit)} {timestamp:.3f}")
+
+            family(f"{p}_poll_duration_seconds", "histogram", "Duration of one scan tick.")
+            for device, m in devices:
+                for bound, count in zip(self.buckets, m.bucket_counts):
+                    lines.append(f"{p}_poll_duration_seconds_bucket"
+                                 f"{labels(device=device, le=bound)} {count}")
+                lines.append(f"{p}_poll_duration_seconds_bucket"
+                             f"{labels(device=device, le='+Inf')} {m.polls}")
+                lines.append(f"{p}_poll_duration_seconds_sum{labels(device=device)} {m.duration_sum}")
+                lines.append(f"{p}_poll_duration_seconds_count{labels(device=device)} {m.polls}")
+
+            counters = [
+                ("polls_total", "Scan ticks.", "polls"),
+                ("poll_failures_total", "Scan ticks in which no block could be read.", "failed_polls"),
+                ("block_errors_total", "Failed block reads.", "block_errors"),
+            ]
+            for suffix, help_text, attribute in counters:
+                family(f"{p}_{suffix}", "counter", help_text)
+                for device, m in devices:
+                    lines.append(f"{p}_{suffix}{labels(device=device)} {getattr(m, attribute)}")
+
+            family(f"{p}_fault_events_total", "counter", "Fault bit transitions per fault word.")
+            for device, m in devices:
+                for (word, event), count in sorted(m.fault_events.items()):
+                    lines.append(f"{p}_fault_events_total"
+                                 f"{labels(device=device, word=word, event=event)} {count}")
+
+            family(f"{p}_last_poll_timestamp_seconds", "gauge", "Unix time of the last scan tick.")
+            for device, m in devices:
+                if m.last_poll is not None:
+                    lines.append(f"{p}_last_poll_timestamp_seconds"
+                                 f"{labels(device=device)} {m.last_poll:.3f}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def make_handler(registry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = registry.render(openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS if openmetrics else PROMETHEUS)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass   # sem uma linha no terminal por cada scrape
+
+    return MetricsHandler
+
+
+def serve(registry, host=HOST, port=PORT):
+    """Serve /metrics from a daemon thread. Returns the HTTP server (call shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(registry))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prometheus exporter for SAJ H2 inverters")
+    parser.add_argument("hosts", nargs="*", help="inverter IP addresses")
+    parser.add_argument("--modbus-port", type=int, default=502)
+    parser.add_argument("--slave", type=int, default=1)
+    parser.add_argument("--units", help="several unit IDs behind each host (gateway), e.g. 1-4")
+    parser.add_argument("--listen", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--simulate", action="store_true",
+                        help="scrape a local simulator instead of inverters")
+    args = parser.parse_args()
+
+    from client_pool import DeviceClient
+    from fault_events import FaultTracker
+    from gateway import UNIT_TIMEOUT, GatewayScanner, parse_units
+
+    units = parse_units(args.units) if args.units else [args.slave]
+    hosts, modbus_port = args.hosts, args.modbus_port
+    if args.simulate:
+        from simulator import start_in_thread, SimulatedInverter, HOST as SIM_HOST, PORT as SIM_PORT
+        start_in_thread({unit: SimulatedInverter() for unit in units}, port=SIM_PORT)
+        hosts, modbus_port = [SIM_HOST], SIM_PORT
+    if not hosts:
+        parser.error("no hosts given")
+
+    registry = MetricsRegistry()
+    for host in hosts:
+        client = DeviceClient(host, port=modbus_port)
+        if not client.connect():
+            print(f"⚠️ Failed to connect to {host}:{modbus_port}, will keep retrying.")
+        # Um só unit ID mantém o timeout do cliente; num gateway cada unidade tem o seu
+        scanner = GatewayScanner(client, units, unit_timeout=None if len(units) == 1 else UNIT_TIMEOUT)
+        for unit, scheduler in scanner.schedulers.items():
+            device = host if len(units) == 1 else f"{host}/{unit}"
+            tracker = FaultTracker()
+            scheduler.add_listener(tracker.record)
+            registry.attach(device, scheduler, tracker)
+        scanner.start()
+
+    server = serve(registry, args.listen, args.port)
+    print(f"📊 Serving metrics on http://{args.listen}:{args.port}/metrics")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("🚪 Exporter stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from pymodbus.client import ModbusTcpClient
 from py_r_register import read_registers  # <--- aqui importas o dicionário
 from py_rw_registers import readwrite_registers
+from block_reader import plan_blocks, read_blocks
 
 # Configurações
 IP_ADDRESS = "192.168.31.238"  # muda para o IP do teu inversor
@@ -19,27 +20,27 @@ def main():
     print(f"✅ Conectado a {IP_ADDRESS}:{PORT}\n")
 
     if test_read_registers == 1:
+        # Lê o mapa completo em poucos blocos contíguos em vez de um pedido por registo
+        blocks = plan_blocks(read_registers)
+        words, errors = read_blocks(client, blocks, slave=UNIT_ID)
+        for address, error in errors.items():
+            print(f"⚠️ Erro ao ler bloco (Addr {address}): {error}")
+
         for name, reg in read_registers.items():
             address = reg["address"]
             size = reg["size"]
             scale = reg["scale"]
 
-            try:
-                result = client.read_holding_registers(address=address, count=size, slave=UNIT_ID)
-
-                if not result.isError():
-                    values = result.registers
-
-                    # Combinar os registos num único valor
-                    combined_value = 0
-                    for i in range(size):
-                        combined_value = (combined_value << 16) + values[i]
-                    scaled_value = combined_value * scale
-                    print(f"{name} (Addr {address}): {scaled_value}")
-                else:
-                    print(f"⚠️ Erro ao ler {name} (Addr {address}): {result}")
-            except Exception as e:
-                print(f"⚠️ Exceção ao ler {name}: {e}")
+            if name not in words:
+                continue
+            values = words[name]
+
+            # Combinar os registos num único valor
+            combined_value = 0
+            for i in range(size):
+                combined_value = (combined_value << 16) + values[i]
+            scaled_value = combined_value * scale
+            print(f"{name} (Addr {address}): {scaled_value}")
 
 
     # Obter a chave correspondente à 3ª entrada (índice 2, pois começa em 0)
@@ -1,28 +1,28 @@
 # Registos de interesse: nome, endereço, tamanho
 read_registers = {
- 'MeterModeSet': {'address': 16432, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'AmbTemp [ºC]': {'address': 16401, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
+ 'MeterModeSet': {'address': 16432, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'AmbTemp [ºC]': {'address': 16401, 'scale': 0.1, 'size': 1,'datatype': 'Int16'},
  'BackupTotalLoadPowerVA [VA]': {'address': 16556, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'BackupTotalLoadPowerWatt [W]': {'address': 16555, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'BatChgSocUpLimit [%]': {'address': 16425, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'BatCurr [A]': {'address': 16490, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'BatCurr1 [A]': {'address': 16491, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'BatCurr2 [A]': {'address': 16492, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'BatDODSet [%]': {'address': 16427, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'BatDisSocDowLimit [%]': {'address': 16426, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'BatChgSocUpLimit [%]': {'address': 16425, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'BatCurr [A]': {'address': 16490, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
+ 'BatCurr1 [A]': {'address': 16491, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
+ 'BatCurr2 [A]': {'address': 16492, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
+ 'BatDODSet [%]': {'address': 16427, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'BatDisSocDowLimit [%]': {'address': 16426, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'BatEnergyPercent [%]': {'address': 16495, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'BatPower [W]': {'address': 16493, 'scale': 1, 'size': 1,'datatype': 'Int16'},
- 'BatResSoc [%]': {'address': 16428, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'BatTempC [℃]': {'address': 16494, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
+ 'BatResSoc [%]': {'address': 16428, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'BatTempC [℃]': {'address': 16494, 'scale': 0.1, 'size': 1,'datatype': 'Int16'},
  'BatVolt [V]': {'address': 16489, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'BusVoltMaster [V]': {'address': 16487, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'BusVoltSlave [V]': {'address': 16488, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
- 'CT_GridPowerVA [VA]': {'address': 16546, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'CT_GridPowerWatt [W]': {'address': 16545, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'CT_PVPowerVA [VA]': {'address': 16548, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'CT_PVPowerWatt [W]': {'address': 16547, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'CT_GridPowerVA [VA]': {'address': 16546, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'CT_GridPowerWatt [W]': {'address': 16545, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'CT_PVPowerVA [VA]': {'address': 16548, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'CT_PVPowerWatt [W]': {'address': 16547, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'ConnTime [S]': {'address': 16409, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'GFCI [mA]': {'address': 16402, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'GFCI [mA]': {'address': 16402, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'ISO1 [kΩ]': {'address': 16403, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'ISO2 [kΩ]': {'address': 16404, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'ISO3 [kΩ]': {'address': 16405, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
@@ -53,47 +53,47 @@ read_registers = {
  'PV4Curr [A]': {'address': 16507, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'PV4Power [W]': {'address': 16508, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'PV4Volt [V]': {'address': 16506, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
- 'RGridCurr [A]': {'address': 16434, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'RGridDCI [mA]': {'address': 16436, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'RGridCurr [A]': {'address': 16434, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
+ 'RGridDCI [mA]': {'address': 16436, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'RGridFreq [Hz]': {'address': 16435, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'RGridPowerVA [W]': {'address': 16438, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'RGridPowerWatt [W]': {'address': 16437, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'RGridVolt [V]': {'address': 16433, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'RInvFreq [Hz]': {'address': 16456, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'RInvCurr [A]': {'address': 16455, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
+ 'RInvCurr [A]': {'address': 16455, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
  'RInvPowerVA [VA]': {'address': 16458, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'RInvPowerWatt [W]': {'address': 16457, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'RInvPowerWatt [W]': {'address': 16457, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'RInvVolt [V]': {'address': 16454, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'ROnGridOutCurr [A]': {'address': 16526, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'ROnGridOutFreq [Hz]': {'address': 16527, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'ROnGridOutPowerWatt [W]': {'address': 16528, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'ROnGridOutVolt [V]': {'address': 16525, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'ROutCurr [A]': {'address': 16470, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'ROutDVI [mV]': {'address': 16472, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'ROutDVI [mV]': {'address': 16472, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'ROutFreq [Hz]': {'address': 16471, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'ROutPowerVA [VA]': {'address': 16474, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'ROutPowerWatt [W]': {'address': 16473, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'ROutVolt [V]': {'address': 16469, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
- 'SGridCurr [A]': {'address': 16441, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'SGridDCI [mA]': {'address': 16443, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'SGridCurr [A]': {'address': 16441, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
+ 'SGridDCI [mA]': {'address': 16443, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'SGridFreq [Hz]': {'address': 16442, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'SGridPowerVA [W]': {'address': 16445, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'SGridPowerWatt [W]': {'address': 16444, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'SGridPowerWatt [W]': {'address': 16444, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'SGridVolt [V]': {'address': 16440, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
- 'SInvCurr [A]': {'address': 16460, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
+ 'SInvCurr [A]': {'address': 16460, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
  'SInvFreq [Hz]': {'address': 16461, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'SInvPowerVA [VA]': {'address': 16463, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'SInvPowerWatt [W]': {'address': 16462, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'SInvPowerWatt [W]': {'address': 16462, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'SInvVolt [V]': {'address': 16459, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'SOnGridOutPowerWatt [W]': {'address': 16530, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'SOnGridOutVolt [A]': {'address': 16529, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'SOutCurr [A]': {'address': 16476, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'SOutDVI [mV]': {'address': 16478, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'SOutDVI [mV]': {'address': 16478, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'SOutFreq [Hz]': {'address': 16477, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'SOutPowerVA [VA]': {'address': 16480, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'SOutPowerWatt [W]': {'address': 16479, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'SOutVolt [V]': {'address': 16475, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
- 'SinkTemp [℃]': {'address': 16400, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
+ 'SinkTemp [℃]': {'address': 16400, 'scale': 0.1, 'size': 1,'datatype': 'Int16'},
  'Sum FeedIn Month [Kw h]': {'address': 16745, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Sum FeedIn Today [Kw h]': {'address': 16743, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Sum FeedIn Total [Kw h]': {'address': 16749, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
@@ -102,23 +102,23 @@ read_registers = {
  'Sum Sell Today [Kw h]': {'address': 16751, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Sum Sell Total [Kw h]': {'address': 16757, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Sum Sell Year [Kw h]': {'address': 16755, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
- 'SysGridPowerWall [W]': {'address': 16557, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'SysTotalLoadWatt [W]': {'address': 16544, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TGridCurr [A]': {'address': 16448, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'TGridDCI [mA]': {'address': 16450, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'SysGridPowerWall [W]': {'address': 16557, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'SysTotalLoadWatt [W]': {'address': 16544, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'TGridCurr [A]': {'address': 16448, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
+ 'TGridDCI [mA]': {'address': 16450, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'TGridFreq [Hz]': {'address': 16449, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'TGridPowerVA [W]': {'address': 16452, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TGridPowerWatt [W]': {'address': 16451, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'TGridPowerWatt [W]': {'address': 16451, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'TGridVolt [V]': {'address': 16447, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
- 'TInvCurr [A]': {'address': 16465, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
+ 'TInvCurr [A]': {'address': 16465, 'scale': 0.01, 'size': 1,'datatype': 'Int16'},
  'TInvFreq [Hz]': {'address': 16466, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'TInvPowerVA [VA]': {'address': 16468, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TInvPowerWatt [W]': {'address': 16467, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'TInvPowerWatt [W]': {'address': 16467, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'TInvVolt [V]': {'address': 16464, 'scale': 0.1, 'size': 1,'datatype': 'UInt16'},
  'TOnGridOutPowerWatt [W]': {'address': 16532, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'TOnGridOutVolt [A]': {'address': 16531, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'TOutCurr [A]': {'address': 16482, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
- 'TOutDVI [mV]': {'address': 16484, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'TOutDVI [mV]': {'address': 16484, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'TOutFreq [Hz]': {'address': 16483, 'scale': 0.01, 'size': 1,'datatype': 'UInt16'},
  'TOutPowerVA [VA]': {'address': 16486, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'TOutPowerWatt [W]': {'address': 16485, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
@@ -138,12 +138,12 @@ read_registers = {
  'Today_SellEnergy2 [kw h]': {'address': 16711, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Today_SellEnergy3 [kw h]': {'address': 16719, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Today_TotalLoadEnergy [Kw h]': {'address': 16607, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
- 'TotalBatteryPower [W]': {'address': 16550, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TotalGridPowerVA [VA]': {'address': 16552, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TotalGridPowerWatt [W]': {'address': 16551, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TotalInvPowerVA [VA]': {'address': 16554, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TotalInvPowerWatt [W]': {'address': 16553, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'TotalPVPower [W]': {'address': 16549, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
+ 'TotalBatteryPower [W]': {'address': 16550, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'TotalGridPowerVA [VA]': {'address': 16552, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'TotalGridPowerWatt [W]': {'address': 16551, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'TotalInvPowerVA [VA]': {'address': 16554, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'TotalInvPowerWatt [W]': {'address': 16553, 'scale': 1, 'size': 1,'datatype': 'Int16'},
+ 'TotalPVPower [W]': {'address': 16549, 'scale': 1, 'size': 1,'datatype': 'Int16'},
  'Total_BackupLoadEnergy [Kw h]': {'address': 16621, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Total_BatChgEnergy [Kw h]': {'address': 16589, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
  'Total_BatDisEnergy [Kw h]': {'address': 16597, 'scale': 0.01, 'size': 2,'datatype': 'UInt32'},
@@ -182,8 +182,8 @@ read_registers = {
  'Meter_B_Status': {'address': 41043, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'Battery_StatusDisp': {'address': 0x4027, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
  'Inverter_MPVMode': {'address': 0x4004, 'scale': 1, 'size': 1,'datatype': 'UInt16'},
- 'HFaultMSG (Board/Slave)': {'address': 0x4005, 'scale': 1, 'size': 1,'datatype': 'UInt32'},
- 'MFaultMSG (Master)': {'address': 0x4007, 'scale': 1, 'size': 1,'datatype': 'UInt32'},
- 'MFaultMSG2 (Master)': {'address': 0x4009, 'scale': 1, 'size': 1,'datatype': 'UInt32'},
+ 'HFaultMSG (Board/Slave)': {'address': 0x4005, 'scale': 1, 'size': 2,'datatype': 'UInt32'},
+ 'MFaultMSG (Master)': {'address': 0x4007, 'scale': 1, 'size': 2,'datatype': 'UInt32'},
+ 'MFaultMSG2 (Master)': {'address': 0x4009, 'scale': 1, 'size': 2,'datatype': 'UInt32'},
  'Error_Count (Inverter)': {'address': 0x400F, 'scale': 1, 'size': 1,'datatype': 'UInt16'}
  }
\ No newline at end of file
@@ -1,20 +1,20 @@
 # Registos de interesse: nome, endereço, tamanho
 readwrite_registers = {
-'Charge_time_enable_control': {'address': 13828, 'scale': 1, 'size': 1, 'min':0,'max':127},
-'Discharge_time_enable_control': {'address': 13829, 'scale': 1, 'size': 1, 'min':0,'max':127,'datatype': 'HEX'},
-'First_charge_start_time': {'address': 0x3606, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'First_charge_end_time': {'address': 0x3607, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'First_charge_power_time': {'address': 0x3608, 'scale': 1, 'size': 1, 'min':0,'max':3,'datatype': 'HEX'},
-'Second_charge_start_time': {'address': 0x3609, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'Second_charge_end_time': {'address': 0x360A, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'Second_charge_power_time': {'address': 0x360B, 'scale': 1, 'size': 1, 'min':0,'max':0xFFFFFF,'datatype': 'HEX'},
+'Charge_time_enable_control': {'address': 13828, 'scale': 1, 'size': 1, 'min':0,'max':127,'datatype': 'Bitfield'},
+'Discharge_time_enable_control': {'address': 13829, 'scale': 1, 'size': 1, 'min':0,'max':127,'datatype': 'Bitfield'},
+'First_charge_start_time': {'address': 0x3606, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'First_charge_end_time': {'address': 0x3607, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'First_charge_power_time': {'address': 0x3608, 'scale': 1, 'size': 1, 'min':0,'max':3,'datatype': 'DayPercent'},
+'Second_charge_start_time': {'address': 0x3609, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'Second_charge_end_time': {'address': 0x360A, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'Second_charge_power_time': {'address': 0x360B, 'scale': 1, 'size': 1, 'min':0,'max':0xFFFFFF,'datatype': 'DayPercent'},
 
-'First_discharge_start_time': {'address': 0x361B, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'First_discharge_end_time': {'address': 0x361C, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'First_discharge_power_time': {'address': 0x361D, 'scale': 1, 'size': 1, 'min':0,'max':3,'datatype': 'HEX'},
-'Second_discharge_start_time': {'address': 0x361E, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'Second_discharge_end_time': {'address': 0x361F, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HEX'},
-'Second_discharge_power_time': {'address': 0x3620, 'scale': 1, 'size': 1, 'min':0,'max':0xFFFFFF,'datatype': 'HEX'},
+'First_discharge_start_time': {'address': 0x361B, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'First_discharge_end_time': {'address': 0x361C, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'First_discharge_power_time': {'address': 0x361D, 'scale': 1, 'size': 1, 'min':0,'max':3,'datatype': 'DayPercent'},
+'Second_discharge_start_time': {'address': 0x361E, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'Second_discharge_end_time': {'address': 0x361F, 'scale': 1, 'size': 1, 'min':0,'max':0x173B,'datatype': 'HHMM'},
+'Second_discharge_power_time': {'address': 0x3620, 'scale': 1, 'size': 1, 'min':0,'max':0xFFFFFF,'datatype': 'DayPercent'},
 
 'TimeBatdischar': {'address': 0x3660, 'scale': 0, 'size': 1, 'min':0,'max':1},
 'TimeExcept': {'address': 0x365F, 'scale': 0, 'size': 1, 'min':0,'max':1},
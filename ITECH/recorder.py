@@ -0,0 +1,245 @@
+# Gravador colunar das amostras lidas: ring buffer em memória mapeada (ou Parquet, se existir pyarrow)
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+MAGIC = b"SAJRING1"
+# magic, capacidade, nº de colunas, linhas escritas, tamanho do cabeçalho JSON
+HEADER = struct.Struct("<8sQQQQ")
+BATCH_SIZE = 60          # linhas acumuladas antes de escrever
+FLUSH_INTERVAL = 10.0    # segundos máximos entre escritas
+CAPACITY = 2 * 86400     # 2 dias a 1 Hz (usar Parquet para históricos longos)
+
+
+def rotated_path(path):
+    """Free name for an old ring file: saj_1.ring -> saj_1.20261018-194200.ring."""
+    root, ext = os.path.splitext(path)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    candidate, n = f"{root}.{stamp}{ext}", 1
+    while os.path.exists(candidate):
+        candidate, n = f"{root}.{stamp}-{n}{ext}", n + 1
+    return candidate
+
+
+class RingRecorder:
+    """
+    Fixed-size columnar time series on a memory-mapped file.
+
+    The file holds a timestamp column plus one float64 column per register,
+    each `capacity` rows long; once full, the oldest rows are overwritten.
+    Samples are buffered and written in batches of `batch_size` rows (or
+    every `flush_interval` seconds). Registers missing from a sample are
+    stored as NaN.
+
+    Reopening an existing file with the same columns continues where it
+    stopped. If the columns differ, the old file is renamed aside (see
+    rotated_path) and a new one is started, so no register is dropped
+    silently. columns=None opens an existing file with its own columns.
+    """
+
+    def __init__(self, path, columns=None, capacity=CAPACITY, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._open_existing()
+            if columns is not None and list(columns) != self.columns:
+                self._close_map()
+                self.rotated = rotated_path(path)
+                os.rename(path, self.rotated)
+                self._create(list(columns), capacity)
+        elif columns is None:
+            raise ValueError(f"{path} does not exist and no columns were given")
+        else:
+            self._create(list(columns), capacity)
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    rotated = None   # caminho do ficheiro antigo, se foi posto de lado por mudar de colunas
+
+    def _create(self, columns, capacity):
+        meta = json.dumps({"columns": columns}).encode()
+        self.header_size = HEADER.size + len(meta)
+        # Alinha os dados a 8 bytes para permitir memoryview.cast("d")
+        self.header_size += -self.header_size % 8
+        self.columns = columns
+        self.capacity = capacity
+        size = self.header_size + 8 * capacity * (len(columns) + 1)
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, capacity, len(columns), 0, len(meta)) + meta)
+            f.truncate(size)
+        self._map()
+        self.rows = 0
+
+    def _open_existing(self):
+        with open(self.path, "rb") as f:
+            magic, capacity, ncols, rows, meta_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a recorder file")
+            self.columns = json.loads(f.read(meta_size))["columns"]
+        self.capacity = capacity
+        self.header_size = HEADER.size + meta_size
+        self.header_size += -self.header_size % 8
+        self._map()
+        self.rows = rows
+
+    def _map(self):
+        self._file = open(self.path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._data = memoryview(self._mmap)[self.header_size:].cast("d")
+
+    def _column(self, i):
+        """Slice of column i (0 = timestamp) inside the mapped file."""
+        return self._data[i * self.capacity:(i + 1) * self.capacity]
+
+    def record(self, sample):
+        """Buffer one sample {'timestamp', 'values'}; usable as a scan listener."""
+        row = [math.nan] * (len(self.columns) + 1)
+        row[0] = sample["timestamp"]
+        for key, value in sample["values"].items():
+            i = self._index.get(key)
+            if i is not None and isinstance(value, (int, float)):
+                row[i + 1] = float(value)
+        with self._lock:
+            self._pending.append(row)
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows column by column and update the header."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return
+            if len(rows) > self.capacity:
+                self.rows += len(rows) - self.capacity
+                rows = rows[-self.capacity:]
+            start = self.rows % self.capacity
+            first = min(len(rows), self.capacity - start)
+            for i in range(len(self.columns) + 1):
+                column = self._column(i)
+                values = array("d", (row[i] for row in rows))
+                column[start:start + first] = values[:first]
+                if first < len(values):
+                    column[:len(values) - first] = values[first:]
+            self.rows += len(rows)
+            struct.pack_into("<Q", self._mmap, 24, self.rows)
+
+    def read(self, last=None):
+        """Return {'timestamp': [...], register: [...]} in chronological order."""
+        self.flush()
+        with self._lock:
+            count = min(self.rows, self.capacity)
+            if last is not None:
+                count = min(count, last)
+            end = self.rows % self.capacity
+            if self.rows < self.capacity:
+                order = range(end - count, end)
+            else:
+                order = [(end - count + i) % self.capacity for i in range(count)]
+            names = ["timestamp"] + self.columns
+            data = {}
+            for i, name in enumerate(names):
+                column = self._column(i)
+                data[name] = [column[j] for j in order]
+        return data
+
+    def _close_map(self):
+        self._data.release()
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+    def close(self):
+        self.flush()
+        self._close_map()
+
+
+class ParquetRecorder:
+    """
+    Compressed columnar store as Parquet row groups (requires pyarrow).
+
+    Every flush appends one row group with a timestamp column and one float64
+    column per register.
+    """
+
+    def __init__(self, path, columns, batch_size=3600, flush_interval=300.0,
+                 compression="zstd"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.schema = pa.schema([("timestamp", pa.float64())] +
+                                [(name, pa.float64()) for name in self.columns])
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, sample):
+        row = [sample["timestamp"]]
+        for name in self.columns:
+            value = sample["values"].get(name)
+            row.append(float(value) if isinstance(value, (int, float)) else None)
+        with self._lock:
+            self._pending.append(row)
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return
+            table = self._pa.Table.from_arrays(
+                [self._pa.array(column, type=self._pa.float64()) for column in zip(*rows)],
+                schema=self.schema)
+            self._writer.write_table(table)
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+def open_recorder(path, columns, **kwargs):
+    """Parquet for *.parquet paths, memory-mapped ring buffer otherwise."""
+    if path.endswith(".parquet"):
+        return ParquetRecorder(path, columns, **kwargs)
+    return RingRecorder(path, columns, **kwargs)
+
+
+def main():
+    """Export a ring file to CSV: python recorder.py file.ring [last_rows]."""
+    if len(sys.argv) < 2:
+        print("Usage: python recorder.py <file.ring> [last_rows]")
+        return
+    recorder = RingRecorder(sys.argv[1])
+    data = recorder.read(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    names = list(data)
+    print(",".join(names))
+    for row in zip(*(data[name] for name in names)):
+        print(",".join("" if math.isnan(v) else repr(v) for v in row))
+    recorder.close()
+
+
+if __name__ == "__main__":
+    main()
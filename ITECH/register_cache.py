@@ -0,0 +1,144 @@
+# Cache de leitura à frente do cliente Modbus: TTL por classe de registo e pedidos coalescidos
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from register_index import get_index
+
+TTL_FACTOR = 0.5       # um valor é fresco durante meio período de scan da sua classe
+CONFIG_TTL = 300.0     # registos de configuração (só mudam pelas nossas escritas)
+
+
+@lru_cache(maxsize=None)
+def address_ttl(address):
+    """TTL [s] of one word address, from the rate class of the register(s) that contain it."""
+    from scan_scheduler import RATE_CLASSES, rate_class
+    entries = get_index().at(address)
+    if not entries:
+        return RATE_CLASSES["fast"] * TTL_FACTOR   # endereço fora dos dicionários
+    ttls = [CONFIG_TTL if entry["kind"] == "w" else
+            RATE_CLASSES[rate_class(entry["key"], entry["info"])] * TTL_FACTOR
+            for entry in entries]
+    return min(ttls)
+
+
+class CachedResponse:
+    """Minimal stand-in for a pymodbus read response served from the cache."""
+
+    def __init__(self, registers):
+        self.registers = registers
+
+    def isError(self):
+        return False
+
+    def __repr__(self):
+        return f"CachedResponse({self.registers})"
+
+
+class CachedClient:
+    """
+    Read-through cache in front of a Modbus client (DeviceClient or ModbusTcpClient).
+
+    read_holding_registers is answered from the cache when every requested
+    word is younger than its TTL (address_ttl, or max_age if given); otherwise
+    one wire request is made and concurrent callers asking for the same range
+    wait for it instead of sending their own (single flight). Successful
+    reads refresh the cached words; writes drop them, so the next read (e.g.
+    a write verification) goes to the device. Other attributes are passed
+    through to the wrapped client.
+
+    The cache serves ad-hoc reads (user commands, write verification).
+    Acquisition loops (ScanScheduler, the passive listener) read through
+    read_fresh, because a cached word would be stamped and accounted as a
+    new sample.
+    """
+
+    def __init__(self, client, ttl=address_ttl):
+        self.client = client
+        self.ttl = ttl
+        self.words = {}        # (slave, endereço) -> (instante, palavra)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._in_flight = {}   # (slave, endereço, count) -> Future
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def cached(self, address, count=1, slave=1, max_age=None, now=None):
+        """Cached words of a range if they are all fresh, else None."""
+        now = time.monotonic() if now is None else now
+        words = []
+        with self._lock:
+            for a in range(address, address + count):
+                entry = self.words.get((slave, a))
+                limit = self.ttl(a) if max_age is None else max_age
+                if entry is None or now - entry[0] > limit:
+                    return None
+                words.append(entry[1])
+        return words
+
+    def store(self, address, words, slave=1, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for i, word in enumerate(words):
+                self.words[(slave, address + i)] = (now, word)
+
+    def invalidate(self, address=None, count=1, slave=1):
+        """Drop cached words (all of them if address is None)."""
+        with self._lock:
+            if address is None:
+                self.words.clear()
+                return
+            for a in range(address, address + count):
+                self.words.pop((slave, a), None)
+
+    def read_holding_registers(self, address, count=1, slave=1, max_age=None, **kwargs):
+        words = self.cached(address, count, slave, max_age)
+        if words is not None:
+            self.hits += 1
+            return CachedResponse(words)
+
+        flight = (slave, address, count)
+        with self._lock:
+            future = self._in_flight.get(flight)
+            leader = future is None
+            if leader:
+                future = self._in_flight[flight] = Future()
+        if not leader:
+            self.coalesced += 1
+            return future.result()
+
+        self.misses += 1
+        try:
+            result = self.client.read_holding_registers(
+                address=address, count=count, slave=slave, **kwargs)
+            if not result.isError():
+                self.store(address, list(result.registers[:count]), slave)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[flight]
+
+    def read_fresh(self, address, count=1, slave=1, **kwargs):
+        """Read from the device regardless of the cache (still coalesced)."""
+        return self.read_holding_registers(address, count, slave, max_age=0, **kwargs)
+
+    def write_register(self, address, value, slave=1, **kwargs):
+        result = self.client.write_register(address=address, value=value, slave=slave, **kwargs)
+        self.invalidate(address, 1, slave)
+        return result
+
+    def write_registers(self, address, values, slave=1, **kwargs):
+        result = self.client.write_registers(address=address, values=values, slave=slave, **kwargs)
+        self.invalidate(address, len(values), slave)
+        return result
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                "words": len(self.words)}
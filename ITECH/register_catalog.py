@@ -0,0 +1,215 @@
+# Gerado por register_catalog_build.py a partir de saj-modbus-h2.xlsx -- não editar à mão.
+from bisect import bisect_right
+
+SOURCE_FILE = 'saj-modbus-h2.xlsx'
+SOURCE_SHA256 = '715da22de89e97dbfa06c13e9922ba086caed5eb526bc30490d28c7012bc91e2'
+
+# (address, size, key, name, unit, datatype, scale, attribute, description), ordenado por endereço
+REGISTERS = (
+    (16388, 1, 'MPVMode', 'MPVMode', '', 'UInt16', 1, 'R', 'Inverter working mode'),
+    (16389, 2, 'HfaultMSG', 'HfaultMSG', '', 'UInt32', 1, 'R', 'Display board/slave error message'),
+    (16391, 2, 'MfaultMSG', 'MfaultMSG', '', 'UInt32', 1, 'R', 'Master controller error message'),
+    (16393, 2, 'MFaultMSG2', 'MFaultMSG2', '', 'UInt32', 1, 'R', 'Master controller error message 2'),
+    (16399, 1, 'Error_Count', 'Error_Count', '', 'UInt16', 1, 'R', 'Number of inverter error warning message'),
+    (16400, 1, 'SinkTemp [℃]', 'SinkTemp', '℃', 'Int16', 0.1, 'R', 'Temperature of radiator'),
+    (16401, 1, 'AmbTemp [℃]', 'AmbTemp', '℃', 'Int16', 0.1, 'R', 'Environment temperature'),
+    (16402, 1, 'GFCI [mA]', 'GFCI', 'mA', 'Int16', 1, 'R', 'Electric leakage to the flood'),
+    (16403, 1, 'ISO1 [kΩ]', 'ISO1', 'kΩ', 'UInt16', 1, 'R', 'PV1+_ISO'),
+    (16404, 1, 'ISO2 [kΩ]', 'ISO2', 'kΩ', 'UInt16', 1, 'R', 'PV2+_ISO'),
+    (16405, 1, 'ISO3 [kΩ]', 'ISO3', 'kΩ', 'UInt16', 1, 'R', 'PV3+_ISO'),
+    (16406, 1, 'ISO4 [kΩ]', 'ISO4', 'kΩ', 'UInt16', 1, 'R', 'PV ISO'),
+    (16409, 1, 'ConnTime [S]', 'ConnTime', 'S', 'UInt16', 1, 'R', 'Countdown for grid connection'),
+    (16410, 1, 'ErrorDataSN', 'ErrorDataSN', '', 'UInt16', 1, 'R', 'Serial number of the fault recording area'),
+    (16411, 1, 'SettingDataSN', 'SettingDataSN', '', 'UInt16', 1, 'R', 'Serial number of the parameter setting area'),
+    (16418, 1, 'SetAppMode', 'SetAppMode', '', 'Int16', 1, 'R', 'Inverter sets the application mode'),
+    (16423, 1, 'BatStatusDisp', 'BatStatusDisp', '', 'UInt16', 1, 'R', 'Battery working status'),
+    (16424, 1, 'BatProtocolSet', 'BatProtocolSet', '', 'Int16', 1, 'R', 'Battery protocol'),
+    (16425, 1, 'BatChgSocUpLimit [%]', 'BatChgSocUpLimit', '%', 'Int16', 1, 'R', 'Battery set SOC_H'),
+    (16426, 1, 'BatDisSocDowLimit [%]', 'BatDisSocDowLimit', '%', 'Int16', 1, 'R', 'Battery set SOC_L'),
+    (16427, 1, 'BatDODSet [%]', 'BatDODSet', '%', 'Int16', 1, 'R', 'Set battery DOD'),
+    (16428, 1, 'BatResSoc [%]', 'BatResSoc', '%', 'Int16', 1, 'R', 'Set the reserved SOC value of the battery'),
+    (16432, 1, 'MeterModeSet', 'MeterModeSet', '', 'Int16', 1, 'R', 'Meter mode which was set'),
+    (16433, 1, 'RGridVolt [V]', 'RGridVolt', 'V', 'UInt16', 0.1, 'R', 'R phase grid'),
+    (16434, 1, 'RGridCurr [A]', 'RGridCurr', 'A', 'Int16', 0.01, 'R', 'R phase grid current'),
+    (16435, 1, 'RGridFreq [Hz]', 'RGridFreq', 'Hz', 'UInt16', 0.01, 'R', 'R phase grid frequency'),
+    (16436, 1, 'RGridDCI [mA]', 'RGridDCI', 'mA', 'Int16', 1, 'R', 'R phase grid DC component'),
+    (16437, 1, 'RGridPowerWatt [W]', 'RGridPowerWatt', 'W', 'Int16', 1, 'R', 'R phase grid active power'),
+    (16438, 1, 'RGridPowerVA [W]', 'RGridPowerVA', 'W', 'UInt16', 1, 'R', 'R phase grid apparent power'),
+    (16439, 1, 'RGridPowerPF', 'RGridPowerPF', '', 'Int16', 0.001, 'R', 'R phase grid power factor'),
+    (16440, 1, 'SGridVolt [V]', 'SGridVolt', 'V', 'UInt16', 0.1, 'R', 'S-phase grid voltage'),
+    (16441, 1, 'SGridCurr [A]', 'SGridCurr', 'A', 'Int16', 0.01, 'R', 'S-phase grid current'),
+    (16442, 1, 'SGridFreq [Hz]', 'SGridFreq', 'Hz', 'UInt16', 0.01, 'R', 'S-phase grid frequency'),
+    (16443, 1, 'SGridDCI [mA]', 'SGridDCI', 'mA', 'Int16', 1, 'R', 'S-phase grid DC component'),
+    (16444, 1, 'SGridPowerWatt [W]', 'SGridPowerWatt', 'W', 'Int16', 1, 'R', 'S-phase grid active power'),
+    (16445, 1, 'SGridPowerVA [W]', 'SGridPowerVA', 'W', 'UInt16', 1, 'R', 'Apparent power of S-phase grid'),
+    (16446, 1, 'SGridPowerPF', 'SGridPowerPF', '', 'Int16', 0.001, 'R', 'S-phase grid power factor'),
+    (16447, 1, 'TGridVolt [V]', 'TGridVolt', 'V', 'UInt16', 0.1, 'R', 'T phase grid voltage'),
+    (16448, 1, 'TGridCurr [A]', 'TGridCurr', 'A', 'Int16', 0.01, 'R', 'T-phase grid current'),
+    (16449, 1, 'TGridFreq [Hz]', 'TGridFreq', 'Hz', 'UInt16', 0.01, 'R', 'T-phase grid frequency'),
+    (16450, 1, 'TGridDCI [mA]', 'TGridDCI', 'mA', 'Int16', 1, 'R', 'Dc component of T-phase grid'),
+    (16451, 1, 'TGridPowerWatt [W]', 'TGridPowerWatt', 'W', 'Int16', 1, 'R', 'T phase grid active power'),
+    (16452, 1, 'TGridPowerVA [W]', 'TGridPowerVA', 'W', 'UInt16', 1, 'R', 'Apparent power of T-phase grid'),
+    (16453, 1, 'TGridPowerPF', 'TGridPowerPF', '', 'Int16', 0.001, 'R', 'T-phase grid power factor'),
+    (16454, 1, 'RInvVolt [V]', 'RInvVolt', 'V', 'UInt16', 0.1, 'R', 'R phase inverter voltage'),
+    (16455, 1, 'RInvCurr [A]', 'RInvCurr', 'A', 'Int16', 0.01, 'R', 'R phase inverse current'),
+    (16456, 1, 'RInvFreq [Hz]', 'RInvFreq', 'Hz', 'UInt16', 0.01, 'R', 'R phase inverter'),
+    (16457, 1, 'RInvPowerWatt [W]', 'RInvPowerWatt', 'W', 'Int16', 1, 'R', 'R phase inverting active power'),
+    (16458, 1, 'RInvPowerVA [VA]', 'RInvPowerVA', 'VA', 'UInt16', 1, 'R', 'R phase inverting apparent power'),
+    (16459, 1, 'SInvVolt [V]', 'SInvVolt', 'V', 'UInt16', 0.1, 'R', 'S phase inverter voltage'),
+    (16460, 1, 'SInvCurr [A]', 'SInvCurr', 'A', 'Int16', 0.01, 'R', 'S phase inverter current'),
+    (16461, 1, 'SInvFreq [Hz]', 'SInvFreq', 'Hz', 'UInt16', 0.01, 'R', 'S phase inverter frequency'),
+    (16462, 1, 'SInvPowerWatt [W]', 'SInvPowerWatt', 'W', 'Int16', 1, 'R', 'S-phase inverse active power'),
+    (16463, 1, 'SInvPowerVA [VA]', 'SInvPowerVA', 'VA', 'UInt16', 1, 'R', 'S-phase inverting apparent power'),
+    (16464, 1, 'TInvVolt [V]', 'TInvVolt', 'V', 'UInt16', 0.1, 'R', 'T phase inverting voltage'),
+    (16465, 1, 'TInvCurr [A]', 'TInvCurr', 'A', 'Int16', 0.01, 'R', 'T phase inverse current'),
+    (16466, 1, 'TInvFreq [Hz]', 'TInvFreq', 'Hz', 'UInt16', 0.01, 'R', 'T-phase inverting frequency'),
+    (16467, 1, 'TInvPowerWatt [W]', 'TInvPowerWatt', 'W', 'Int16', 1, 'R', 'T phase inverting active power'),
+    (16468, 1, 'TInvPowerVA [VA]', 'TInvPowerVA', 'VA', 'UInt16', 1, 'R', 'T-phase inverting apparent power'),
+    (16469, 1, 'ROutVolt [V]', 'ROutVolt', 'V', 'UInt16', 0.1, 'R', 'R phase output voltage'),
+    (16470, 1, 'ROutCurr [A]', 'ROutCurr', 'A', 'UInt16', 0.01, 'R', 'R phase output current'),
+    (16471, 1, 'ROutFreq [Hz]', 'ROutFreq', 'Hz', 'UInt16', 0.01, 'R', 'R phase output frequency'),
+    (16472, 1, 'ROutDVI [mV]', 'ROutDVI', 'mV', 'Int16', 1, 'R', 'R phase output voltage DC component'),
+    (16473, 1, 'ROutPowerWatt [W]', 'ROutPowerWatt', 'W', 'UInt16', 1, 'R', 'The R phase outputs active power'),
+    (16474, 1, 'ROutPowerVA [VA]', 'ROutPowerVA', 'VA', 'UInt16', 1, 'R', 'R phase output apparent power'),
+    (16475, 1, 'SOutVolt [V]', 'SOutVolt', 'V', 'UInt16', 0.1, 'R', 'S phase output voltage'),
+    (16476, 1, 'SOutCurr [A]', 'SOutCurr', 'A', 'UInt16', 0.01, 'R', 'S phase output current'),
+    (16477, 1, 'SOutFreq [Hz]', 'SOutFreq', 'Hz', 'UInt16', 0.01, 'R', 'S phase output frequency'),
+    (16478, 1, 'SOutDVI [mV]', 'SOutDVI', 'mV', 'Int16', 1, 'R', 'S phase output'),
+    (16479, 1, 'SOutPowerWatt [W]', 'SOutPowerWatt', 'W', 'UInt16', 1, 'R', 'S phase output active power'),
+    (16480, 1, 'SOutPowerVA [VA]', 'SOutPowerVA', 'VA', 'UInt16', 1, 'R', 'S-phase output apparent power'),
+    (16481, 1, 'TOutVolt [V]', 'TOutVolt', 'V', 'UInt16', 0.1, 'R', 'T phase output voltage'),
+    (16482, 1, 'TOutCurr [A]', 'TOutCurr', 'A', 'UInt16', 0.01, 'R', 'T phase output current'),
+    (16483, 1, 'TOutFreq [Hz]', 'TOutFreq', 'Hz', 'UInt16', 0.01, 'R', 'T phase output frequency'),
+    (16484, 1, 'TOutDVI [mV]', 'TOutDVI', 'mV', 'Int16', 1, 'R', 'T phase output voltage DC component'),
+    (16485, 1, 'TOutPowerWatt [W]', 'TOutPowerWatt', 'W', 'UInt16', 1, 'R', 'T phase output active power'),
+    (16486, 1, 'TOutPowerVA [VA]', 'TOutPowerVA', 'VA', 'UInt16', 1, 'R', 'T phase output apparent power'),
+    (16487, 1, 'BusVoltMaster [V]', 'BusVoltMaster', 'V', 'UInt16', 0.1, 'R', 'Host BUS voltage'),
+    (16488, 1, 'BusVoltSlave [V]', 'BusVoltSlave', 'V', 'UInt16', 0.1, 'R', 'Slave BUS voltage'),
+    (16489, 1, 'BatVolt [V]', 'BatVolt', 'V', 'UInt16', 0.1, 'R', 'The battery voltage'),
+    (16490, 1, 'BatCurr [A]', 'BatCurr', 'A', 'Int16', 0.01, 'R', 'The battery current'),
+    (16491, 1, 'BatCurr1 [A]', 'BatCurr1', 'A', 'Int16', 0.01, 'R', 'Battery controller 1 Current'),
+    (16492, 1, 'BatCurr2 [A]', 'BatCurr2', 'A', 'Int16', 0.01, 'R', 'Battery controller 2 Current'),
+    (16493, 1, 'BatPower [W]', 'BatPower', 'W', 'Int16', 1, 'R', 'The battery power'),
+    (16494, 1, 'BatTempC [℃]', 'BatTempC', '℃', 'Int16', 0.1, 'R', 'Battery temperature'),
+    (16495, 1, 'BatEnergyPercent [%]', 'BatEnergyPercent', '%', 'UInt16', 0.01, 'R', 'Battery electri'),
+    (16497, 1, 'PV1Volt [V]', 'PV1Volt', 'V', 'UInt16', 0.1, 'R', 'PV1 voltage'),
+    (16498, 1, 'PV1Curr [A]', 'PV1Curr', 'A', 'UInt16', 0.01, 'R', 'Total current PV1'),
+    (16499, 1, 'PV1Power [W]', 'PV1Power', 'W', 'UInt16', 1, 'R', 'PV1 power'),
+    (16500, 1, 'PV2Volt [V]', 'PV2Volt', 'V', 'UInt16', 0.1, 'R', 'PV2 voltage'),
+    (16501, 1, 'PV2Curr [A]', 'PV2Curr', 'A', 'UInt16', 0.01, 'R', 'Total current PV2'),
+    (16502, 1, 'PV2Power [W]', 'PV2Power', 'W', 'UInt16', 1, 'R', 'PV2 power'),
+    (16503, 1, 'PV3Volt [V]', 'PV3Volt', 'V', 'UInt16', 0.1, 'R', 'PV3 voltage'),
+    (16504, 1, 'PV3Curr [A]', 'PV3Curr', 'A', 'UInt16', 0.01, 'R', 'PV3 total current'),
+    (16505, 1, 'PV3Power [W]', 'PV3Power', 'W', 'UInt16', 1, 'R', 'PV3 power'),
+    (16506, 1, 'PV4Volt [V]', 'PV4Volt', 'V', 'UInt16', 0.1, 'R', 'PV4 voltage'),
+    (16507, 1, 'PV4Curr [A]', 'PV4Curr', 'A', 'UInt16', 0.01, 'R', 'PV4 total current'),
+    (16508, 1, 'PV4Power [W]', 'PV4Power', 'W', 'UInt16', 1, 'R', 'PV4 power'),
+    (16525, 1, 'ROnGridOutVolt [V]', 'ROnGridOutVolt', 'V', 'UInt16', 0.1, 'R', 'R phase grid-connected side voltage'),
+    (16526, 1, 'ROnGridOutCurr [A]', 'ROnGridOutCurr', 'A', 'UInt16', 0.01, 'R', 'Side current of R phase grid-connected'),
+    (16527, 1, 'ROnGridOutFreq [Hz]', 'ROnGridOutFreq', 'Hz', 'UInt16', 0.01, 'R', 'Side frequency of R phase grid-connected'),
+    (16528, 1, 'ROnGridOutPowerWatt [W]', 'ROnGridOutPowerWatt', 'W', 'UInt16', 1, 'R', 'Side active power of R phase grid-connected'),
+    (16529, 1, 'SOnGridOutVolt [A]', 'SOnGridOutVolt', 'A', 'UInt16', 0.01, 'R', 'Side voltage of S phase grid-connected'),
+    (16530, 1, 'SOnGridOutPowerWatt [W]', 'SOnGridOutPowerWatt', 'W', 'UInt16', 1, 'R', 'Side active power of S phase on the grid-connected'),
+    (16531, 1, 'TOnGridOutVolt [A]', 'TOnGridOutVolt', 'A', 'UInt16', 0.01, 'R', 'T phase grid-connected side voltage'),
+    (16532, 1, 'TOnGridOutPowerWatt [W]', 'TOnGridOutPowerWatt', 'W', 'UInt16', 1, 'R', 'T active power on the grid-connected side'),
+    (16533, 1, 'PV_direction', 'PV_direction', '', 'UInt16', 1, 'R', 'PV Direction of energy flow'),
+    (16534, 1, 'Battery_direction', 'Battery_direction', '', 'Int16', 1, 'R', 'Direction of battery energy flow'),
+    (16535, 1, 'Grid_direction', 'Grid_direction', '', 'Int16', 1, 'R', 'Direction of grid energy flow'),
+    (16536, 1, 'OutPut_direction', 'OutPut_direction', '', 'UInt16', 1, 'R', 'Direction of energy flow from output to load'),
+    (16544, 1, 'SysTotalLoadWatt [W]', 'SysTotalLoadWatt', 'W', 'Int16', 1, 'R', 'The total system load consumes power'),
+    (16545, 1, 'CT_GridPowerWatt [W]', 'CT_GridPowerWatt', 'W', 'Int16', 1, 'R', 'CT real power of the grid'),
+    (16546, 1, 'CT_GridPowerVA [VA]', 'CT_GridPowerVA', 'VA', 'Int16', 1, 'R', 'CT Apparent power of the grid'),
+    (16547, 1, 'CT_PVPowerWatt [W]', 'CT_PVPowerWatt', 'W', 'Int16', 1, 'R', 'CT PV real power'),
+    (16548, 1, 'CT_PVPowerVA [VA]', 'CT_PVPowerVA', 'VA', 'Int16', 1, 'R', 'CT PV Apparent power'),
+    (16549, 1, 'TotalPVPower [W]', 'TotalPVPower', 'W', 'Int16', 1, 'R', 'PV total power'),
+    (16550, 1, 'TotalBatteryPower [W]', 'TotalBatteryPower', 'W', 'Int16', 1, 'R', 'Battery total power'),
+    (16551, 1, 'TotalGridPowerWatt [W]', 'TotalGridPowerWatt', 'W', 'Int16', 1, 'R', 'Grid total real power'),
+    (16552, 1, 'TotalGridPowerVA [VA]', 'TotalGridPowerVA', 'VA', 'Int16', 1, 'R', 'Grid total apparent power'),
+    (16553, 1, 'TotalInvPowerWatt [W]', 'TotalInvPowerWatt', 'W', 'Int16', 1, 'R', 'Inverter total real power'),
+    (16554, 1, 'TotalInvPowerVA [VA]', 'TotalInvPowerVA', 'VA', 'Int16', 1, 'R', 'Inverter total apparent power'),
+    (16555, 1, 'BackupTotalLoadPowerWatt [W]', 'BackupTotalLoadPowerWatt', 'W', 'UInt16', 1, 'R', 'Backup total load real power'),
+    (16556, 1, 'BackupTotalLoadPowerVA [VA]', 'BackupTotalLoadPowerVA', 'VA', 'UInt16', 1, 'R', 'Backup total load apparent power'),
+    (16557, 1, 'SysGridPowerWall [W]', 'SysGridPowerWall', 'W', 'Int16', 1, 'R', 'Gird system real power'),
+    (16572, 1, 'Today_Hour [H]', 'Today_Hour', 'H', 'UInt16', 0.1, 'R', 'PV Grid-connected day generation time'),
+    (16573, 2, 'Total_Hour [H]', 'Total_Hour', 'H', 'UInt32', 0.1, 'R', 'PV Total grid-connected generation time'),
+    (16575, 2, 'Today_PV_Energy [Kwh]', 'Today_PV_Energy', 'Kwh', 'UInt32', 0.01, 'R', 'PV daily output'),
+    (16577, 2, 'Month_PV_Energy [Kwh]', 'Month_PV_Energy', 'Kwh', 'UInt32', 0.01, 'R', 'PV monthly output'),
+    (16579, 2, 'Year_PV_Energy [Kwh]', 'Year_PV_Energy', 'Kwh', 'UInt32', 0.01, 'R', 'PV annual output'),
+    (16581, 2, 'Total_PV_Energy [Kwh]', 'Total_PV_Energy', 'Kwh', 'UInt32', 0.01, 'R', 'PV total output'),
+    (16583, 2, 'Today_BatChgEnergy [Kwh]', 'Today_BatChgEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Daily battery charge'),
+    (16585, 2, 'Month_BatChgEnergy [Kwh]', 'Month_BatChgEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly battery charge'),
+    (16587, 2, 'Year_BatChgEnergy [Kwh]', 'Year_BatChgEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Annual battery charge'),
+    (16589, 2, 'Total_BatChgEnergy [Kwh]', 'Total_BatChgEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total battery charge'),
+    (16591, 2, 'Today_BatDisEnergy [Kwh]', 'Today_BatDisEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Daily battery discharge quantity'),
+    (16593, 2, 'Month_BatDisEnergy [kwh]', 'Month_BatDisEnergy', 'kwh', 'UInt32', 0.01, 'R', 'Monthly battery discharge quantity'),
+    (16595, 2, 'Year_BatDisEnergy [Kwh]', 'Year_BatDisEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Annual battery discharge quantity'),
+    (16597, 2, 'Total_BatDisEnergy [Kwh]', 'Total_BatDisEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total battery discharge power'),
+    (16599, 2, 'Today_InvGenEnergy [Kwh]', 'Today_InvGenEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Daily inverse electricity'),
+    (16601, 2, 'Month_InvGenEnergy [Kwh]', 'Month_InvGenEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly inverse electricity'),
+    (16603, 2, 'Year_InvGenEnergy [kwh]', 'Year_InvGenEnergy', 'kwh', 'UInt32', 0.01, 'R', 'Annual inverse electricity'),
+    (16605, 2, 'Total_InvGenEnergy [Kwh]', 'Total_InvGenEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total inverse power'),
+    (16607, 2, 'Today_TotalLoadEnergy [Kwh]', 'Today_TotalLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total daily load power consumption'),
+    (16609, 2, 'Month_TotalLoadEnergy [Kwh]', 'Month_TotalLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total monthly load power consumption'),
+    (16611, 2, 'Year_TotalLoadEnergy [Kwh]', 'Year_TotalLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Annual total load power consumption'),
+    (16613, 2, 'Total_TotalLoadEnergy [Kwh]', 'Total_TotalLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total load consumes power'),
+    (16615, 2, 'Today_BackupLoadEnergy [Kwh]', 'Today_BackupLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'BackUp daily load consumes power'),
+    (16617, 2, 'Month_BackupLoadEnergy [Kwh]', 'Month_BackupLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'BackUp monthly load consumes power'),
+    (16619, 2, 'Year_BackupLoadEnergy [Kwh]', 'Year_BackupLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'BackUp annual load consumes power'),
+    (16621, 2, 'Total_BackupLoadEnergy [Kwh]', 'Total_BackupLoadEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'BackUp total load consumes power'),
+    (16623, 2, 'Today_SellEnergy [kwh]', 'Today_SellEnergy', 'kwh', 'UInt32', 0.01, 'R', 'Daily system sells electricity'),
+    (16625, 2, 'Month_SellEnergy [Kwh]', 'Month_SellEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly system sells electricity'),
+    (16627, 2, 'Year_SellEnergy [Kwh]', 'Year_SellEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Annual system sells electricity'),
+    (16629, 2, 'Total_SellEnergy [Kwh]', 'Total_SellEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total system sells electricity'),
+    (16631, 2, 'Today_FeedInEnergy [Kwh]', 'Today_FeedInEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Daily system buys electricity'),
+    (16633, 2, 'Month_FeedInEnergy [Kwh]', 'Month_FeedInEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly system buys electricity'),
+    (16635, 2, 'Year_FeedInEnergy [Kwh]', 'Year_FeedInEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Annual system buys electricity'),
+    (16637, 2, 'Total_FeedInEnergy [Kwh]', 'Total_FeedInEnergy', 'Kwh', 'UInt32', 0.01, 'R', 'Total system buys electricity'),
+    (16695, 2, 'Today_PV_Energy2 [Kwh]', 'Today_PV_Energy2', 'Kwh', 'UInt32', 0.01, 'R', 'Daily PV2 Power generation'),
+    (16697, 2, 'Month_PV_Energy2 [Kwh]', 'Month_PV_Energy2', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly PV2 Power generation'),
+    (16699, 2, 'Year_PV_Energy2 [Kwh]', 'Year_PV_Energy2', 'Kwh', 'UInt32', 0.01, 'R', 'Annual PV2 Power generation'),
+    (16701, 2, 'Total_PV_Energy2 [Kwh]', 'Total_PV_Energy2', 'Kwh', 'UInt32', 0.01, 'R', 'Total PV2 Power generation'),
+    (16703, 2, 'Today_PV_Energy3 [Kwh]', 'Today_PV_Energy3', 'Kwh', 'UInt32', 0.01, 'R', 'Daily PV3 Power generation'),
+    (16705, 2, 'Month_PV_Energy3 [Kwh]', 'Month_PV_Energy3', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly PV3 Power generation'),
+    (16707, 2, 'Year_PV_Energy3 [Kwh]', 'Year_PV_Energy3', 'Kwh', 'UInt32', 0.01, 'R', 'Annual PV3 Power generation'),
+    (16709, 2, 'Total_PV_Energy3 [Kwh]', 'Total_PV_Energy3', 'Kwh', 'UInt32', 0.01, 'R', 'Total PV3 Power generation'),
+    (16711, 2, 'Today_SellEnergy2 [kwh]', 'Today_SellEnergy2', 'kwh', 'UInt32', 0.01, 'R', 'Daily amount of Grid2 electricity sold'),
+    (16713, 2, 'Month_SellEnergy2 [Kwh]', 'Month_SellEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly amount of Grid2 electricity sold'),
+    (16715, 2, 'Year_SellEnergy2 [Kwh]', 'Year_SellEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Annual amount of Grid2 electricity sold'),
+    (16717, 2, 'Total_SellEnergy2 [Kwh]', 'Total_SellEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Total amount of Grid2 electricity sold'),
+    (16719, 2, 'Today_SellEnergy3 [kwh]', 'Today_SellEnergy3', 'kwh', 'UInt32', 0.01, 'R', 'Daily amount of Grid3 electricity sold'),
+    (16721, 2, 'Month_SellEnergy3 [Kwh]', 'Month_SellEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly amount of Grid3 electricity sold'),
+    (16723, 2, 'Year_SellEnergy3 [Kwh]', 'Year_SellEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Annual amount of Grid3 electricity sold'),
+    (16725, 2, 'Total_SellEnergy3 [Kwh]', 'Total_SellEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Total amount of Grid3 electricity sold'),
+    (16727, 2, 'Today_FeedInEnergy2 [Kwh]', 'Today_FeedInEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Daily amount of Grid2 electricity bought'),
+    (16729, 2, 'Month_FeedInEnergy2 [Kwh]', 'Month_FeedInEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly amount of Grid2 electricity bought'),
+    (16731, 2, 'Year_FeedInEnergy2 [Kwh]', 'Year_FeedInEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Annual amount of Grid2 electricity bought'),
+    (16733, 2, 'Total_FeedInEnergy2 [Kwh]', 'Total_FeedInEnergy2', 'Kwh', 'UInt32', 0.01, 'R', 'Total amount of Grid2 electricity bought'),
+    (16735, 2, 'Today_FeedInEnergy3 [Kwh]', 'Today_FeedInEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Daily amount of Grid3 electricity bought'),
+    (16737, 2, 'Month_FeedInEnergy3 [Kwh]', 'Month_FeedInEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Monthly amount of Grid3 electricity bought'),
+    (16739, 2, 'Year_FeedInEnergy3 [Kwh]', 'Year_FeedInEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Annual amount of Grid3 electricity'),
+    (16741, 2, 'Total_FeedInEnergy3 [Kwh]', 'Total_FeedInEnergy3', 'Kwh', 'UInt32', 0.01, 'R', 'Total amount of Grid3 electricity bought'),
+    (16743, 2, 'Sum FeedIn Today [Kwh]', 'Sum FeedIn Today', 'Kwh', 'UInt32', 0.01, 'R', 'Sum of all phases Note: These register are not listed in the official PDF document of SAJ.'),
+    (16745, 2, 'Sum FeedIn Month [Kwh]', 'Sum FeedIn Month', 'Kwh', 'UInt32', 0.01, 'R', ''),
+    (16747, 2, 'Sum FeedIn Year [Kwh]', 'Sum FeedIn Year', 'Kwh', 'UInt32', 0.01, 'R', ''),
+    (16749, 2, 'Sum FeedIn Total [Kwh]', 'Sum FeedIn Total', 'Kwh', 'UInt32', 0.01, 'R', ''),
+    (16751, 2, 'Sum Sell Today [Kwh]', 'Sum Sell Today', 'Kwh', 'UInt32', 0.01, 'R', ''),
+    (16753, 2, 'Sum Sell Month [Kwh]', 'Sum Sell Month', 'Kwh', 'UInt32', 0.01, 'R', ''),
+    (16755, 2, 'Sum Sell Year [Kwh]', 'Sum Sell Year', 'Kwh', 'UInt32', 0.01, 'R', ''),
+    (16757, 2, 'Sum Sell Total [Kwh]', 'Sum Sell Total', 'Kwh', 'UInt32', 0.01, 'R', ''),
+)
+ADDRESSES = tuple(entry[0] for entry in REGISTERS)
+
+
+def find(address):
+    """Catalog entry containing a register address, or None."""
+    i = bisect_right(ADDRESSES, address) - 1
+    if i >= 0 and address < REGISTERS[i][0] + REGISTERS[i][1]:
+        return REGISTERS[i]
+    return None
+
+
+def as_register_dict():
+    """The catalog in the same format as read_registers."""
+    return {entry[2]: {"address": entry[0], "scale": entry[6], "size": entry[1],
+                        "datatype": entry[5]}
+            for entry in REGISTERS}
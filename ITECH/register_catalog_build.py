@@ -0,0 +1,223 @@
+# Compila saj-modbus-h2.xlsx no módulo register_catalog.py (passo de build, só biblioteca standard)
+import argparse
+import hashlib
+import os
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, "saj-modbus-h2.xlsx")
+TARGET = os.path.join(HERE, "register_catalog.py")
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+COLUMNS = {
+    "address": " Address Dez", "hex": "Address Hex", "size": "Size", "name": "Register Name",
+    "datatype": "Data Type", "ratio": "Ratio", "unit": "Unit", "attribute": "Attribute",
+    "description": "Register description",
+}
+DATATYPES = {"uint16": ("UInt16", 1), "int16": ("Int16", 1),
+             "uint32": ("UInt32", 2), "int32": ("Int32", 2)}
+SKIPPED_NAMES = ("", "Reserve", "Reserved")
+
+
+def source_hash(path=SOURCE):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_sheet(path=SOURCE):
+    """Read the first worksheet of an .xlsx file as a list of {header: text} rows."""
+    with zipfile.ZipFile(path) as z:
+        shared = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            for item in ET.fromstring(z.read("xl/sharedStrings.xml")).iter(NS + "si"):
+                shared.append("".join(t.text or "" for t in item.iter(NS + "t")))
+        sheet = ET.fromstring(z.read("xl/worksheets/sheet1.xml"))
+
+    table = []
+    for row in sheet.iter(NS + "row"):
+        cells = {}
+        for cell in row.iter(NS + "c"):
+            column = re.match(r"[A-Z]+", cell.get("r")).group()
+            value = cell.find(NS + "v")
+            if value is not None:
+                text = shared[int(value.text)] if cell.get("t") == "s" else value.text
+            else:
+                text = "".join(t.text or "" for t in cell.iter(NS + "t"))
+            cells[column] = text
+        table.append(cells)
+
+    header, rows = table[0], table[1:]
+    names = {column: (text or "") for column, text in header.items()}
+    return [{names.get(column, column): text for column, text in row.items()} for row in rows]
+
+
+def clean(text):
+    return " ".join((text or "").split())
+
+
+def compile_catalog(rows):
+    """
+    Validate the sheet rows and build the catalog entries, sorted by address.
+
+    Returns:
+        Tuple (entries, warnings, errors). Each entry is
+        (address, size, key, name, unit, datatype, scale, attribute, description).
+    """
+    entries, warnings, errors = [], [], []
+    for row in rows:
+        get = {field: row.get(column) for field, column in COLUMNS.items()}
+        name = clean(get["name"])
+        if name in SKIPPED_NAMES:
+            continue
+        try:
+            address = int(get["address"])
+            size = int(get["size"])
+        except (TypeError, ValueError):
+            errors.append(f"{name}: invalid address/size ({get['address']}, {get['size']})")
+            continue
+        if get["hex"] and int(get["hex"], 16) != address:
+            errors.append(f"{name}: hex address {get['hex']} does not match {address}")
+
+        datatype, width = DATATYPES.get(clean(get["datatype"]).lower(), (None, None))
+        if datatype is None:
+            warnings.append(f"{name}: unknown datatype '{get['datatype']}', skipped")
+            continue
+        if width != size:
+            warnings.append(f"{name}: {size} words of {datatype} is not a scalar register, skipped")
+            continue
+
+        ratio = int(get["ratio"]) if clean(get["ratio"]) else 0
+        scale = 10 ** ratio
+        unit = "".join((get["unit"] or "").split())   # ex.: 'k\nΩ' -> 'kΩ'
+        key = f"{name} [{unit}]" if unit else name
+        entries.append((address, size, key, name, unit, datatype, scale,
+                        clean(get["attribute"]) or "R", clean(get["description"])))
+
+    entries.sort()
+    keys = set()
+    for previous, entry in zip([None] + entries, entries):
+        if entry[2] in keys:
+            errors.append(f"{entry[2]}: duplicate register name")
+        keys.add(entry[2])
+        if previous is not None and entry[0] < previous[0] + previous[1]:
+            errors.append(f"{entry[2]} at {entry[0]} overlaps {previous[2]} at {previous[0]}")
+    return entries, warnings, errors
+
+
+TEMPLATE = '''# Gerado por register_catalog_build.py a partir de {source} -- não editar à mão.
+from bisect import bisect_right
+
+SOURCE_FILE = {source!r}
+SOURCE_SHA256 = {digest!r}
+
+# (address, size, key, name, unit, datatype, scale, attribute, description), ordenado por endereço
+REGISTERS = (
+{rows}
+)
+ADDRESSES = tuple(entry[0] for entry in REGISTERS)
+
+
+def find(address):
+    """Catalog entry containing a register address, or None."""
+    i = bisect_right(ADDRESSES, address) - 1
+    if i >= 0 and address < REGISTERS[i][0] + REGISTERS[i][1]:
+        return REGISTERS[i]
+    return None
+
+
+def as_register_dict():
+    """The catalog in the same format as read_registers."""
+    return {{entry[2]: {{"address": entry[0], "scale": entry[6], "size": entry[1],
+                        "datatype": entry[5]}}
+            for entry in REGISTERS}}
+'''
+
+
+def render(entries, digest, source=os.path.basename(SOURCE)):
+    rows = "\n".join(f"    {entry!r}," for entry in entries)
+    return TEMPLATE.format(source=source, digest=digest, rows=rows)
+
+
+def current_hash(target=TARGET):
+    """SOURCE_SHA256 of the generated module, read without importing it."""
+    if not os.path.exists(target):
+        return None
+    with open(target, encoding="utf-8") as f:
+        match = re.search(r"^SOURCE_SHA256 = '([0-9a-f]+)'", f.read(), re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def drift_report(entries, register_dict):
+    """Differences between a hand-written register dict and the catalog (same address)."""
+    by_address = {entry[0]: entry for entry in entries}
+    report = []
+    for key, reg_info in register_dict.items():
+        entry = by_address.get(reg_info["address"])
+        if entry is None:
+            continue
+        spec = {"size": entry[1], "datatype": entry[5], "scale": entry[6]}
+        for field, expected in spec.items():
+            actual = reg_info.get(field, "UInt16" if field == "datatype" else None)
+            if actual != expected:
+                report.append(f"{key} (Addr {reg_info['address']}): {field} {actual!r}, "
+                              f"spec says {expected!r} ({entry[2]})")
+    return report
+
+
+def register_drift(entries):
+    """drift_report of both hand-written dicts (read_registers, readwrite_registers)."""
+    from py_r_register import read_registers
+    from py_rw_registers import readwrite_registers
+    return drift_report(entries, read_registers) + drift_report(entries, readwrite_registers)
+
+
+def build(source=SOURCE, target=TARGET, force=False):
+    """Regenerate the catalog if the spreadsheet changed. Returns (entries, regenerated)."""
+    digest = source_hash(source)
+    entries, warnings, errors = compile_catalog(read_sheet(source))
+    for warning in warnings:
+        print(f"⚠️ {warning}")
+    if errors:
+        raise ValueError("Invalid register spreadsheet:\n" + "\n".join(errors))
+    if not force and current_hash(target) == digest:
+        return entries, False
+    with open(target, "w", encoding="utf-8") as f:
+        f.write(render(entries, digest, os.path.basename(source)))
+    return entries, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile saj-modbus-h2.xlsx into register_catalog.py")
+    parser.add_argument("--force", action="store_true", help="regenerate even if unchanged")
+    parser.add_argument("--check", action="store_true",
+                        help="only check that the catalog is up to date and the register "
+                             "dicts match it (exit 1 if not)")
+    parser.add_argument("--drift", action="store_true",
+                        help="compare the register dicts with the spec (exit 1 on drift)")
+    args = parser.parse_args()
+
+    if args.check:
+        stale = current_hash() != source_hash()
+        print("❌ register_catalog.py is stale" if stale else "✅ register_catalog.py is up to date")
+        entries, _, _ = compile_catalog(read_sheet())
+        drift = register_drift(entries)
+        for line in drift:
+            print(f"❌ {line}")
+        sys.exit(1 if stale or drift else 0)
+
+    entries, regenerated = build(force=args.force)
+    print(f"✅ {len(entries)} registers "
+          f"{'written to' if regenerated else 'unchanged in'} {os.path.basename(TARGET)}")
+
+    if args.drift:
+        drift = register_drift(entries)
+        for line in drift:
+            print(f"⚠️ {line}")
+        sys.exit(1 if drift else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Compila os dicionários de registos num plano de descodificação tipado (uma vez, no primeiro uso)
+import struct
+import time
+from array import array
+from functools import lru_cache
+from block_reader import plan_blocks, read_block
+from composite_types import COMPOSITES, decoder, encoder, is_composite
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+
+# Código struct (big-endian) para cada (nº de palavras, com sinal)
+_CODES = {
+    (1, False): "H", (1, True): "h",
+    (2, False): "I", (2, True): "i",
+    (4, False): "Q", (4, True): "q",
+}
+
+
+def field_code(reg_info):
+    """Return the struct format code used to decode a register."""
+    size = reg_info["size"]
+    data_type = reg_info.get("datatype", "UInt16")
+    signed = (data_type == "Int16" and size == 1) or (data_type == "Int32" and size == 2)
+    expected = COMPOSITES[data_type][0] if data_type in COMPOSITES else None
+    if expected is not None and size != expected:
+        raise ValueError(f"{data_type} registers are {expected} words, not {size}")
+    try:
+        return _CODES[(size, signed)]
+    except KeyError:
+        raise ValueError(f"Unsupported register size {size} ({data_type})")
+
+
+def is_raw(reg_info):
+    """HEX and composite registers are never scaled."""
+    return reg_info.get("datatype", "UInt16") == "HEX" or is_composite(reg_info)
+
+
+def compile_block(block, register_dict):
+    """
+    Attach a typed decode plan to a block returned by plan_blocks.
+
+    The plan stores, per register, the word offset, width, signedness and scale
+    as arrays, plus a single struct.Struct that decodes the whole block in one
+    unpack call. Blocks with overlapping registers fall back to one
+    unpack_from per register. Composite registers (composite_types) are
+    unpacked as unsigned integers and then converted by their decoder.
+    """
+    offsets, widths, signed, scales, raw, codes = (
+        array("H"), array("B"), array("B"), array("d"), array("B"), [])
+    keys = []
+    composites = []
+    for key, offset, size in block["registers"]:
+        reg_info = register_dict[key]
+        code = field_code(reg_info)
+        if is_composite(reg_info):
+            composites.append((len(keys), decoder(reg_info)))
+        keys.append(key)
+        offsets.append(offset)
+        widths.append(size)
+        signed.append(code.islower())
+        scales.append(1.0 if is_raw(reg_info) else reg_info["scale"])
+        raw.append(is_raw(reg_info))
+        codes.append(code)
+
+    fmt = ">"
+    position = 0
+    for offset, size, code in zip(offsets, widths, codes):
+        if offset < position:
+            fmt = None
+            break
+        if offset > position:
+            fmt += f"{2 * (offset - position)}x"
+        fmt += code
+        position = offset + size
+
+    block["keys"] = keys
+    block["offsets"] = offsets
+    block["widths"] = widths
+    block["signed"] = signed
+    block["scales"] = scales
+    block["raw"] = raw
+    block["codes"] = codes
+    block["composites"] = composites
+    block["words_struct"] = struct.Struct(f">{block['count']}H")
+    block["struct"] = struct.Struct(fmt) if fmt is not None else None
+    return block
+
+
+def compile_blocks(register_dict, **plan_kwargs):
+    """Plan and compile the read blocks of a register map."""
+    return [compile_block(block, register_dict)
+            for block in plan_blocks(register_dict, **plan_kwargs)]
+
+
+def decode_buffer(block, buffer):
+    """Decode a big-endian response buffer of a compiled block into {key: value}."""
+    if block["struct"] is not None:
+        values = block["struct"].unpack_from(buffer)
+    else:
+        values = [struct.unpack_from(">" + code, buffer, 2 * offset)[0]
+                  for code, offset in zip(block["codes"], block["offsets"])]
+
+    if block["composites"]:
+        values = list(values)
+        for i, decode in block["composites"]:
+            values[i] = decode(values[i])
+
+    return {key: value if scale == 1.0 else value * scale
+            for key, value, scale in zip(block["keys"], values, block["scales"])}
+
+
+def decode_block(block, words):
+    """Decode the raw words of a compiled block into {key: value}."""
+    return decode_buffer(block, block["words_struct"].pack(*words))
+
+
+def read_values(client, blocks, slave=1, times=None, fresh=False):
+    """
+    Read compiled blocks once each and decode them.
+
+    Args:
+        times: Optional list that receives (block, request monotonic,
+            response monotonic) for every block read successfully.
+        fresh: Bypass a register cache (acquisition loops, see read_block).
+
+    Returns:
+        Tuple (values, errors): values maps each register key to its decoded
+        value, errors maps the start address of each failed block to its message.
+    """
+    values = {}
+    errors = {}
+    for block in blocks:
+        try:
+            t0 = time.monotonic()
+            words = read_block(client, block, slave, fresh)
+            if times is not None:
+                times.append((block, t0, time.monotonic()))
+            values.update(decode_block(block, words))
+        except Exception as e:
+            errors[block["address"]] = str(e)
+    return values, errors
+
+
+@lru_cache(maxsize=None)
+def _single_struct(code):
+    return struct.Struct(">" + code)
+
+
+def decode_words(words, reg_info):
+    """Decode the raw words of a single register (HEX registers stay unscaled)."""
+    code = field_code(reg_info)
+    size = reg_info["size"]
+    value = _single_struct(code).unpack(struct.pack(f">{size}H", *words[:size]))[0]
+    if is_composite(reg_info):
+        return decoder(reg_info)(value)
+    if is_raw(reg_info) or reg_info["scale"] == 1:
+        return value
+    return value * reg_info["scale"]
+
+
+def encode_words(value, reg_info):
+    """Inverse of decode_words: scale and pack a value into the register's raw words."""
+    code = field_code(reg_info)
+    size = reg_info["size"]
+    if is_composite(reg_info):
+        if not isinstance(value, int):   # inteiros são já o valor em bruto
+            value = encoder(reg_info)(value)
+    elif not (is_raw(reg_info) or reg_info["scale"] in (0, 1)):
+        value = round(value / reg_info["scale"])
+    value = int(value)
+    if code.islower():
+        value &= (1 << (16 * size)) - 1
+    return list(struct.unpack(f">{size}H", _single_struct(code.upper()).pack(value)))
+
+
+# Planos compilados no primeiro acesso a READ_BLOCKS / READWRITE_BLOCKS
+_PLANS = {"READ_BLOCKS": read_registers, "READWRITE_BLOCKS": readwrite_registers}
+
+
+def __getattr__(name):
+    if name in _PLANS:
+        blocks = compile_blocks(_PLANS[name])
+        globals()[name] = blocks
+        return blocks
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
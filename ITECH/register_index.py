@@ -0,0 +1,170 @@
+# Índice dos registos: endereço -> registo, intervalos ordenados e pesquisa por nome (trie)
+import re
+from bisect import bisect_left
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+
+MAX_DISTANCE = 1   # erros de escrita tolerados na pesquisa aproximada
+_WORDS = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+def name_tokens(key):
+    """Lowercase search tokens of a register key: the full name plus its words."""
+    name = key.split(" [")[0]
+    tokens = {name.lower()}
+    tokens.update(word.lower() for word in _WORDS.findall(name))
+    return tokens
+
+
+class RegisterIndex:
+    """
+    Read-only index over one or more register dicts.
+
+    Entries are numbered in dict order (read registers first, then write
+    registers), which is the numbering used by the r:/w: commands. Word
+    ranges are kept in arrays sorted by address so that address and range
+    lookups are bisections, and names are kept in a trie for prefix and
+    approximate search. Different registers sharing a word address are
+    listed in `collisions` when the index is built.
+    """
+
+    def __init__(self, register_dicts=(("r", read_registers), ("w", readwrite_registers))):
+        self.entries = []
+        self.by_key = {}
+        for kind, register_dict in register_dicts:
+            for key, reg_info in register_dict.items():
+                entry = {"number": len(self.entries), "key": key, "kind": kind,
+                         "address": reg_info["address"], "size": reg_info["size"],
+                         "info": reg_info}
+                self.entries.append(entry)
+                self.by_key.setdefault(key, entry)
+                self.by_key.setdefault(key.lower(), entry)
+
+        ordered = sorted(self.entries, key=lambda e: (e["address"], e["number"]))
+        self.starts = [entry["address"] for entry in ordered]
+        self.ordered = ordered
+        self.max_size = max((entry["size"] for entry in ordered), default=1)
+        self.by_address = {}
+        for entry in ordered:
+            self.by_address.setdefault(entry["address"], []).append(entry)
+
+        self.collisions = self._find_collisions()
+        self.trie = {}
+        for entry in self.entries:
+            for token in name_tokens(entry["key"]):
+                self._insert(token, entry)
+
+    # --- Endereços ---
+
+    def _find_collisions(self):
+        """Pairs of different registers whose word ranges overlap: [(address, key_a, key_b)]."""
+        collisions = []
+        for i, entry in enumerate(self.ordered):
+            end = entry["address"] + entry["size"]
+            for other in self.ordered[i + 1:bisect_left(self.starts, end)]:
+                if other["key"] != entry["key"]:
+                    collisions.append((other["address"], entry["key"], other["key"]))
+        return collisions
+
+    def in_range(self, address, count=1):
+        """Entries with at least one word in [address, address + count), sorted by address."""
+        lo = bisect_left(self.starts, address - self.max_size + 1)
+        hi = bisect_left(self.starts, address + count)
+        return [entry for entry in self.ordered[lo:hi]
+                if entry["address"] + entry["size"] > address]
+
+    def at(self, address):
+        """Entries containing a word address (more than one if registers collide)."""
+        return self.in_range(address, 1)
+
+    def name_at(self, address):
+        """Key of the register starting at an address, or None."""
+        entries = self.by_address.get(address)
+        return entries[0]["key"] if entries else None
+
+    # --- Nomes ---
+
+    def _insert(self, token, entry):
+        node = self.trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node.setdefault("", []).append(entry)
+
+    @staticmethod
+    def _collect(node, found):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == "":
+                    for entry in child:
+                        found.setdefault(entry["number"], entry)
+                else:
+                    stack.append(child)
+
+    def prefix(self, text):
+        """Entries with a name or name word starting with text (case-insensitive)."""
+        node = self.trie
+        for char in text.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        found = {}
+        self._collect(node, found)
+        return [found[number] for number in sorted(found)]
+
+    def fuzzy(self, text, max_distance=MAX_DISTANCE):
+        """Entries with a name word within max_distance edits of text (Levenshtein on the trie)."""
+        text = text.lower()
+        found = {}
+        first_row = list(range(len(text) + 1))
+        stack = [(child, char, first_row) for char, child in self.trie.items() if char]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(text) + 1):
+                row.append(min(row[i - 1] + 1, previous[i] + 1,
+                               previous[i - 1] + (text[i - 1] != char)))
+            if row[-1] <= max_distance and "" in node:
+                for entry in node[""]:
+                    found.setdefault(entry["number"], entry)
+            if min(row) <= max_distance:
+                stack.extend((child, c, row) for c, child in node.items() if c)
+        return [found[number] for number in sorted(found)]
+
+    def search(self, text, max_distance=MAX_DISTANCE):
+        """Prefix matches, or approximate matches if there are none."""
+        return self.prefix(text) or self.fuzzy(text, max_distance)
+
+    def resolve(self, text):
+        """
+        Resolve a user query to one entry.
+
+        Args:
+            text: Register number, exact key or an unambiguous name prefix.
+
+        Returns:
+            Tuple (entry or None, candidates) — candidates when text is ambiguous.
+        """
+        text = text.strip()
+        if text.isdigit():
+            number = int(text)
+            return (self.entries[number] if number < len(self.entries) else None), []
+        entry = self.by_key.get(text) or self.by_key.get(text.lower())
+        if entry is not None:
+            return entry, []
+        matches = self.search(text)
+        return (matches[0] if len(matches) == 1 else None), matches
+
+
+_index = None
+
+
+def get_index():
+    """Shared index of read_registers + readwrite_registers, built (and checked) on first use."""
+    global _index
+    if _index is None:
+        _index = RegisterIndex()
+        for address, key_a, key_b in _index.collisions:
+            print(f"⚠️ Register address collision at {address}: '{key_a}' and '{key_b}'")
+    return _index
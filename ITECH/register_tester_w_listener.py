@@ -1,9 +1,10 @@
 import threading
 import time
-import ctypes
 from pymodbus.client import ModbusTcpClient
 from py_rw_registers import readwrite_registers
 from py_r_register import read_registers
+from register_decoder import decode_words
+from fault_events import active_faults
 
 
 # Configurações
@@ -31,6 +32,22 @@ def listen_passively(client):
         except:
             pass  # Ignora erros para manter a escuta viva
 
+def read_value(client, key, reg_info):
+    """Lê um registo e descodifica-o pelo plano compilado (tipo, sinal e escala)."""
+    address = reg_info["address"]
+    try:
+        result = client.read_holding_registers(address=address, count=reg_info["size"], slave=UNIT_ID)
+        if not result.isError():
+            value = decode_words(result.registers, reg_info)
+            if reg_info.get("datatype") == "HEX":
+                value = hex(value)
+            print(f"📖 Valor lido de '{key}' (Addr {address}): {value}")
+        else:
+            print(f"⚠️ Erro ao ler '{key}' (Addr {address}): {result}")
+    except Exception as e:
+        print(f"⚠️ Exceção ao ler '{key}': {e}")
+
+
 def print_active_errors(display_code: int, master1_code: int, master2_code: int):
     registers = {
         "display": display_code,
@@ -40,10 +57,8 @@ def print_active_errors(display_code: int, master1_code: int, master2_code: int)
 
     for group, reg_value in registers.items():
         print(f"\n[Grupo: {group.upper()}]")
-        for bit in range(32):
-            if (reg_value >> bit) & 1:
-                error_msg = error_codes.get(group, {}).get(bit, "Erro desconhecido")
-                print(f"  Bit {bit}: {error_msg}")
+        for bit, error_msg in active_faults(reg_value, group):
+            print(f"  Bit {bit}: {error_msg}")
 
 def main():
     client = ModbusTcpClient(IP_ADDRESS, port=PORT)
@@ -96,66 +111,11 @@ def main():
                 continue
             elif idx < len(read_keys):
                 key = read_keys[idx]
-                reg_info = read_registers[key]
-                address = reg_info["address"]
-                size = reg_info["size"]
-                scale = reg_info["scale"]
-                data_type = reg_info.get("datatype", "UInt16")  # Valor por omissão
-
-                # --- Ler ---
-                try:
-                    result = client.read_holding_registers(address=address, count=size, slave=UNIT_ID)
-                    if not result.isError():
-                        read_values = result.registers
-                        combined_value = 0
-                        for i in range(size):
-                            combined_value = (combined_value << 16) + read_values[i]
-
-                        # Interpretação consoante o tipo
-                        if data_type == "Int16" and size == 1:
-                            value = ctypes.c_int16(combined_value).value
-                        elif data_type == "Int32" and size == 2:
-                            value = ctypes.c_int32(combined_value).value
-                        elif data_type == "HEX":
-                            value = hex(combined_value)
-                        else:  # Assume-se UInt16, UInt32 ou outro tipo sem sinal
-                            value = combined_value
-
-                        # Aplicar escala se não for HEX
-                        if data_type != "HEX":
-                            value *= scale
-
-                        print(f"📖 Valor lido de '{key}' (Addr {address}): {value}")
-                    else:
-                        print(f"⚠️ Erro ao ler '{key}' (Addr {address}): {result}")
-                except Exception as e:
-                    print(f"⚠️ Exceção ao ler '{key}': {e}")
+                read_value(client, key, read_registers[key])
 
             else:
                 key = readwrite_keys[idx-offset]
-                reg_info = readwrite_registers[key]
-                address = reg_info["address"]
-                size = reg_info["size"]
-                scale = reg_info["scale"]
-
-                # --- Ler ---
-                try:
-                    result = client.read_holding_registers(address=address, count=size, slave=UNIT_ID)
-                    if not result.isError():
-                        read_values = result.registers
-                        combined_value = 0
-                        print(range(size))
-                        for i in range(size):
-                            help=(combined_value << 16)
-                            combined_value = (combined_value << 16) + read_values[i]
-                            print(f"Combined Values <<16: {help}")
-                            print(f" read_values: {read_values[i]}")
-                        scaled_value = combined_value * scale
-                        print(f"📖 Valor lido de '{key}' (Addr {address}): {scaled_value}")
-                    else:
-                        print(f"⚠️ Erro ao ler '{key}' (Addr {address}): {result}")
-                except Exception as e:
-                    print(f"⚠️ Exceção ao ler '{key}': {e}")
+                read_value(client, key, readwrite_registers[key])
 
         elif cmd_type == "w":
             if idx < offset or idx >= offset + len(readwrite_keys):
@@ -164,7 +124,6 @@ def main():
             key = readwrite_keys[idx - offset]
             reg_info = readwrite_registers[key]
             address = reg_info["address"]
-            size = reg_info["size"]
             scale = reg_info["scale"]
 
             # --- Escrever ---
@@ -181,19 +140,7 @@ def main():
                 continue
 
             # --- Ler depois de escrever ---
-            try:
-                result = client.read_holding_registers(address=address, count=size, slave=UNIT_ID)
-                if not result.isError():
-                    read_values = result.registers
-                    combined_value = 0
-                    for i in range(size):
-                        combined_value = (combined_value << 16) + read_values[i]
-                    scaled_value = combined_value * scale
-                    print(f"📖 Valor lido de '{key}' (Addr {address}): {scaled_value}")
-                else:
-                    print(f"⚠️ Erro ao ler '{key}' (Addr {address}): {result}")
-            except Exception as e:
-                print(f"⚠️ Exceção ao ler '{key}': {e}")
+            read_value(client, key, reg_info)
 
         else:
             print("⚠️ Comando desconhecido. Usa 'r: número' ou 'w: número'.")
@@ -0,0 +1,172 @@
+# Escalonador central de leituras: cada registo tem uma classe de frequência
+import threading
+import time
+from py_r_register import read_registers
+from register_decoder import compile_blocks, read_values
+from transports import plan_kwargs
+
+UNIT_ID = 1
+
+# Intervalo (segundos) de cada classe de frequência
+RATE_CLASSES = {
+    "fast": 1.0,     # potências, correntes, tensões, frequências
+    "medium": 10.0,  # temperaturas, isolamento, estado e falhas
+    "slow": 60.0,    # contadores de energia e configuração
+}
+
+# Prefixos/fragmentos de nome que definem a classe (o primeiro que coincidir ganha)
+SLOW_PREFIXES = ("Today_", "Month_", "Year_", "Total_", "Sum ")
+SLOW_NAMES = ("MeterModeSet", "SocUpLimit", "SocDowLimit", "DODSet", "ResSoc", "ConnTime")
+MEDIUM_NAMES = ("Temp", "ISO", "GFCI", "DCI", "DVI", "Status", "Fault", "Error", "Mode")
+
+
+def rate_class(key, reg_info=None):
+    """
+    Return the rate class of a register.
+
+    An explicit 'rate' entry in the register dict wins; otherwise the class is
+    derived from the register name.
+    """
+    if reg_info is not None and "rate" in reg_info:
+        return reg_info["rate"]
+    if key.startswith(SLOW_PREFIXES) or any(name in key for name in SLOW_NAMES):
+        return "slow"
+    if any(name in key for name in MEDIUM_NAMES):
+        return "medium"
+    return "fast"
+
+
+def classify_registers(register_dict):
+    """Group a register dict by rate class: {class: {key: reg_info}}."""
+    classes = {}
+    for key, reg_info in register_dict.items():
+        classes.setdefault(rate_class(key, reg_info), {})[key] = reg_info
+    return classes
+
+
+class ScanScheduler:
+    """
+    Poll a register map at several rates through shared block reads.
+
+    On every tick the registers of all due rate classes are merged and read
+    with one set of planned blocks, so a slow-class register that sits next to
+    fast ones costs no extra request. Block plans are compiled once per
+    combination of due classes. Decoded samples are kept in `latest` and
+    passed to every listener as {'timestamp', 'monotonic', 'values', 'errors',
+    'classes', 'duration', 'stamps', 'slave'}: duration of the block reads in seconds,
+    and per block read {'keys', 'monotonic' (request/response midpoint),
+    'rtt', 'device_time'} (device_time needs a synced Timebase).
+    """
+
+    def __init__(self, client, register_dict=read_registers, rates=RATE_CLASSES,
+                 slave=UNIT_ID, policy=None, timebase=None):
+        self.client = client
+        self.slave = slave
+        self.rates = dict(rates)
+        self.classes = classify_registers(register_dict)
+        unknown = set(self.classes) - set(self.rates)
+        if unknown:
+            raise ValueError(f"Rate class without interval: {sorted(unknown)}")
+
+        self.policy = policy    # AdaptivePolicy opcional (backoff, atividade, orçamento de banda)
+        self.timebase = timebase  # Timebase opcional: carimbo com o relógio do inversor
+        self.next_due = {name: 0.0 for name in self.classes}
+        self.deferred_until = 0.0
+        self.latest = {}
+        self.listeners = []
+        self._plans = {}
+        self._plan_kwargs = plan_kwargs(client)   # limites de bloco do transporte
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Register callback(sample), called after every tick."""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def blocks_for(self, due):
+        """Compiled blocks covering every register of the given rate classes."""
+        due = frozenset(due)
+        if due not in self._plans:
+            registers = {}
+            for name in due:
+                registers.update(self.classes[name])
+            self._plans[due] = compile_blocks(registers, **self._plan_kwargs)
+        return self._plans[due]
+
+    def due_classes(self, now):
+        return [name for name, due in self.next_due.items() if due <= now]
+
+    def tick(self, now=None):
+        """Read every due rate class once. Returns the sample, or None if nothing was due."""
+        now = time.monotonic() if now is None else now
+        due = self.due_classes(now)
+        if not due or now < self.deferred_until:
+            return None
+
+        blocks = self.blocks_for(due)
+        if self.policy is not None:
+            wait = self.policy.budget_wait(blocks, now)
+            if wait > 0:
+                # Sem orçamento de banda: adia o tick em vez de saturar a ligação
+                self.deferred_until = now + wait
+                return None
+
+        started = time.perf_counter()
+        times = []
+        # Sempre do inversor: uma palavra da cache seria carimbada como leitura nova
+        values, errors = read_values(self.client, blocks, slave=self.slave, times=times,
+                                     fresh=True)
+        stamps = []
+        for block, t0, t1 in times:
+            stamp = (self.timebase.stamp(t0, t1) if self.timebase is not None else
+                     {"monotonic": (t0 + t1) / 2, "rtt": t1 - t0, "device_time": None})
+            stamp["keys"] = block["keys"]
+            stamps.append(stamp)
+        sample = {"timestamp": time.time(), "monotonic": now, "values": values,
+                  "errors": errors, "classes": due, "duration": time.perf_counter() - started,
+                  "stamps": stamps, "slave": self.slave}
+
+        with self._lock:
+            for key, value in values.items():
+                self.latest[key] = (sample["timestamp"], value)
+        if self.policy is not None:
+            for name, delay in self.policy.observe(due, sample, blocks, self.classes, now).items():
+                # Uma classe que não foi lida só é adiada, nunca antecipada
+                self.next_due[name] = (now + delay if name in due
+                                       else max(self.next_due[name], now + delay))
+        else:
+            for name in due:
+                # Mantém a cadência; se um ciclo foi perdido recomeça a partir de agora
+                next_due = self.next_due[name] + self.rates[name]
+                self.next_due[name] = next_due if next_due > now else now + self.rates[name]
+
+        for callback in self.listeners:
+            callback(sample)
+        return sample
+
+    def seconds_until_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(self.next_due.values()) - now, self.deferred_until - now)
+
+    def get(self, key):
+        """Latest (timestamp, value) of a register, or None if never read."""
+        with self._lock:
+            return self.latest.get(key)
+
+    def run(self, stop_event):
+        """Tick until stop_event is set (blocking, meant for a worker thread)."""
+        while not stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"⚠️ Exception in scan scheduler: {e}")
+            stop_event.wait(self.seconds_until_due())
+
+    def start(self):
+        """Run the scheduler in a daemon thread. Returns the stop event."""
+        stop_event = threading.Event()
+        threading.Thread(target=self.run, args=(stop_event,), daemon=True).start()
+        return stop_event
@@ -0,0 +1,230 @@
+# Ensaios de carga/descarga progressiva como corrotinas, em paralelo em vários inversores
+import asyncio
+import threading
+import time
+from block_reader import read_block
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_decoder import compile_blocks, decode_block
+from transports import plan_kwargs
+
+RATED_POWER = 5000   # [W] potência de referência dos registos [%]
+
+# Registos lidos em cada instante de amostragem
+SAMPLE_KEYS = [
+    'Meter_A_PowerWatt1 [W]', 'BatPower [W]', 'RGridPowerWatt [W]', 'PV1Power [W]',
+    'PV2Power [W]', 'BatEnergyPercent [%]', 'BatVolt [V]', 'BatCurr [A]', 'BatTempC [℃]',
+    'SinkTemp [℃]', 'AmbTemp [ºC]',
+]
+
+# Perfis declarativos (equivalentes aos antigos progressive_charge/progressive_discharge)
+CHARGE_PROFILE = {
+    "name": "progressive_charge",
+    "mode": "charge",                      # Passive_charg_enable = 2
+    "register": "BatChargePower [%]",
+    "steps_w": list(range(500, 4501, 500)),
+    "step_duration": 120,                  # segundos por degrau
+    "sample_offsets": [120],               # segundos após o início do degrau
+}
+DISCHARGE_PROFILE = {
+    "name": "progressive_discharge",
+    "mode": "discharge",                   # Passive_charg_enable = 1
+    "register": "BatDischargePower [%]",
+    "steps_w": list(range(2000, 4501, 500)),
+    "step_duration": 180,
+    "sample_offsets": [60, 180],
+}
+PASSIVE_MODES = {"charge": 2, "discharge": 1}
+# Registos repostos no fim do ensaio, com os valores lidos antes de o começar
+MODE_KEYS = ["AppMode", "Passive_charg_enable"]
+
+
+async def call(function, *args, **kwargs):
+    """
+    Run a blocking client call (DeviceClient, CachedClient) in a worker thread.
+
+    A cancelled caller still waits for the call to finish, so a power write
+    in flight cannot land after the writes that restore the inverter.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(function, *args, **kwargs))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+async def write(client, key, value, slave):
+    reg_info = readwrite_registers[key]
+    result = await call(client.write_register, address=reg_info["address"], value=value,
+                        slave=slave)
+    if result.isError():
+        raise IOError(f"Failed to write {key}={value}: {result}")
+
+
+async def read_sample(client, blocks, slave):
+    values = {}
+    for block in blocks:
+        words = await call(read_block, client, block, slave, fresh=True)
+        values.update(decode_block(block, words))
+    return values
+
+
+async def restore(client, profile, previous, slave):
+    """Set the power to 0 and put back the modes read before the profile; errors are printed."""
+    writes = [(profile["register"], 0)] + [(key, int(previous[key])) for key in reversed(MODE_KEYS)]
+    for key, value in writes:
+        try:
+            await write(client, key, value, slave)
+        except Exception as e:
+            print(f"⚠️ Failed to restore {key}={value} on unit {slave}: {e}")
+
+
+def device_name(client, slave):
+    return f"{getattr(client, 'transport', type(client).__name__)} unit {slave}"
+
+
+async def run_profile(client, profile, device="", slave=1, rated_power=RATED_POWER,
+                      on_sample=None):
+    """
+    Step one inverter through a profile without blocking the event loop.
+
+    Sets AppMode 3 and passive charge/discharge, then writes each power step
+    and samples SAMPLE_KEYS at the configured offsets of every step. However
+    the profile ends (finished, failed or cancelled) the power is set back to
+    0 and AppMode/Passive_charg_enable get the values they had before.
+
+    Args:
+        client: Shared synchronous client (DeviceClient, or CachedClient
+            around one); its calls run in worker threads.
+
+    Returns:
+        List of samples {'device', 'profile', 'step_w', 'offset', 'timestamp', 'values'}.
+    """
+    loop = asyncio.get_running_loop()
+    limits = plan_kwargs(client)
+    blocks = compile_blocks({key: read_registers[key] for key in profile.get("keys", SAMPLE_KEYS)},
+                            **limits)
+    mode_blocks = compile_blocks({key: readwrite_registers[key] for key in MODE_KEYS}, **limits)
+    reg_info = readwrite_registers[profile["register"]]
+    samples = []
+
+    previous = await read_sample(client, mode_blocks, slave)
+    try:
+        await write(client, "AppMode", 3, slave)
+        await write(client, "Passive_charg_enable", PASSIVE_MODES[profile["mode"]], slave)
+
+        for power in profile["steps_w"]:
+            raw_value = int(power / (reg_info["scale"] * rated_power))
+            await write(client, profile["register"], raw_value, slave)
+            step_start = loop.time()
+
+            for offset in sorted(profile["sample_offsets"]):
+                await asyncio.sleep(max(0.0, step_start + offset - loop.time()))
+                try:
+                    values = await read_sample(client, blocks, slave)
+                except Exception as e:
+                    values = {"error": str(e)}
+                sample = {"device": device, "profile": profile["name"], "step_w": power,
+                          "offset": offset, "timestamp": time.time(), "values": values}
+                samples.append(sample)
+                if on_sample is not None:
+                    on_sample(sample)
+
+            await asyncio.sleep(max(0.0, step_start + profile["step_duration"] - loop.time()))
+    finally:
+        # Nunca deixar o inversor em modo passivo no último degrau
+        await restore(client, profile, previous, slave)
+    return samples
+
+
+async def run_fleet(targets, profile, on_sample=None):
+    """
+    Run the same profile on several inverters in parallel.
+
+    Args:
+        targets: (client, unit ID) pairs; units behind one gateway share its client.
+
+    Returns:
+        {device name: samples or exception}.
+    """
+    names = [device_name(client, slave) for client, slave in targets]
+    results = await asyncio.gather(
+        *(run_profile(client, profile, name, slave, on_sample=on_sample)
+          for (client, slave), name in zip(targets, names)),
+        return_exceptions=True)
+    return dict(zip(names, results))
+
+
+def print_sample(sample):
+    print(f"\n📊 {sample['device']} {sample['profile']} {sample['step_w']} W "
+          f"@ {sample['offset']} s:")
+    for key, value in sample["values"].items():
+        print(f"  📖 {key}: {value}")
+
+
+def start_in_background(targets, profile, on_sample=print_sample):
+    """
+    Run a fleet profile in a background thread with its own event loop.
+
+    Returns:
+        Tuple (thread, cancel): cancel() stops the sequence at the next await
+        (after restoring every inverter, see run_profile).
+    """
+    loop = asyncio.new_event_loop()
+    task_holder = {}
+
+    def runner():
+        asyncio.set_event_loop(loop)
+        task_holder["task"] = loop.create_task(run_fleet(targets, profile, on_sample=on_sample))
+        try:
+            results = loop.run_until_complete(task_holder["task"])
+            for device, result in results.items():
+                if isinstance(result, BaseException):
+                    print(f"⚠️ {profile['name']} failed on {device}: {result}")
+                else:
+                    print(f"\n✅ {profile['name']} finished on {device} ({len(result)} samples)")
+        except asyncio.CancelledError:
+            print(f"\n🛑 {profile['name']} cancelled.")
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+
+    def cancel():
+        if "task" in task_holder:
+            loop.call_soon_threadsafe(task_holder["task"].cancel)
+
+    return thread, cancel
+
+
+def main():
+    """python sequence_runner.py charge|discharge <target> [target ...] [--units 1,2]"""
+    import argparse
+    from client_pool import DeviceClient
+    from gateway import parse_units
+
+    parser = argparse.ArgumentParser(description="Run a progressive charge/discharge profile")
+    parser.add_argument("mode", choices=["charge", "discharge"])
+    parser.add_argument("targets", nargs="+", help="inverter IPs or transport URLs")
+    parser.add_argument("--port", type=int, default=502)
+    parser.add_argument("--units", default="1", help="unit IDs behind every target, e.g. 1,2")
+    args = parser.parse_args()
+    profile = CHARGE_PROFILE if args.mode == "charge" else DISCHARGE_PROFILE
+
+    clients = [DeviceClient(target, port=args.port) for target in args.targets]
+    for client in clients:
+        if not client.connect():
+            print(f"⚠️ Failed to connect to {client.transport}")
+    try:
+        asyncio.run(run_fleet([(client, unit) for client in clients
+                               for unit in parse_units(args.units)],
+                              profile, on_sample=print_sample))
+    finally:
+        for client in clients:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
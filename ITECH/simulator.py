@@ -0,0 +1,292 @@
+# Simulador Modbus (TCP, RTU sobre TCP ou RTU série) do mapa de registos do SAJ H2 (testes de carga e latência sem inversor)
+import argparse
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime
+from pymodbus import FramerType
+from pymodbus.datastore import ModbusServerContext, ModbusSlaveContext
+from pymodbus.exceptions import NoSuchSlaveException
+from pymodbus.server import ModbusTcpServer
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_decoder import encode_words
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 5020
+RATED_POWER = 5000       # [W]
+BATTERY_CAPACITY = 10000  # [Wh]
+
+CLOCK_ADDRESS = 0x4000
+FAULT_ADDRESSES = {"HFaultMSG (Board/Slave)": 0x4005, "MFaultMSG (Master)": 0x4007,
+                   "MFaultMSG2 (Master)": 0x4009}
+ERROR_COUNT_ADDRESS = 0x400F
+
+# Contadores de energia: prefixo do registo -> grandeza acumulada
+ENERGY_COUNTERS = {
+    "PV_Energy": "pv", "BatChgEnergy": "bat_charge", "BatDisEnergy": "bat_discharge",
+    "FeedInEnergy": "export", "SellEnergy": "export", "TotalLoadEnergy": "load",
+    "InvGenEnergy": "inverter", "BackupLoadEnergy": "backup",
+}
+
+
+class SimulatedInverter:
+    """
+    Register image of one SAJ H2 inverter with simple power/SOC dynamics.
+
+    PV follows a daylight curve with cloud noise, the load wanders around a
+    base value and the battery follows the passive charge/discharge commands
+    written to readwrite_registers (self-consumption otherwise). BatPower is
+    positive when discharging. Energy counters, SOC, temperatures, the clock
+    at 0x4000 and random fault words at 0x4005-0x400F are kept up to date.
+    """
+
+    def __init__(self, rated_power=RATED_POWER, capacity_wh=BATTERY_CAPACITY, soc=50.0,
+                 fault_rate=0.0, seed=None):
+        self.rated_power = rated_power
+        self.capacity_wh = capacity_wh
+        self.soc = soc
+        self.fault_rate = fault_rate
+        self.random = random.Random(seed)
+        self.registers = {}
+        self.energy = {name: 0.0 for name in set(ENERGY_COUNTERS.values())}  # [Wh]
+        self.faults = {name: 0 for name in FAULT_ADDRESSES}
+        self.error_count = 0
+        self.cloud = 1.0
+        self.last_step = None
+        self.lock = threading.Lock()
+
+        for key, reg_info in readwrite_registers.items():
+            self.set_value(reg_info, max(reg_info.get("min", 0), 0))
+        self.set_value(readwrite_registers["PowerRated [W]"], rated_power)
+        self.step()
+
+    # --- Imagem de registos ---
+
+    def set_value(self, reg_info, value):
+        words = encode_words(value, reg_info)
+        for i, word in enumerate(words):
+            self.registers[reg_info["address"] + i] = word
+
+    def raw(self, key):
+        return self.registers.get(readwrite_registers[key]["address"], 0)
+
+    def read(self, address, count):
+        with self.lock:
+            self.step()
+            return [self.registers.get(address + i, 0) for i in range(count)]
+
+    def write(self, address, values):
+        with self.lock:
+            self.step()
+            for i, value in enumerate(values):
+                self.registers[address + i] = value & 0xFFFF
+
+    # --- Dinâmica ---
+
+    def battery_setpoint(self, pv, load):
+        """Battery power requested by the current mode (+ discharge, - charge)."""
+        mode = self.raw("Passive_charg_enable")
+        if mode == 2:
+            return -self.raw("BatChargePower [%]") * 0.001 * self.rated_power
+        if mode == 1:
+            return self.raw("BatDischargePower [%]") * 0.001 * self.rated_power
+        return load - pv
+
+    def step(self, now=None):
+        now = time.time() if now is None else now
+        dt = 0.0 if self.last_step is None else max(0.0, now - self.last_step)
+        self.last_step = now
+        clock = datetime.fromtimestamp(now)
+
+        hour = clock.hour + clock.minute / 60 + clock.second / 3600
+        self.cloud = min(1.0, max(0.2, self.cloud + self.random.gauss(0, 0.02)))
+        daylight = max(0.0, math.sin(math.pi * (hour - 6) / 12))
+        pv = 0.9 * self.rated_power * daylight * self.cloud
+        load = max(100.0, 600 + 300 * math.sin(hour) + self.random.gauss(0, 50))
+
+        bat = max(-self.rated_power, min(self.rated_power, self.battery_setpoint(pv, load)))
+        if (bat > 0 and self.soc <= 5) or (bat < 0 and self.soc >= 100):
+            bat = 0.0
+        self.soc = min(100.0, max(0.0, self.soc - bat * dt / 3600 / self.capacity_wh * 100))
+
+        inverter = pv + bat
+        grid = inverter - load   # positivo = exportação
+
+        dt_h = dt / 3600
+        self.energy["pv"] += pv * dt_h
+        self.energy["bat_charge"] += max(0.0, -bat) * dt_h
+        self.energy["bat_discharge"] += max(0.0, bat) * dt_h
+        self.energy["export"] += max(0.0, grid) * dt_h
+        self.energy["load"] += load * dt_h
+        self.energy["inverter"] += max(0.0, inverter) * dt_h
+
+        if self.fault_rate and self.random.random() < self.fault_rate:
+            name = self.random.choice(list(self.faults))
+            self.faults[name] ^= 1 << self.random.randrange(32)
+            self.error_count += 1
+
+        values = {
+            "PV1Power [W]": pv / 2, "PV2Power [W]": pv / 2, "TotalPVPower [W]": pv,
+            "PV1Volt [V]": 350 * min(1.0, daylight * 4), "PV2Volt [V]": 350 * min(1.0, daylight * 4),
+            "PV1Curr [A]": pv / 700, "PV2Curr [A]": pv / 700,
+            "BatPower [W]": bat, "TotalBatteryPower [W]": abs(bat),
+            "BatVolt [V]": 48 + 6 * self.soc / 100, "BatCurr [A]": abs(bat) / 51,
+            "BatEnergyPercent [%]": self.soc,
+            "BatTempC [℃]": 25 + abs(bat) / 500, "SinkTemp [℃]": 30 + abs(inverter) / 300,
+            "AmbTemp [ºC]": 24,
+            "RGridPowerWatt [W]": grid, "TotalGridPowerWatt [W]": abs(grid),
+            "RGridVolt [V]": 230 + self.random.gauss(0, 1),
+            "RGridFreq [Hz]": 50 + self.random.gauss(0, 0.02),
+            "RGridCurr [A]": abs(grid) / 230,
+            "RInvPowerWatt [W]": max(0.0, inverter), "TotalInvPowerWatt [W]": max(0.0, inverter),
+            "ROnGridOutPowerWatt [W]": max(0.0, inverter),
+            "SysTotalLoadWatt [W]": load, "Meter_A_PowerWatt1 [W]": -grid,
+            "Meter_A_Volt1 [V]": 230, "Meter_A_Freq1 [VA]": 50,
+            "ISO1 [kΩ]": 2000, "ISO2 [kΩ]": 2000,
+        }
+        for key, value in values.items():
+            self.set_value(read_registers[key], value)
+
+        for key, reg_info in read_registers.items():
+            for fragment, counter in ENERGY_COUNTERS.items():
+                if fragment in key:
+                    self.set_value(reg_info, self.energy[counter] / 1000)
+
+        self.registers[CLOCK_ADDRESS] = clock.year
+        self.registers[CLOCK_ADDRESS + 1] = (clock.month << 8) | clock.day
+        self.registers[CLOCK_ADDRESS + 2] = (clock.hour << 8) | clock.minute
+        self.registers[CLOCK_ADDRESS + 3] = clock.second << 8
+        for name, address in FAULT_ADDRESSES.items():
+            self.registers[address] = self.faults[name] >> 16
+            self.registers[address + 1] = self.faults[name] & 0xFFFF
+        self.registers[ERROR_COUNT_ADDRESS] = self.error_count & 0xFFFF
+
+
+class SimulatorContext(ModbusSlaveContext):
+    """Slave context serving a SimulatedInverter with latency, jitter and dropped frames."""
+
+    def __init__(self, inverter, latency=0.0, jitter=0.0, drop_rate=0.0, seed=None):
+        super().__init__(zero_mode=True)
+        self.inverter = inverter
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+
+    async def delay(self):
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            # Com ignore_missing_slaves o servidor não responde: o cliente vê um timeout
+            raise NoSuchSlaveException("Simulated dropped frame")
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def validate(self, fc_as_hex, address, count=1):
+        return True
+
+    def getValues(self, fc_as_hex, address, count=1):
+        return self.inverter.read(address, count)
+
+    def setValues(self, fc_as_hex, address, values):
+        self.inverter.write(address, values)
+
+    async def async_getValues(self, fc_as_hex, address, count=1):
+        if fc_as_hex in (3, 4):
+            await self.delay()
+        return self.getValues(fc_as_hex, address, count)
+
+    async def async_setValues(self, fc_as_hex, address, values):
+        await self.delay()
+        self.setValues(fc_as_hex, address, values)
+
+
+def make_server(inverters, host=HOST, port=PORT, latency=0.0, jitter=0.0, drop_rate=0.0,
+                framer="socket", serial=None, baudrate=9600):
+    """
+    Build a Modbus server for {unit_id: SimulatedInverter}.
+
+    framer='rtu' serves RTU frames on the TCP socket (a serial-to-Ethernet
+    converter stand-in); `serial` serves RTU on a serial device instead, e.g.
+    one end of a pty pair made with socat (needs pyserial).
+    Unknown unit IDs (and dropped frames) get no response, like a real gateway.
+    """
+    slaves = {unit: SimulatorContext(inverter, latency, jitter, drop_rate)
+              for unit, inverter in inverters.items()}
+    context = ModbusServerContext(slaves=slaves, single=False)
+    if serial is not None:
+        from pymodbus.server import ModbusSerialServer
+        return ModbusSerialServer(context, framer=FramerType.RTU, port=serial,
+                                  baudrate=baudrate, ignore_missing_slaves=True)
+    return ModbusTcpServer(context, framer=FramerType(framer), address=(host, port),
+                           ignore_missing_slaves=True)
+
+
+def start_in_thread(inverters=None, **kwargs):
+    """
+    Run a simulator in a background thread (for benchmarks and offline tests).
+
+    Returns:
+        Tuple (inverters, stop): stop() shuts the server down.
+    """
+    inverters = inverters or {1: SimulatedInverter()}
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def serve():
+        holder["server"] = make_server(inverters, **kwargs)
+        await holder["server"].listen()
+        ready.set()
+        await holder["server"].serving
+        # Cancela as tarefas de religação pendentes antes de fechar o loop
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    thread = threading.Thread(target=lambda: loop.run_until_complete(serve()), daemon=True)
+    thread.start()
+    ready.wait(5)
+
+    def stop():
+        future = asyncio.run_coroutine_threadsafe(holder["server"].shutdown(), loop)
+        future.result(5)
+        thread.join(5)
+
+    return inverters, stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SAJ H2 Modbus simulator")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--units", type=int, default=1, help="number of unit IDs (1..N)")
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay [s]")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- random delay [s]")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of unanswered frames")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="fault toggles per step")
+    parser.add_argument("--framer", choices=("socket", "rtu"), default="socket",
+                        help="'rtu' serves RTU over TCP")
+    parser.add_argument("--serial", help="serve RTU on this serial device (e.g. a pty) instead")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    args = parser.parse_args()
+
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+    inverters = {unit: SimulatedInverter(fault_rate=args.fault_rate)
+                 for unit in range(1, args.units + 1)}
+    where = args.serial or f"{args.host}:{args.port} ({args.framer})"
+    print(f"✅ Simulating {len(inverters)} inverter(s) on {where}")
+    server = make_server(inverters, args.host, args.port, args.latency, args.jitter,
+                         args.drop_rate, args.framer, args.serial, args.baudrate)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("🚪 Simulator stopped.")
+
+
+if __name__ == "__main__":
+    main()
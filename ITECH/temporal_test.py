@@ -1,6 +1,13 @@
+import argparse
+import asyncio
+import json
+import logging
 import time
-from pymodbus.client import ModbusTcpClient
-from pyregisterdict import read_registers
+from pymodbus.client import AsyncModbusTcpClient, ModbusTcpClient
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_decoder import READ_BLOCKS
+from window_stats import percentile
 
 # Configurações
 IP_ADDRESS = "192.168.31.235"
@@ -10,48 +17,196 @@ UNIT_ID = 1
 # Parâmetros do teste
 N_ITERATIONS = 100
 TEST_REGISTER = 'RGridFreq [Hz]'  # <- escolhe um registo simples
+TEST_WRITE_REGISTER = 'Buzzer_on-off'  # reescreve o valor atual (não altera a configuração)
 
-def main():
-    client = ModbusTcpClient(IP_ADDRESS, port=PORT)
-    if not client.connect():
-        print("❌ Erro ao conectar ao servidor Modbus.")
-        return
-    print(f"✅ Conectado a {IP_ADDRESS}:{PORT}\n")
 
-    address = read_registers[TEST_REGISTER]["address"]
-    size = read_registers[TEST_REGISTER]["size"]
+def summarize(durations, errors, elapsed, requests_per_op=1):
+    """Latency statistics (ms) and throughput of one workload."""
+    values = sorted(durations)
+    result = {"operations": len(values), "errors": errors,
+              "requests_per_op": requests_per_op, "elapsed_s": elapsed}
+    if values:
+        mean = sum(values) / len(values)
+        std = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5
+        result.update({
+            "mean_ms": mean * 1000, "std_ms": std * 1000,
+            "min_ms": values[0] * 1000, "max_ms": values[-1] * 1000,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "ops_per_s": len(values) / elapsed if elapsed else None,
+            "requests_per_s": len(values) * requests_per_op / elapsed if elapsed else None,
+        })
+    return result
+
 
+def timed_loop(operation, iterations):
+    """Run a sync operation N times; an operation returns False on error."""
     durations = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            ok = operation()
+        except Exception:
+            ok = False
+        if ok:
+            durations.append(time.perf_counter() - start)
+        else:
+            errors += 1
+    return durations, errors, time.perf_counter() - started
+
+
+# --- Workloads síncronos ---
+
+def bench_single(client, iterations):
+    reg = read_registers[TEST_REGISTER]
+
+    def operation():
+        return not client.read_holding_registers(
+            address=reg["address"], count=reg["size"], slave=UNIT_ID).isError()
+    return summarize(*timed_loop(operation, iterations))
+
+
+def bench_sweep_per_register(client, iterations):
+    """Full read_registers sweep with one request per register (the old way)."""
+    def operation():
+        return all(not client.read_holding_registers(
+            address=reg["address"], count=reg["size"], slave=UNIT_ID).isError()
+            for reg in read_registers.values())
+    return summarize(*timed_loop(operation, iterations), requests_per_op=len(read_registers))
+
+
+def bench_sweep_blocks(client, iterations):
+    """Full read_registers sweep with the planned block reads."""
+    def operation():
+        return all(not client.read_holding_registers(
+            address=block["address"], count=block["count"], slave=UNIT_ID).isError()
+            for block in READ_BLOCKS)
+    return summarize(*timed_loop(operation, iterations), requests_per_op=len(READ_BLOCKS))
+
+
+def bench_write_readback(client, iterations):
+    reg = readwrite_registers[TEST_WRITE_REGISTER]
+    current = client.read_holding_registers(address=reg["address"], count=1, slave=UNIT_ID)
+    if current.isError():
+        return {"operations": 0, "errors": iterations, "skipped": str(current)}
+    value = current.registers[0]
+
+    def operation():
+        if client.write_register(address=reg["address"], value=value, slave=UNIT_ID).isError():
+            return False
+        result = client.read_holding_registers(address=reg["address"], count=1, slave=UNIT_ID)
+        return not result.isError() and result.registers[0] == value
+    return summarize(*timed_loop(operation, iterations), requests_per_op=2)
 
-    print(f"⏱️ Iniciando teste de resolução temporal com {N_ITERATIONS} leituras de '{TEST_REGISTER}' (Addr {address})...\n")
 
-    for i in range(N_ITERATIONS):
+# --- Workloads assíncronos ---
+
+async def async_worker(host, port, slave, iterations, durations, counters):
+    client = AsyncModbusTcpClient(host, port=port)
+    if not await client.connect():
+        counters["errors"] += iterations
+        return
+    reg = read_registers[TEST_REGISTER]
+    for _ in range(iterations):
         start = time.perf_counter()
-        result = client.read_holding_registers(address=address, count=size, slave=UNIT_ID)
-        end = time.perf_counter()
+        try:
+            result = await client.read_holding_registers(
+                address=reg["address"], count=reg["size"], slave=slave)
+            ok = not result.isError()
+        except Exception:
+            ok = False
+        if ok:
+            durations.append(time.perf_counter() - start)
+        else:
+            counters["errors"] += 1
+    client.close()
+
+
+async def bench_async(host, port, iterations, devices):
+    """Single-register reads from `devices` concurrent async connections."""
+    durations = []
+    counters = {"errors": 0}
+    started = time.perf_counter()
+    await asyncio.gather(*(async_worker(host, port, UNIT_ID, iterations, durations, counters)
+                           for _ in range(devices)))
+    return summarize(durations, counters["errors"], time.perf_counter() - started)
 
-        if result.isError():
-            print(f"⚠️ Erro na leitura #{i+1}: {result}")
-            continue
 
-        elapsed = (end - start)
-        durations.append(elapsed)
+def run_benchmarks(host, port, iterations, devices, workloads):
+    client = ModbusTcpClient(host, port=port)
+    if not client.connect():
+        raise ConnectionError(f"Erro ao conectar a {host}:{port}")
 
+    results = {}
+    sync_workloads = {
+        "single_register": lambda: bench_single(client, iterations),
+        "sweep_per_register": lambda: bench_sweep_per_register(client, max(1, iterations // 10)),
+        "sweep_blocks": lambda: bench_sweep_blocks(client, max(1, iterations // 10)),
+        "write_readback": lambda: bench_write_readback(client, iterations),
+    }
+    for name, run in sync_workloads.items():
+        if name in workloads:
+            print(f"⏱️ {name}...")
+            results[name] = run()
     client.close()
 
-    if durations:
-        avg = sum(durations) / len(durations)
-        print("\n📊 Resultados:")
-        print(f"Leituras válidas: {len(durations)}")
-        print(f"Tempo médio por leitura: {avg*1000:.2f} ms")
-        print(f"Tempo mínimo: {min(durations)*1000:.2f} ms")
-        print(f"Tempo máximo: {max(durations)*1000:.2f} ms")
-
-        diffs = [(x - avg) ** 2 for x in durations]
-        std_dev = (sum(diffs) / len(durations)) ** 0.5
-        print(f"Desvio padrão: {std_dev*1000:.2f} ms")
+    if "async_single" in workloads:
+        print("⏱️ async_single...")
+        results["async_single"] = asyncio.run(bench_async(host, port, iterations, 1))
+    if "async_concurrent" in workloads and devices > 1:
+        print(f"⏱️ async_concurrent ({devices} devices)...")
+        results["async_concurrent"] = asyncio.run(bench_async(host, port, iterations, devices))
+    return results
+
+
+WORKLOADS = ["single_register", "sweep_per_register", "sweep_blocks", "write_readback",
+             "async_single", "async_concurrent"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/throughput benchmark of the polling path")
+    parser.add_argument("--host", default=IP_ADDRESS)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--iterations", type=int, default=N_ITERATIONS)
+    parser.add_argument("--devices", type=int, default=4, help="concurrent connections")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--simulate", action="store_true",
+                        help="run against a local simulator instead of an inverter")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulator latency [s]")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+    host, port, stop = args.host, args.port, None
+    if args.simulate:
+        from simulator import start_in_thread, HOST, PORT as SIM_PORT
+        host, port = HOST, SIM_PORT
+        _, stop = start_in_thread(host=host, port=port, latency=args.latency)
+
+    try:
+        results = {
+            "timestamp": time.time(),
+            "target": f"{host}:{port}",
+            "simulated": args.simulate,
+            "iterations": args.iterations,
+            "results": run_benchmarks(host, port, args.iterations, args.devices,
+                                      args.workloads.split(",")),
+        }
+    finally:
+        if stop is not None:
+            stop()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"📊 Resultados gravados em {args.output}")
     else:
-        print("❌ Nenhuma leitura válida foi obtida.")
+        print(output)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,53 @@
+# Fixtures comuns: os módulos do ITECH são importados pelo nome, e cada teste corre contra o simulador
+import logging
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client_pool import DeviceClient  # noqa: E402
+from simulator import HOST, SimulatedInverter, start_in_thread  # noqa: E402
+
+logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+
+TIMEOUT = 0.3   # [s] timeout de resposta curto: os testes de timeout não ficam lentos
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def simulator(request):
+    """
+    Simulator on a free port: {'inverters', 'port'}.
+
+    Server options (latency, drop_rate, ...) come from
+    @pytest.mark.simulator(...); units 1 and 2 are served by default.
+    """
+    marker = request.node.get_closest_marker("simulator")
+    kwargs = dict(marker.kwargs) if marker else {}
+    inverters = kwargs.pop("inverters", None) or {1: SimulatedInverter(seed=1),
+                                                  2: SimulatedInverter(seed=2)}
+    port = free_port()
+    inverters, stop = start_in_thread(inverters, port=port, **kwargs)
+    yield {"inverters": inverters, "port": port}
+    stop()
+
+
+@pytest.fixture
+def client(simulator):
+    """Connected DeviceClient of the simulator."""
+    device = DeviceClient(HOST, port=simulator["port"], timeout=TIMEOUT, request_timeout=5)
+    assert device.connect()
+    yield device
+    device.close()
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "simulator(**kwargs): options of the simulator fixture")
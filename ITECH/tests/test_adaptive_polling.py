@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from adaptive_polling import (AdaptiveInterval, AdaptivePolicy, Backoff, BandwidthBudget,
+                              budget_for, is_activity_key, read_cost)
+from transports import TCP_REQUEST_BYTES, TCP_RESPONSE_BYTES
+
+
+def test_backoff_grows_with_jitter_and_is_capped():
+    backoff = Backoff(base=1, maximum=8, rng=random.Random(1))
+    delays = [backoff.failure() for _ in range(6)]
+    for failures, delay in enumerate(delays):
+        d = min(8, 2 ** failures)
+        assert d / 2 <= delay <= d
+    backoff.reset()
+    assert backoff.delay() <= 1
+
+
+def test_backoff_never_polls_faster_than_the_loop_did():
+    backoff = Backoff(base=1, maximum=300, rng=random.Random(1))
+    assert all(backoff.failure(600) >= 600 for _ in range(5))
+    assert Backoff(base=1, maximum=2).delay(base=5) == 5
+
+
+def test_adaptive_interval_tightens_relaxes_and_backs_off():
+    interval = AdaptiveInterval(10, backoff=Backoff(rng=random.Random(1)))
+    assert interval.next_interval(True, active=True) == 5
+    assert interval.next_interval(True, active=True) == 2.5
+    assert interval.next_interval(True, active=True) == 2.5       # min_factor 0.25
+    assert interval.next_interval(False) >= 2.5
+    assert interval.backoff.failures == 1
+    assert interval.next_interval(True) == pytest.approx(2.5 * 1.25)
+    assert interval.backoff.failures == 0
+    for _ in range(20):
+        interval.next_interval(True)
+    assert interval.current == 40                                   # max_factor 4
+
+
+def test_bandwidth_budget():
+    budget = BandwidthBudget(rate=100, burst=200)
+    assert budget.wait_time(150, now=budget.updated) == 0
+    budget.consume(150, now=budget.updated)
+    assert budget.wait_time(100, now=budget.updated) == pytest.approx(0.5)
+    # Um pedido maior que o burst só espera pelo burst cheio
+    assert budget.wait_time(1000, now=budget.updated) == pytest.approx(1.5)
+    assert budget.wait_time(100, now=budget.updated + 1) == 0
+
+
+def test_read_cost_and_budget_for():
+    blocks = [{"count": 10}, {"count": 1}]
+    assert read_cost(blocks) == 2 * (TCP_REQUEST_BYTES + TCP_RESPONSE_BYTES) + 22
+    assert budget_for().rate == 2000
+
+    class Serial:
+        bus_rate = 960
+
+        def read_cost(self, count):
+            return count
+    assert read_cost(blocks, Serial()) == 11
+    assert budget_for(Serial()).burst == 1920
+
+
+def test_activity_keys():
+    assert is_activity_key("BatPower [W]") and is_activity_key("MFaultMSG (Master)")
+    assert is_activity_key("Error_Count") and not is_activity_key("BatVolt [V]")
+
+
+def test_policy_tightens_active_classes_and_backs_off_all_on_failure():
+    classes = {"fast": {"BatPower [W]": {}}, "slow": {"BatVolt [V]": {}}}
+    policy = AdaptivePolicy({"fast": 1.0, "slow": 60.0}, budget=BandwidthBudget(rate=1e9))
+    blocks = [{"count": 2}]
+
+    def tick(power, due=("fast", "slow")):
+        sample = {"values": {"BatPower [W]": power, "BatVolt [V]": 50}, "errors": {}}
+        return policy.observe(due, sample, blocks, classes)
+
+    assert tick(0) == {"fast": 1.25, "slow": 75.0}             # primeira leitura: sem atividade
+    assert tick(30, ("fast",)) == {"fast": 1.5625}             # dentro da banda de 50 W
+    assert tick(500, ("fast",)) == {"fast": 0.78125}
+
+    delays = policy.observe(["fast"], {"values": {}, "errors": {1: "timeout"}}, blocks, classes)
+    assert set(delays) == {"fast", "slow"} and delays["slow"] >= 75.0
+    assert policy.backoff.failures == 1
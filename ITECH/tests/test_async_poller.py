@@ -0,0 +1,45 @@
+import asyncio
+
+from async_poller import AsyncPoller, make_device
+from py_r_register import read_registers
+from register_decoder import READ_BLOCKS
+from simulator import HOST
+
+from conftest import free_port
+
+
+def collect(devices, count, **poller_kwargs):
+    async def run():
+        samples = []
+        async with AsyncPoller(devices, timeout=0.3, **poller_kwargs) as poller:
+            async for sample in poller:
+                samples.append(sample)
+                if len(samples) == count:
+                    return samples
+    return asyncio.run(asyncio.wait_for(run(), 10))
+
+
+def test_polls_every_device_concurrently(simulator):
+    devices = [make_device(HOST, name=f"unit{unit}", port=simulator["port"], slave=unit,
+                           schedules=[{"blocks": READ_BLOCKS, "interval": 0.1}])
+               for unit in (1, 2)]
+    samples = collect(devices, 4)
+    assert {sample["device"] for sample in samples} == {"unit1", "unit2"}
+    for sample in samples:
+        assert sample["errors"] == {}
+        assert set(sample["values"]) == set(read_registers)
+
+
+def test_unreachable_device_reports_an_error_sample():
+    sample = collect([make_device(HOST, port=free_port())], 1)[0]
+    assert sample["values"] == {} and None in sample["errors"]
+
+
+def test_full_queue_blocks_the_pollers(simulator):
+    async def run():
+        device = make_device(HOST, port=simulator["port"],
+                             schedules=[{"blocks": READ_BLOCKS[:1], "interval": 0.0}])
+        async with AsyncPoller([device], queue_size=2, timeout=0.3) as poller:
+            await asyncio.sleep(0.3)
+            return poller.samples.qsize()
+    assert asyncio.run(run()) == 2
@@ -0,0 +1,26 @@
+import pytest
+
+from temporal_test import WORKLOADS, run_benchmarks, summarize
+from simulator import HOST
+
+
+def test_summarize_latency_and_throughput():
+    result = summarize([0.003, 0.001, 0.002, 0.004], errors=1, elapsed=2.0, requests_per_op=3)
+    assert result["operations"] == 4 and result["errors"] == 1
+    assert result["min_ms"] == pytest.approx(1) and result["max_ms"] == pytest.approx(4)
+    assert result["mean_ms"] == pytest.approx(2.5)
+    assert result["p50_ms"] == pytest.approx(2) and result["p99_ms"] == pytest.approx(4)
+    assert result["ops_per_s"] == 2 and result["requests_per_s"] == 6
+
+
+def test_summarize_without_successes():
+    assert summarize([], errors=3, elapsed=1.0) == {
+        "operations": 0, "errors": 3, "requests_per_op": 1, "elapsed_s": 1.0}
+
+
+def test_every_workload_runs_against_the_simulator(simulator):
+    results = run_benchmarks(HOST, simulator["port"], 10, 2, WORKLOADS)
+    assert set(results) == set(WORKLOADS)
+    for name, result in results.items():
+        assert result["errors"] == 0 and result["operations"] > 0, name
+    assert results["sweep_blocks"]["requests_per_op"] < results["sweep_per_register"]["requests_per_op"]
@@ -0,0 +1,57 @@
+import pytest
+
+from block_reader import plan_blocks, read_block, read_blocks, slice_block
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+
+REGISTERS = {
+    "a": {"address": 100, "scale": 1, "size": 1, "datatype": "UInt16"},
+    "b": {"address": 101, "scale": 0.1, "size": 1, "datatype": "Int16"},
+    "c": {"address": 105, "scale": 1, "size": 2, "datatype": "UInt32"},
+    "far": {"address": 200, "scale": 1, "size": 1, "datatype": "UInt16"},
+}
+
+
+def test_plan_blocks_joins_small_gaps_only():
+    blocks = plan_blocks(REGISTERS, max_gap=8)
+    assert [(block["address"], block["count"]) for block in blocks] == [(100, 7), (200, 1)]
+    assert blocks[0]["registers"] == [("a", 0, 1), ("b", 1, 1), ("c", 5, 2)]
+    assert len(plan_blocks(REGISTERS, max_gap=2)) == 3
+
+
+def test_plan_blocks_respects_max_count():
+    blocks = plan_blocks(read_registers, max_count=16)
+    assert all(block["count"] <= 16 for block in blocks)
+    planned = {key for block in blocks for key, _, _ in block["registers"]}
+    assert planned == set(read_registers)
+
+
+def test_plan_blocks_rejects_a_register_larger_than_a_block():
+    with pytest.raises(ValueError):
+        plan_blocks(REGISTERS, max_count=1)
+
+
+def test_slice_block():
+    block = plan_blocks(REGISTERS)[0]
+    assert slice_block(block, [1, 2, 0, 0, 0, 3, 4]) == {"a": [1], "b": [2], "c": [3, 4]}
+
+
+def test_read_block_matches_the_inverter_image(simulator, client):
+    # A imagem dos registos de configuração não muda entre leituras
+    inverter = simulator["inverters"][1]
+    for block in plan_blocks(readwrite_registers):
+        assert read_block(client, block, slave=1) == [
+            inverter.registers.get(block["address"] + i, 0) for i in range(block["count"])]
+
+
+def test_read_block_raises_on_no_response(simulator, client):
+    with pytest.raises(IOError):
+        read_block(client, plan_blocks(readwrite_registers)[0], slave=9)
+
+
+def test_read_blocks_collects_errors_per_block(simulator, client):
+    blocks = plan_blocks(read_registers)
+    words, errors = read_blocks(client, blocks, slave=1)
+    assert errors == {} and set(words) == set(read_registers)
+    words, errors = read_blocks(client, blocks[:2], slave=9)
+    assert words == {} and set(errors) == {block["address"] for block in blocks[:2]}
@@ -0,0 +1,92 @@
+import pytest
+
+from client_pool import DeviceClient, TransactionMismatch, UnitUnavailable
+from py_rw_registers import readwrite_registers
+from simulator import HOST, SimulatedInverter
+
+from conftest import TIMEOUT
+
+RATED = readwrite_registers["PowerRated [W]"]["address"]
+
+
+class WithoutTid:
+    """Connection proxy that hides the transaction manager (and with it the sent TID)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __getattr__(self, name):
+        if name == "transaction":
+            raise AttributeError(name)
+        return getattr(self.connection, name)
+
+
+def read_rated(client, slave=1):
+    return client.read_holding_registers(address=RATED, count=1, slave=slave).registers[0]
+
+
+@pytest.mark.simulator(drop_rate=1.0)
+def test_dropped_frames_time_out_and_count_once(simulator):
+    client = DeviceClient(HOST, port=simulator["port"], timeout=TIMEOUT, retries=1)
+    client.connect()
+    try:
+        with pytest.raises(TimeoutError):
+            read_rated(client)
+        status = client.unit_status()[1]
+        assert (status["requests"], status["errors"], status["failures"]) == (1, 1, 1)
+    finally:
+        client.close()
+
+
+@pytest.mark.simulator(drop_rate=0.3)
+def test_no_stale_response_after_a_dropped_frame(simulator, client):
+    # Uma resposta atrasada nunca pode ser entregue ao pedido seguinte
+    rated = simulator["inverters"][1].rated_power
+    answered = 0
+    for _ in range(20):
+        try:
+            assert read_rated(client) == rated
+            answered += 1
+        except (TimeoutError, UnitUnavailable):
+            pass
+    assert answered > 0
+
+
+@pytest.mark.simulator(latency=0.02, inverters={1: SimulatedInverter()})
+def test_close_serves_the_queued_requests(simulator, client):
+    futures = [client.submit("read_holding_registers", address=RATED, count=1, slave=1)
+               for _ in range(10)]
+    client.close()
+    assert all(future.result(0).registers[0] == simulator["inverters"][1].rated_power
+               for future in futures)
+
+
+def test_close_fails_requests_that_were_never_sent(simulator):
+    client = DeviceClient(HOST, port=simulator["port"])
+    future = client.submit("read_holding_registers", address=RATED, count=1, slave=1)
+    client.close()
+    with pytest.raises(ConnectionError):
+        future.result(0)
+
+
+def test_missing_transaction_id_fails_loudly(simulator):
+    class Client(DeviceClient):
+        def new_connection(self):
+            return WithoutTid(super().new_connection())
+
+    client = Client(HOST, port=simulator["port"], timeout=TIMEOUT)
+    client.connect()
+    try:
+        with pytest.raises(TransactionMismatch):
+            read_rated(client)
+    finally:
+        client.close()
+
+
+def test_concurrent_callers_share_one_connection(simulator, client):
+    from concurrent.futures import ThreadPoolExecutor
+    rated = simulator["inverters"][1].rated_power
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: read_rated(client), range(40)))
+    assert results == [rated] * 40
+    assert client.unit_status()[1]["requests"] == 40
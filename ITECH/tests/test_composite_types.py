@@ -0,0 +1,72 @@
+from datetime import datetime, time
+
+import pytest
+
+from composite_types import (Bitfield, DayPercent, decode_datetime, decode_hhmm, encode_datetime,
+                             encode_hhmm, is_composite, parse)
+from py_rw_registers import readwrite_registers
+from register_decoder import compile_blocks, decode_block, decode_words, encode_words
+
+CLOCK = {"address": 100, "scale": 1, "size": 4, "datatype": "DateTime"}
+START = readwrite_registers["First_charge_start_time"]
+POWER = readwrite_registers["First_charge_power_time"]
+ENABLE = readwrite_registers["Charge_time_enable_control"]
+
+
+def test_clock_round_trip():
+    moment = datetime(2026, 3, 14, 15, 9, 26)
+    words = encode_words(moment, CLOCK)
+    assert words == [2026, 0x030E, 0x0F09, 0x1A00]
+    assert decode_words(words, CLOCK) == moment
+    assert decode_datetime(encode_datetime(moment)) == moment
+    assert decode_words([0, 0, 0, 0], CLOCK) is None
+
+
+def test_hhmm():
+    assert encode_words("07:30", START) == [0x071E]
+    assert encode_hhmm((23, 59)) == encode_hhmm(time(23, 59)) == 0x173B
+    assert decode_words([0x071E], START) == time(7, 30)
+    assert decode_hhmm(0x1800) is None
+
+
+def test_day_percent():
+    assert encode_words(DayPercent(0b1111111, 50), POWER) == [0x7F32]
+    value = decode_words([0x7F32], POWER)
+    assert value == (127, 50) and str(value) == "days 0b1111111, 50 %"
+    with pytest.raises(ValueError):
+        encode_words((256, 0), POWER)
+
+
+def test_bitfield():
+    value = decode_words([0b101], ENABLE)
+    assert isinstance(value, Bitfield) and value == 5 and value.bits == (0, 2)
+    assert encode_words([0, 2], ENABLE) == [5]
+    assert encode_words(5, ENABLE) == [5]
+
+
+def test_parse_user_input():
+    assert parse(" 2026-01-02T03:04:05 ", CLOCK) == datetime(2026, 1, 2, 3, 4, 5)
+    assert parse("07:30", START) == "07:30"
+    assert parse("0x7F, 50", POWER) == DayPercent(127, 50)
+    assert parse("0,2", ENABLE) == [0, 2]
+    assert parse("0b101", ENABLE) == 5
+
+
+def test_composites_in_blocks_are_not_scaled():
+    registers = {"start": START, "power": POWER, "enable": ENABLE}
+    assert all(is_composite(reg_info) for reg_info in registers.values())
+    values = {}
+    for block in compile_blocks(registers):
+        offset = block["address"]
+        words = [0] * block["count"]
+        for key, reg_info in registers.items():
+            if key in block["keys"]:
+                words[reg_info["address"] - offset] = {"start": 0x0800, "power": 0x0164,
+                                                        "enable": 3}[key]
+        values.update(decode_block(block, words))
+    assert values == {"start": time(8, 0), "power": DayPercent(1, 100), "enable": 3}
+
+
+def test_size_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        decode_words([0], dict(CLOCK, size=1))
@@ -0,0 +1,85 @@
+import os
+import stat
+import time
+
+import pytest
+
+from daemon import Daemon, load_config, send_command
+from py_rw_registers import readwrite_registers
+from recorder import RingRecorder
+from simulator import HOST
+
+
+@pytest.fixture
+def daemon(simulator, tmp_path):
+    config = load_config()
+    config.read_dict({
+        "device": {"target": HOST, "port": str(simulator["port"]), "units": "1,2",
+                   "unit_timeout": "0.3"},
+        "scan": {"timebase": "no", "status_interval": "0"},
+        "recorder": {"path": str(tmp_path / "unit{unit}.ring"), "columns": "BatPower [W]"},
+        "control": {"socket": str(tmp_path / "ctl.sock")},
+    })
+    instance = Daemon(config)
+    instance.start()
+    yield instance
+    instance.stop()
+
+
+def test_load_config_overlays_the_defaults(tmp_path):
+    path = tmp_path / "saj_daemon.ini"
+    path.write_text("[device]\nunits = 1-3 ; gateway\n[energy]\nenabled = no\n")
+    config = load_config(str(path))
+    assert config["device"]["units"] == "1-3"
+    assert config["device"]["port"] == "502"
+    assert not config["energy"].getboolean("enabled")
+
+
+def test_control_socket_is_private(daemon):
+    path = daemon.config["control"]["socket"]
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_commands_over_the_socket(simulator, daemon):
+    path = daemon.config["control"]["socket"]
+    assert "Commands" in send_command(path, "help")
+    assert send_command(path, "r: AppMode") == (
+        f"📖 AppMode = {simulator['inverters'][1].raw('AppMode')}")
+    assert send_command(path, "w: Buzzer_on-off = 1").startswith("✅ Wrote 1.0")
+    assert simulator["inverters"][1].raw("Buzzer_on-off") == 1
+    assert simulator["inverters"][2].raw("Buzzer_on-off") == 0
+    assert send_command(path, "@2 w: Buzzer_on-off = 1").startswith("✅")
+    assert simulator["inverters"][2].raw("Buzzer_on-off") == 1
+    assert "outside" in send_command(path, "w: AppMode = 20")
+    assert "read-only" in send_command(path, "w: BatPower [W] = 1")
+    assert send_command(path, "@7 status").startswith("⚠️ Unknown unit '7'")
+    assert send_command(path, "bogus").startswith("⚠️ Unknown command 'bogus'")
+    status = send_command(path, "status").splitlines()
+    assert len(status) == 3 and "unit 2" in status[2]
+
+
+def test_second_daemon_is_refused_and_stale_socket_replaced(daemon, tmp_path):
+    path = daemon.config["control"]["socket"]
+    with pytest.raises(RuntimeError):
+        daemon._serve_control(path)
+    stale = str(tmp_path / "stale.sock")
+    open(stale, "w").close()
+    server = daemon._serve_control(stale)
+    try:
+        assert "Commands" in send_command(stale, "help")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_recorder_and_shutdown(daemon, tmp_path):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and daemon.units[2]["energy"].samples < 2:
+        time.sleep(0.1)
+    assert send_command(daemon.config["control"]["socket"], "shutdown") == "🚪 Shutting down."
+    assert daemon.stop_event.is_set()
+    daemon.stop()
+    assert not os.path.exists(daemon.config["control"]["socket"])
+    recorded = RingRecorder(str(tmp_path / "unit2.ring"))
+    assert recorded.columns == ["BatPower [W]"] and len(recorded.read()["timestamp"]) >= 2
+    recorded.close()
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from deadband import DeadbandFilter
+
+
+def test_first_value_is_always_published():
+    assert DeadbandFilter().update({"a": 1, "b": "x"}, now=0) == {"a": 1, "b": "x"}
+
+
+def test_absolute_and_relative_deadbands():
+    deadband = DeadbandFilter(absolute={"p": 10}, relative={"v": 0.01}, heartbeat=None)
+    deadband.update({"p": 100, "v": 230.0}, now=0)
+    assert deadband.update({"p": 109, "v": 231.0}, now=1) == {}
+    assert deadband.update({"p": 110, "v": 232.3}, now=2) == {"p": 110, "v": 232.3}
+    # A banda conta a partir do último valor publicado, não do último lido
+    assert deadband.update({"p": 101}, now=3) == {}
+    assert deadband.update({"p": 100}, now=4) == {"p": 100}
+
+
+def test_any_change_without_deadband_and_non_numeric_values():
+    deadband = DeadbandFilter(heartbeat=None)
+    deadband.update({"n": 5, "t": datetime(2026, 1, 1), "h": "0x1"}, now=0)
+    assert deadband.update({"n": 5, "t": datetime(2026, 1, 1), "h": "0x1"}, now=1) == {}
+    assert deadband.update({"n": 6, "h": "0x2"}, now=2) == {"n": 6, "h": "0x2"}
+
+
+def test_heartbeat_republishes_unchanged_values():
+    deadband = DeadbandFilter(heartbeat=300)
+    deadband.update({"a": 1}, now=0)
+    assert deadband.update({"a": 1}, now=299) == {}
+    assert deadband.update({"a": 1}, now=300) == {"a": 1}
+    assert DeadbandFilter(heartbeat=None).update({"a": 1}, now=0) == {"a": 1}
+
+
+def test_wrap_forwards_only_changes_and_errors():
+    deadband = DeadbandFilter(heartbeat=None)
+    received = []
+    listener = deadband.wrap(received.append)
+    listener({"timestamp": 0, "values": {"a": 1}, "errors": {}})
+    listener({"timestamp": 1, "values": {"a": 1}, "errors": {}})
+    listener({"timestamp": 2, "values": {"a": 1}, "errors": {100: "timeout"}})
+    assert [sample["values"] for sample in received] == [{"a": 1}, {}]
+    assert received[1]["errors"] == {100: "timeout"}
+
+
+def test_reset_forces_the_next_publication():
+    deadband = DeadbandFilter(heartbeat=None)
+    deadband.update({"a": 1, "b": 2}, now=0)
+    deadband.reset("a")
+    assert deadband.update({"a": 1, "b": 2}, now=1) == {"a": 1}
+    deadband.reset()
+    assert deadband.update({"a": 1, "b": 2}, now=2) == {"a": 1, "b": 2}
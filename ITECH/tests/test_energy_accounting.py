@@ -0,0 +1,63 @@
+import pytest
+
+from energy_accounting import CHARGE_COUNTER_KEY, DISCHARGE_COUNTER_KEY, POWER_KEY, EnergyAccountant
+
+
+def test_trapezoidal_integration():
+    accountant = EnergyAccountant(max_gap=3600)
+    accountant.add_power(0, 1000)
+    accountant.add_power(1800, 3000)     # (1000 + 3000) / 2 W durante meia hora
+    assert accountant.discharge_wh == pytest.approx(1000)
+    accountant.add_power(3600, 3000)
+    assert accountant.discharge_wh == pytest.approx(2500)
+    assert accountant.charge_wh == 0
+
+
+def test_zero_crossing_is_split_between_charge_and_discharge():
+    accountant = EnergyAccountant()
+    accountant.add_power(0, 3600)
+    accountant.add_power(2, -3600)       # cruza o zero a meio do intervalo
+    assert accountant.discharge_wh == pytest.approx(0.5)
+    assert accountant.charge_wh == pytest.approx(0.5)
+
+
+def test_long_gaps_are_not_integrated():
+    accountant = EnergyAccountant(max_gap=10)
+    accountant.add_power(0, 1000)
+    accountant.add_power(30, 1000)
+    accountant.add_power(31, 1000)
+    snapshot = accountant.snapshot()
+    assert snapshot["gap_seconds"] == 30 and snapshot["samples"] == 3
+    assert snapshot["discharge_wh"] == pytest.approx(1000 / 3600)
+
+
+def test_record_uses_the_block_stamp_and_scale():
+    accountant = EnergyAccountant(scale=-1)
+    for t, midpoint in ((0.0, 0.4), (1.0, 3.6)):
+        accountant.record({"timestamp": t, "monotonic": t, "values": {POWER_KEY: 3600},
+                           "stamps": [{"keys": [POWER_KEY], "monotonic": midpoint}]})
+    assert accountant.charge_wh == pytest.approx(3.2)
+    assert accountant.snapshot()["last_power_w"] == -3600
+
+
+def test_counters_correct_the_integrated_energy():
+    accountant = EnergyAccountant(max_gap=3600)
+    accountant.record({"timestamp": 0, "values": {POWER_KEY: 0, DISCHARGE_COUNTER_KEY: 1.0}})
+    accountant.record({"timestamp": 3600, "values": {POWER_KEY: 0, DISCHARGE_COUNTER_KEY: 1.0}})
+    accountant.add_power(3600, 1000)
+    accountant.add_power(3600 + 36, 1000)    # +10 Wh integrados
+    accountant.record({"timestamp": 3700, "values": {DISCHARGE_COUNTER_KEY: 1.012}})
+    snapshot = accountant.snapshot()
+    assert snapshot["discharge_wh"] == pytest.approx(10)
+    assert snapshot["discharge_corrected_wh"] == pytest.approx(12)
+    assert snapshot["discharge_drift_wh"] == pytest.approx(-2)
+    # Sem contador, o valor corrigido é o integrado
+    assert snapshot["charge_corrected_wh"] == snapshot["charge_wh"]
+    assert snapshot["charge_drift_wh"] is None
+
+
+def test_daily_counter_reset():
+    accountant = EnergyAccountant()
+    for value in (5.0, 6.0, 0.0, 0.5):
+        accountant.record({"timestamp": 0, "values": {CHARGE_COUNTER_KEY: value}})
+    assert accountant.corrected("charge") == pytest.approx(1500)
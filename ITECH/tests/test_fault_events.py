@@ -0,0 +1,50 @@
+from errors import error_codes
+from fault_events import FaultTracker, active_faults, compile_table, format_event, iter_masks
+
+MASTER = "MFaultMSG (Master)"
+
+
+def test_masks_and_tables():
+    assert list(iter_masks(0b10110)) == [0b10, 0b100, 0b10000]
+    assert list(iter_masks(0)) == []
+    table = compile_table({1: "one"}, width=3)
+    assert table == {1: "Unknown error at bit 0", 2: "one", 4: "Unknown error at bit 2"}
+    assert active_faults(0b101, "master_1") == [
+        (0, error_codes["master_1"][0]), (2, error_codes["master_1"][2])]
+
+
+def test_first_reading_raises_every_active_fault():
+    tracker = FaultTracker()
+    events = tracker.update({MASTER: 0b11, "HFaultMSG (Board/Slave)": 0}, timestamp=10)
+    assert [(e["bit"], e["event"], e["group"]) for e in events] == [
+        (0, "raised", "master_1"), (1, "raised", "master_1")]
+    assert events[0]["message"] == error_codes["master_1"][0] and events[0]["timestamp"] == 10
+
+
+def test_only_changed_bits_produce_events():
+    tracker = FaultTracker()
+    tracker.update({MASTER: 0b011})
+    assert tracker.update({MASTER: 0b011}) == []
+    events = tracker.update({MASTER: 0b110})
+    assert [(e["bit"], e["event"]) for e in events] == [(0, "cleared"), (2, "raised")]
+    assert tracker.active() == {MASTER: active_faults(0b110, "master_1")}
+    # Palavras ausentes ou com erro de leitura não alteram o estado
+    assert tracker.update({MASTER: "timeout"}) == []
+    tracker.update({MASTER: 0})
+    assert tracker.active() == {}
+
+
+def test_listeners_history_and_reset():
+    tracker = FaultTracker(history=2)
+    received = []
+    tracker.add_listener(received.append)
+    tracker.record({"timestamp": 1, "values": {MASTER: 0b111}})
+    assert len(received) == 3 and len(tracker.events) == 2
+    tracker.reset()
+    assert len(tracker.update({MASTER: 0b111})) == 3
+
+
+def test_format_event():
+    event = {"timestamp": 0, "word": MASTER, "bit": 4, "message": "Boom", "event": "cleared"}
+    line = format_event(event)
+    assert line.startswith("✅ [") and line.endswith(f"] {MASTER} bit 4 cleared: Boom")
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from client_pool import DeviceClient, UnitUnavailable
+from gateway import GatewayScanner, parse_units
+from py_rw_registers import readwrite_registers
+from simulator import HOST
+
+from conftest import TIMEOUT
+
+RATED = readwrite_registers["PowerRated [W]"]["address"]
+
+
+def read_rated(client, slave):
+    return client.read_holding_registers(address=RATED, count=1, slave=slave).registers[0]
+
+
+def test_parse_units():
+    assert parse_units("1, 3-5,3") == [1, 3, 4, 5]
+    with pytest.raises(ValueError):
+        parse_units("0-2")
+    with pytest.raises(ValueError):
+        parse_units("a")
+
+
+def test_dead_unit_is_suspended_after_one_timeout_on_a_shared_link(simulator, client):
+    assert read_rated(client, slave=1) == simulator["inverters"][1].rated_power
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        read_rated(client, slave=9)
+    # Sem repetição: o pedido custa um só timeout
+    assert time.monotonic() - started < 2 * TIMEOUT
+    with pytest.raises(UnitUnavailable):
+        read_rated(client, slave=9)
+    assert client.unit_status()[9]["suspended_for"] > 0
+    assert read_rated(client, slave=2) == simulator["inverters"][2].rated_power
+
+
+def test_single_unit_is_suspended_only_after_repeated_timeouts(simulator, client):
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            read_rated(client, slave=9)
+    with pytest.raises(UnitUnavailable):
+        read_rated(client, slave=9)
+
+
+@pytest.mark.simulator(latency=0.01)
+def test_live_units_keep_scanning_beside_a_dead_one(simulator):
+    client = DeviceClient(HOST, port=simulator["port"], timeout=TIMEOUT, request_timeout=5)
+    assert client.connect()
+    scanner = GatewayScanner(client, [1, 2, 3], rates={"fast": 0.2, "medium": 0.2, "slow": 0.2},
+                             unit_timeout=TIMEOUT)
+    complete = {1: 0, 2: 0}
+    lock = threading.Lock()
+
+    def count(unit, sample):
+        if unit in complete and not sample["errors"]:
+            with lock:
+                complete[unit] += 1
+    scanner.add_listener(count)
+    scanner.start()
+    try:
+        time.sleep(2)
+    finally:
+        scanner.stop()
+        client.close()
+    assert min(complete.values()) >= 3
+    status = scanner.status()
+    assert status[3]["errors"] >= 1 and status[3]["registers"] == 0
+    assert status[1]["errors"] == 0 and status[1]["registers"] > 0
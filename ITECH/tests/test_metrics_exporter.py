@@ -0,0 +1,68 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics_exporter import OPENMETRICS, MetricsRegistry, escape, serve, split_key
+
+from conftest import free_port
+
+
+def sample(timestamp=100.0, values=None, errors=None, duration=0.02):
+    return {"timestamp": timestamp, "values": values or {}, "errors": errors or {},
+            "duration": duration}
+
+
+def test_split_key_and_escape():
+    assert split_key("BatPower [W]") == ("BatPower", "W")
+    assert split_key("AppMode") == ("AppMode", "")
+    assert escape('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_render_values_histogram_and_counters():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    registry.record("inv1", sample(values={"BatPower [W]": -1000, "Clock": "12:00", "On": True}))
+    registry.record("inv1", sample(timestamp=101.5, errors={100: "timeout"}, duration=0.5))
+    registry.record_fault_event("inv1", {"word": "MFaultMSG (Master)", "event": "raised"})
+    lines = registry.render().splitlines()
+    assert 'saj_register_value{device="inv1",register="BatPower",unit="W"} -1000' in lines
+    assert not any('register="Clock"' in line or 'register="On"' in line for line in lines)
+    assert 'saj_register_timestamp_seconds{device="inv1",register="BatPower",unit="W"} 100.000' in lines
+    assert 'saj_poll_duration_seconds_bucket{device="inv1",le="0.01"} 0' in lines
+    assert 'saj_poll_duration_seconds_bucket{device="inv1",le="0.1"} 1' in lines
+    assert 'saj_poll_duration_seconds_bucket{device="inv1",le="+Inf"} 2' in lines
+    assert 'saj_polls_total{device="inv1"} 2' in lines
+    assert 'saj_poll_failures_total{device="inv1"} 1' in lines
+    assert 'saj_block_errors_total{device="inv1"} 1' in lines
+    assert ('saj_fault_events_total{device="inv1",word="MFaultMSG (Master)",event="raised"} 1'
+            in lines)
+    assert 'saj_last_poll_timestamp_seconds{device="inv1"} 101.500' in lines
+    assert "# TYPE saj_polls_total counter" in lines
+
+
+def test_openmetrics_family_names_and_eof():
+    registry = MetricsRegistry()
+    registry.record("inv1", sample())
+    lines = registry.render(openmetrics=True).splitlines()
+    assert "# TYPE saj_polls counter" in lines and 'saj_polls_total{device="inv1"} 1' in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_http_endpoint():
+    registry = MetricsRegistry()
+    registry.record("inv1", sample(values={"BatPower [W]": 5}))
+    port = free_port()
+    server = serve(registry, "127.0.0.1", port)
+    try:
+        url = f"http://127.0.0.1:{port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b'saj_register_value{device="inv1",register="BatPower",unit="W"} 5' in response.read()
+        request = urllib.request.Request(url, headers={"Accept": "application/openmetrics-text"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.headers["Content-Type"] == OPENMETRICS
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
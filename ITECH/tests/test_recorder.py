@@ -0,0 +1,74 @@
+import math
+import os
+
+import pytest
+
+from recorder import RingRecorder, open_recorder
+
+
+def sample(timestamp, **values):
+    return {"timestamp": timestamp, "values": values}
+
+
+def test_records_columns_with_nan_for_missing_values(tmp_path):
+    recorder = RingRecorder(str(tmp_path / "r.ring"), ["a", "b"], capacity=10, batch_size=2)
+    recorder.record(sample(1.0, a=1, b=2.5, other=9))
+    recorder.record(sample(2.0, a=3, b="0x1"))
+    data = recorder.read()
+    recorder.close()
+    assert data["timestamp"] == [1.0, 2.0]
+    assert data["a"] == [1.0, 3.0]
+    assert data["b"][0] == 2.5 and math.isnan(data["b"][1])
+
+
+def test_ring_keeps_the_newest_rows(tmp_path):
+    recorder = RingRecorder(str(tmp_path / "r.ring"), ["a"], capacity=4, batch_size=3)
+    for i in range(10):
+        recorder.record(sample(float(i), a=i))
+    assert recorder.read()["a"] == [6.0, 7.0, 8.0, 9.0]
+    assert recorder.read(last=2)["timestamp"] == [8.0, 9.0]
+    recorder.close()
+
+
+def test_reopening_with_the_same_columns_continues(tmp_path):
+    path = str(tmp_path / "r.ring")
+    recorder = RingRecorder(path, ["a", "b"], capacity=10)
+    recorder.record(sample(1.0, a=1, b=2))
+    recorder.close()
+
+    recorder = RingRecorder(path, ["a", "b"], capacity=10)
+    recorder.record(sample(2.0, a=3, b=4))
+    assert recorder.rotated is None
+    assert recorder.read()["a"] == [1.0, 3.0]
+    recorder.close()
+    assert RingRecorder(path).columns == ["a", "b"]
+
+
+def test_reopening_with_other_columns_rotates_the_file(tmp_path):
+    path = str(tmp_path / "r.ring")
+    recorder = RingRecorder(path, ["a", "b"], capacity=10)
+    recorder.record(sample(1.0, a=1, b=2))
+    recorder.close()
+
+    recorder = RingRecorder(path, ["a", "c"], capacity=10)
+    recorder.record(sample(2.0, a=3, c=5))
+    assert recorder.columns == ["a", "c"]
+    assert recorder.read() == {"timestamp": [2.0], "a": [3.0], "c": [5.0]}
+    recorder.close()
+
+    old = RingRecorder(recorder.rotated)
+    assert os.path.dirname(recorder.rotated) == str(tmp_path)
+    assert old.columns == ["a", "b"] and old.read()["b"] == [2.0]
+    old.close()
+
+
+def test_missing_file_needs_columns(tmp_path):
+    with pytest.raises(ValueError):
+        RingRecorder(str(tmp_path / "none.ring"))
+
+
+def test_not_a_recorder_file(tmp_path):
+    path = tmp_path / "x.ring"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        open_recorder(str(path), ["a"])
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_cache import CONFIG_TTL, CachedClient, address_ttl
+from scan_scheduler import RATE_CLASSES, ScanScheduler
+
+MODE = readwrite_registers["AppMode"]["address"]
+
+
+def test_ttl_from_the_rate_class():
+    assert address_ttl(read_registers["BatPower [W]"]["address"]) == RATE_CLASSES["fast"] / 2
+    assert address_ttl(read_registers["BatResSoc [%]"]["address"]) == RATE_CLASSES["slow"] / 2
+    assert address_ttl(MODE) == CONFIG_TTL
+
+
+def test_cached_words_expire():
+    cached = CachedClient(None, ttl=lambda address: 1.0)
+    cached.store(10, [1, 2], now=100.0)
+    assert cached.cached(10, 2, now=100.5) == [1, 2]
+    assert cached.cached(10, 3, now=100.5) is None       # a palavra 12 não está em cache
+    assert cached.cached(10, 2, now=101.5) is None
+    assert cached.cached(10, 2, max_age=5, now=101.5) == [1, 2]
+    assert cached.cached(10, 2, slave=2, now=100.5) is None
+
+
+def test_repeated_reads_hit_the_cache(simulator, client):
+    cached = CachedClient(client)
+    first = cached.read_holding_registers(MODE, 1, slave=1)
+    second = cached.read_holding_registers(MODE, 1, slave=1)
+    assert second.registers == first.registers and not second.isError()
+    assert cached.stats()["hits"] == 1 and cached.stats()["misses"] == 1
+    assert client.unit_status()[1]["requests"] == 1
+    cached.read_fresh(MODE, 1, slave=1)
+    assert cached.misses == 2
+
+
+def test_writes_invalidate_the_written_words(simulator, client):
+    cached = CachedClient(client)
+    cached.read_holding_registers(MODE, 2, slave=1)
+    assert not cached.write_register(MODE, 3, slave=1).isError()
+    assert cached.cached(MODE, 1, slave=1) is None
+    assert cached.cached(MODE + 1, 1, slave=1) is not None
+    assert cached.read_holding_registers(MODE, 1, slave=1).registers == [3]
+    cached.write_registers(MODE, [1, 0], slave=1)
+    assert cached.cached(MODE, 2, slave=1) is None
+    cached.invalidate()
+    assert cached.stats()["words"] == 0
+
+
+@pytest.mark.simulator(latency=0.2)
+def test_concurrent_reads_share_one_request(simulator, client):
+    cached = CachedClient(client)
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: cached.read_fresh(MODE, 1, slave=1), range(5)))
+    assert len({tuple(result.registers) for result in results}) == 1
+    assert cached.misses == 1 and cached.coalesced == 4
+    assert client.unit_status()[1]["requests"] == 1
+
+
+def test_scan_reads_bypass_the_cache(simulator, client):
+    cached = CachedClient(client)
+    scheduler = ScanScheduler(cached, rates={"fast": 0.0, "medium": 0.0, "slow": 0.0}, slave=1)
+    for i in range(3):
+        sample = scheduler.tick(now=float(i))
+        assert sample["errors"] == {}
+    assert cached.hits == 0
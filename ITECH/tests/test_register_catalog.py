@@ -0,0 +1,54 @@
+import pytest
+
+import register_catalog
+from register_catalog_build import (compile_catalog, current_hash, drift_report, read_sheet,
+                                    register_drift, render, source_hash)
+
+
+@pytest.fixture(scope="module")
+def entries():
+    entries, _, errors = compile_catalog(read_sheet())
+    assert errors == []
+    return entries
+
+
+def test_catalog_is_up_to_date(entries):
+    # Falha se a folha mudou e register_catalog.py não foi regenerado
+    assert current_hash() == source_hash()
+    assert list(register_catalog.REGISTERS) == entries
+
+
+def test_register_dicts_match_the_spec(entries):
+    assert register_drift(entries) == []
+
+
+def test_drift_report_names_the_field():
+    entry = (100, 1, "A", "A", "", "Int16", 0.1, "R", "")
+    assert drift_report([entry], {"a": {"address": 100, "scale": 0.1, "size": 1}}) == [
+        "a (Addr 100): datatype 'UInt16', spec says 'Int16' (A)"]
+    assert drift_report([entry], {"b": {"address": 200, "scale": 1, "size": 1}}) == []
+
+
+def test_bad_rows_are_errors_or_warnings():
+    def row(address, name, datatype, size):
+        return {" Address Dez": str(address), "Register Name": name, "Data Type": datatype,
+                "Size": str(size)}
+    rows = [row(100, "A", "UInt32", 2), row(101, "A", "UInt16", 1), row(102, "B", "Float", 2)]
+    entries, warnings, errors = compile_catalog(rows)
+    assert len(entries) == 2 and len(warnings) == 1
+    assert errors == ["A: duplicate register name", "A at 101 overlaps A at 100"]
+
+
+def test_find_and_as_register_dict(tmp_path, entries):
+    first = register_catalog.REGISTERS[0]
+    assert register_catalog.find(first[0]) == first
+    assert register_catalog.find(first[0] - 1) is None
+    wide = next(entry for entry in register_catalog.REGISTERS if entry[1] == 2)
+    assert register_catalog.find(wide[0] + 1) == wide
+    registers = register_catalog.as_register_dict()
+    assert registers[first[2]] == {"address": first[0], "scale": first[6], "size": first[1],
+                                   "datatype": first[5]}
+
+    namespace = {}
+    exec(render(entries[:3], "abc"), namespace)
+    assert namespace["REGISTERS"] == tuple(entries[:3]) and namespace["SOURCE_SHA256"] == "abc"
@@ -0,0 +1,72 @@
+import pytest
+
+import register_decoder
+import register_tester_w_listener
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_decoder import compile_blocks, decode_block, decode_words, encode_words, read_values
+
+REGISTERS = {
+    "a": {"address": 100, "scale": 1, "size": 1, "datatype": "UInt16"},
+    "b": {"address": 101, "scale": 0.1, "size": 1, "datatype": "Int16"},
+    "c": {"address": 105, "scale": 1, "size": 2, "datatype": "UInt32"},
+    "d": {"address": 107, "scale": 0.01, "size": 2, "datatype": "Int32"},
+    "far": {"address": 200, "scale": 1, "size": 1, "datatype": "HEX"},
+}
+
+
+@pytest.mark.parametrize("key, value, words", [
+    ("a", 7, [7]),
+    ("b", -12.5, [0xFF83]),
+    ("c", 70000, [1, 4464]),
+    ("d", -1.5, [0xFFFF, 0xFF6A]),
+    ("far", 0xBEEF, [0xBEEF]),
+])
+def test_encode_decode_words(key, value, words):
+    assert encode_words(value, REGISTERS[key]) == words
+    assert decode_words(words, REGISTERS[key]) == pytest.approx(value)
+
+
+def test_missing_datatype_is_uint16():
+    reg_info = {"address": 1, "scale": 0.001, "size": 1}
+    assert decode_words([0xFF83], reg_info) == pytest.approx(65411 * 0.001)
+
+
+def test_decode_block_matches_decode_words():
+    block = compile_blocks(REGISTERS)[0]
+    words = list(range(1, block["count"] + 1))
+    values = decode_block(block, words)
+    for key, value in values.items():
+        offset = REGISTERS[key]["address"] - block["address"]
+        assert value == pytest.approx(
+            decode_words(words[offset:offset + REGISTERS[key]["size"]], REGISTERS[key]))
+
+
+def test_block_plans_are_compiled_on_first_access():
+    register_decoder.__dict__.pop("READ_BLOCKS", None)
+    blocks = register_decoder.READ_BLOCKS
+    assert register_decoder.__dict__["READ_BLOCKS"] is blocks
+    assert {key for block in blocks for key in block["keys"]} == set(read_registers)
+
+
+def test_read_values_against_the_simulator(simulator, client):
+    inverter = simulator["inverters"][1]
+    inverter.write(readwrite_registers["Passive_charg_enable"]["address"], [2])
+    inverter.write(readwrite_registers["BatChargePower [%]"]["address"], [200])
+    times = []
+    blocks = compile_blocks(read_registers)
+    values, errors = read_values(client, blocks, slave=1, times=times)
+    assert errors == {} and set(values) == set(read_registers)
+    assert values["BatPower [W]"] == -1000    # Int16: carga é negativa
+    assert len(times) == len(blocks) and all(t0 <= t1 for _, t0, t1 in times)
+
+    values, errors = read_values(client, blocks[:1], slave=9)
+    assert values == {} and list(errors) == [blocks[0]["address"]]
+
+
+def test_tester_decodes_readwrite_registers(simulator, client, capsys):
+    inverter = simulator["inverters"][1]
+    key = "BatChargePower [%]"
+    inverter.write(readwrite_registers[key]["address"], [250])
+    register_tester_w_listener.read_value(client, key, readwrite_registers[key])
+    assert capsys.readouterr().out.strip().endswith(": 0.25")
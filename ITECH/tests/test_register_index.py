@@ -0,0 +1,62 @@
+from register_index import RegisterIndex, get_index, name_tokens
+
+READ = {
+    "BatPower [W]": {"address": 100, "size": 1, "scale": 1},
+    "BatVolt [V]": {"address": 101, "size": 1, "scale": 0.1},
+    "PV1Power [W]": {"address": 110, "size": 2, "scale": 1},
+}
+WRITE = {
+    "AppMode": {"address": 200, "size": 1, "scale": 1},
+    "Clash": {"address": 111, "size": 1, "scale": 1},
+}
+
+
+def make_index():
+    return RegisterIndex((("r", READ), ("w", WRITE)))
+
+
+def test_name_tokens():
+    assert name_tokens("PV1Power [W]") == {"pv1power", "pv", "1", "power"}
+    assert name_tokens("BatChargePower [%]") >= {"batchargepower", "bat", "charge", "power"}
+
+
+def test_numbering_and_address_lookups():
+    index = make_index()
+    assert [entry["key"] for entry in index.entries] == [*READ, *WRITE]
+    assert index.entries[3]["kind"] == "w"
+    assert [entry["key"] for entry in index.at(111)] == ["PV1Power [W]", "Clash"]
+    assert [entry["key"] for entry in index.in_range(100, 11)] == [
+        "BatPower [W]", "BatVolt [V]", "PV1Power [W]"]
+    assert index.at(150) == []
+    assert index.name_at(110) == "PV1Power [W]" and index.name_at(111) == "Clash"
+    assert index.name_at(112) is None
+
+
+def test_collisions():
+    assert make_index().collisions == [(111, "PV1Power [W]", "Clash")]
+
+
+def test_prefix_and_fuzzy_search():
+    index = make_index()
+    assert [entry["key"] for entry in index.prefix("bat")] == ["BatPower [W]", "BatVolt [V]"]
+    assert [entry["key"] for entry in index.prefix("POW")] == ["BatPower [W]", "PV1Power [W]"]
+    assert index.prefix("xyz") == []
+    assert [entry["key"] for entry in index.fuzzy("volts")] == ["BatVolt [V]"]
+    assert [entry["key"] for entry in index.search("apmode")] == ["AppMode"]
+
+
+def test_resolve():
+    index = make_index()
+    assert index.resolve("1") == (index.entries[1], [])
+    assert index.resolve("99") == (None, [])
+    assert index.resolve("batpower [w]")[0]["key"] == "BatPower [W]"
+    assert index.resolve("volt")[0]["key"] == "BatVolt [V]"
+    entry, candidates = index.resolve("bat")
+    assert entry is None and len(candidates) == 2
+
+
+def test_shared_index_covers_both_register_dicts():
+    index = get_index()
+    assert get_index() is index
+    assert index.resolve("BatPower [W]")[0]["kind"] == "r"
+    assert index.resolve("AppMode")[0]["kind"] == "w"
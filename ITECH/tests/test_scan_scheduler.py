@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from py_r_register import read_registers
+from scan_scheduler import RATE_CLASSES, ScanScheduler, classify_registers, rate_class
+
+
+def test_rate_classes_from_names():
+    assert rate_class("BatPower [W]") == "fast"
+    assert rate_class("BatTempC [℃]") == "medium"
+    assert rate_class("Today_PVEnergy [kWh]") == "slow"
+    assert rate_class("BatPower [W]", {"rate": "slow"}) == "slow"
+    classes = classify_registers(read_registers)
+    assert set(classes) <= set(RATE_CLASSES)
+    assert sum(len(keys) for keys in classes.values()) == len(read_registers)
+
+
+def test_unknown_rate_class_is_rejected(client):
+    with pytest.raises(ValueError):
+        ScanScheduler(client, {"x": {"address": 1, "scale": 1, "size": 1, "rate": "hourly"}})
+
+
+def test_due_classes_share_one_read_and_keep_their_cadence(simulator, client):
+    scheduler = ScanScheduler(client, slave=1)
+    sample = scheduler.tick(now=0.0)
+    assert sorted(sample["classes"]) == sorted(RATE_CLASSES)
+    assert sample["errors"] == {} and set(sample["values"]) == set(read_registers)
+
+    assert scheduler.tick(now=0.5) is None
+    sample = scheduler.tick(now=1.0)
+    assert sample["classes"] == ["fast"]
+    assert set(sample["values"]) == set(scheduler.classes["fast"])
+    assert scheduler.next_due == {"fast": 2.0, "medium": 10.0, "slow": 60.0}
+
+    # Um ciclo perdido recomeça a partir de agora, sem rajada de leituras em atraso
+    scheduler.tick(now=7.3)
+    assert scheduler.next_due["fast"] == pytest.approx(8.3)
+    assert scheduler.seconds_until_due(now=8.0) == pytest.approx(0.3)
+
+
+def test_latest_values_and_listeners(simulator, client):
+    scheduler = ScanScheduler(client, slave=1)
+    samples = []
+    scheduler.add_listener(samples.append)
+    scheduler.tick(now=0.0)
+    timestamp, value = scheduler.get("BatPower [W]")
+    assert value == samples[0]["values"]["BatPower [W]"]
+    assert scheduler.get("unknown") is None
+    scheduler.remove_listener(samples.append)
+    scheduler.tick(now=1.0)
+    assert len(samples) == 1
+
+
+def test_background_thread(simulator, client):
+    scheduler = ScanScheduler(client, rates={"fast": 0.05, "medium": 0.05, "slow": 0.05}, slave=1)
+    ticked = threading.Event()
+    scheduler.add_listener(lambda sample: ticked.set())
+    stop_event = scheduler.start()
+    try:
+        assert ticked.wait(5)
+    finally:
+        stop_event.set()
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import sequence_runner
+from py_rw_registers import readwrite_registers
+from register_cache import CachedClient
+from sequence_runner import CHARGE_PROFILE, run_fleet, start_in_background
+
+PROFILE = dict(CHARGE_PROFILE, steps_w=[500, 1000], step_duration=0.3, sample_offsets=[0.1],
+               keys=["BatPower [W]", "BatEnergyPercent [%]"])
+
+
+def modes(inverter):
+    return {key: inverter.raw(key) for key in ("AppMode", "Passive_charg_enable",
+                                               "BatChargePower [%]")}
+
+
+def set_mode(inverter, key, value):
+    inverter.write(readwrite_registers[key]["address"], [value])
+
+
+def test_fleet_runs_in_parallel_and_restores_the_modes(simulator, client):
+    inverters = simulator["inverters"]
+    set_mode(inverters[1], "AppMode", 1)
+    before = {unit: modes(inverters[unit]) for unit in (1, 2)}
+    started = time.monotonic()
+    results = asyncio.run(run_fleet([(client, 1), (client, 2)], PROFILE))
+    # Os dois inversores correm em paralelo: o tempo é o de um só perfil
+    assert time.monotonic() - started < 2 * len(PROFILE["steps_w"]) * PROFILE["step_duration"]
+    for unit, samples in zip((1, 2), results.values()):
+        assert [sample["step_w"] for sample in samples] == PROFILE["steps_w"]
+        assert samples[-1]["values"]["BatPower [W]"] == -1000    # carga a 1000 W
+        assert modes(inverters[unit]) == dict(before[unit], **{"BatChargePower [%]": 0})
+
+
+def test_cancel_restores_the_inverter(simulator, client):
+    inverter = simulator["inverters"][1]
+    set_mode(inverter, "AppMode", 1)
+    samples = []
+    thread, cancel = start_in_background([(CachedClient(client), 1)],
+                                         dict(PROFILE, steps_w=[500] * 20),
+                                         on_sample=samples.append)
+    deadline = time.monotonic() + 5
+    while not samples and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert modes(inverter)["Passive_charg_enable"] == sequence_runner.PASSIVE_MODES["charge"]
+    cancel()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert modes(inverter) == {"AppMode": 1, "Passive_charg_enable": 0, "BatChargePower [%]": 0}
+
+
+def test_failed_unit_does_not_stop_the_others(simulator, client):
+    results = asyncio.run(run_fleet([(client, 1), (client, 9)], dict(PROFILE, steps_w=[500])))
+    ok, failed = results.values()
+    assert len(ok) == 1 and isinstance(failed, IOError)
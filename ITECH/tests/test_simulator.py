@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from pymodbus.client import ModbusTcpClient
+
+from py_r_register import read_registers
+from py_rw_registers import readwrite_registers
+from register_decoder import decode_words
+from simulator import HOST, SimulatedInverter
+
+from conftest import TIMEOUT
+
+RATED = readwrite_registers["PowerRated [W]"]["address"]
+
+
+def value(inverter, key):
+    reg_info = read_registers[key]
+    return decode_words(inverter.read(reg_info["address"], reg_info["size"]), reg_info)
+
+
+def write(inverter, key, raw):
+    inverter.write(readwrite_registers[key]["address"], [raw])
+
+
+@pytest.fixture
+def raw_client(simulator):
+    client = ModbusTcpClient(HOST, port=simulator["port"], timeout=TIMEOUT)
+    assert client.connect()
+    yield client
+    client.close()
+
+
+def test_passive_charge_follows_the_command():
+    inverter = SimulatedInverter(seed=1)
+    write(inverter, "Passive_charg_enable", 2)
+    write(inverter, "BatChargePower [%]", 200)   # 20 % de 5 kW
+    assert value(inverter, "BatPower [W]") == -1000
+
+    soc = inverter.soc
+    inverter.step(inverter.last_step + 3600)
+    assert inverter.soc == pytest.approx(soc + 10, abs=0.01)   # 1 kWh numa bateria de 10 kWh
+    assert inverter.energy["bat_charge"] == pytest.approx(1000, rel=1e-6)
+
+
+def test_discharge_stops_at_empty_battery():
+    inverter = SimulatedInverter(soc=5.0, seed=1)
+    write(inverter, "Passive_charg_enable", 1)
+    write(inverter, "BatDischargePower [%]", 500)
+    inverter.step(inverter.last_step + 60)
+    assert value(inverter, "BatPower [W]") == 0
+
+
+def test_serves_the_register_image(simulator, raw_client):
+    result = raw_client.read_holding_registers(address=RATED, count=1, slave=2)
+    assert result.registers == [simulator["inverters"][2].rated_power]
+    raw_client.write_register(address=readwrite_registers["AppMode"]["address"], value=3, slave=2)
+    assert simulator["inverters"][2].raw("AppMode") == 3
+    assert simulator["inverters"][1].raw("AppMode") != 3
+
+
+def test_unknown_unit_gets_no_response(simulator, raw_client):
+    result = raw_client.read_holding_registers(address=RATED, count=1, slave=9)
+    assert result.isError() and not hasattr(result, "exception_code")
+
+
+@pytest.mark.simulator(latency=0.05, inverters={1: SimulatedInverter()})
+def test_latency(simulator, raw_client):
+    started = time.perf_counter()
+    assert not raw_client.read_holding_registers(address=RATED, count=1, slave=1).isError()
+    assert time.perf_counter() - started >= 0.05
+
+
+@pytest.mark.simulator(drop_rate=1.0, inverters={1: SimulatedInverter()})
+def test_dropped_frames_get_no_response(simulator, raw_client):
+    result = raw_client.read_holding_registers(address=RATED, count=1, slave=1)
+    assert result.isError() and not hasattr(result, "exception_code")
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import SAJ_inv_tester
+
+ITECH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_creates_nothing_and_skips_heavy_modules():
+    code = ("import sys, SAJ_inv_tester as t; "
+            "print(t.device_transport, t.device_budget, t.fault_tracker, t.power_blocks); "
+            "print(sorted(m for m in ('scan_scheduler', 'energy_accounting', 'write_planner', "
+            "'sequence_runner', 'serial') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ITECH, capture_output=True,
+                         text=True, check=True).stdout.splitlines()
+    assert out == ["None None None None", "[]"]
+
+
+def test_shared_objects_are_built_once(monkeypatch):
+    for name in ("device_transport", "device_budget", "fault_tracker", "power_blocks"):
+        monkeypatch.setattr(SAJ_inv_tester, name, None)
+    transport = SAJ_inv_tester.get_transport()
+    assert SAJ_inv_tester.get_transport() is transport
+    assert SAJ_inv_tester.get_budget() is SAJ_inv_tester.get_budget()
+    assert SAJ_inv_tester.get_fault_tracker() is SAJ_inv_tester.get_fault_tracker()
+    blocks = SAJ_inv_tester.get_power_blocks()
+    assert SAJ_inv_tester.power_blocks is blocks
+    assert {key for block in blocks for key in block["keys"]} == set(SAJ_inv_tester.POWER_REGISTERS)
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from timebase import MIN_SPAN, Timebase, block_stamp
+
+
+def test_offset_only_until_the_points_span_min_span():
+    timebase = Timebase(None, window=4)
+    assert not timebase.synced and timebase.device_time(0) is None
+    timebase.add_point(100.0, 1000.0)
+    timebase.add_point(110.0, 1010.02)
+    assert timebase.slope == 1.0
+    assert timebase.device_time(120.0) == pytest.approx(1020.01)
+
+
+def test_drift_from_a_regression_over_the_window():
+    timebase = Timebase(None, window=4)
+    for i in range(6):
+        t = i * MIN_SPAN
+        timebase.add_point(t, 5000.0 + t * (1 + 50e-6))
+    assert len(timebase.points) == 4
+    assert timebase.drift_ppm() == pytest.approx(50, rel=1e-6)
+    assert timebase.device_time(10 * MIN_SPAN) == pytest.approx(5000 + 10 * MIN_SPAN * (1 + 50e-6))
+
+
+def test_stamp_and_block_stamp():
+    timebase = Timebase(None)
+    timebase.add_point(10.0, 1010.0)
+    stamp = timebase.stamp(20.0, 20.5)
+    assert stamp == {"monotonic": 20.25, "rtt": 0.5, "device_time": 1020.25}
+    sample = {"stamps": [dict(stamp, keys=["a"]), dict(stamp, keys=["b"], rtt=1.0)]}
+    assert block_stamp(sample, "b")["rtt"] == 1.0
+    assert block_stamp(sample, "c") is None and block_stamp({}, "a") is None
+
+
+def test_sync_against_the_simulator_clock(simulator, client):
+    timebase = Timebase(client, slave=1)
+    point = timebase.sync()
+    # O relógio simulado é o do anfitrião: o offset fica dentro da incerteza da sincronização
+    assert point["uncertainty"] < 0.1
+    assert abs(timebase.offset()) < point["uncertainty"] + 0.01
+
+
+def test_sync_errors(simulator, client):
+    with pytest.raises(IOError):
+        Timebase(client, slave=9).read_clock()
+    timebase = Timebase(client, slave=1)
+    timebase.read_clock = lambda: (None, time.monotonic(), time.monotonic())
+    with pytest.raises(ValueError):
+        timebase.sync()
@@ -0,0 +1,71 @@
+import pytest
+
+from client_pool import DeviceClient
+from py_rw_registers import readwrite_registers
+from register_decoder import compile_blocks, read_values
+from simulator import HOST
+from transports import (MAX_SERIAL_GAP, RtuOverTcpTransport, RtuTransport, TcpTransport,
+                        make_transport, plan_kwargs)
+
+from conftest import TIMEOUT
+
+
+def test_make_transport_urls():
+    transport = make_transport("192.168.1.10", port=1502)
+    assert isinstance(transport, TcpTransport) and (transport.host, transport.port) == (
+        "192.168.1.10", 1502)
+    assert repr(make_transport("tcp://10.0.0.1?max_count=50")) == "tcp://10.0.0.1:502"
+    rtu = make_transport("rtu:///dev/ttyUSB0?baudrate=19200&parity=E")
+    assert isinstance(rtu, RtuTransport) and rtu.device == "/dev/ttyUSB0"
+    assert (rtu.baudrate, rtu.parity) == (19200, "E")
+    bridge = make_transport("rtu+tcp://10.0.0.2:8899?baudrate=9600")
+    assert isinstance(bridge, RtuOverTcpTransport) and bridge.port == 8899
+    assert make_transport(bridge) is bridge
+
+
+@pytest.mark.parametrize("url", ["udp://host", "rtu:///dev/ttyS0?speed=9600",
+                                 "tcp://host?baudrate=9600"])
+def test_make_transport_rejects_bad_urls(url):
+    with pytest.raises(ValueError):
+        make_transport(url)
+
+
+def test_frame_sizes_and_serial_timing():
+    assert TcpTransport("h").frame_bytes(10) == (12, 29)
+    rtu = RtuTransport("/dev/null", baudrate=9600, turnaround=0.05)
+    assert rtu.frame_bytes(10) == (8, 25)
+    assert rtu.char_time == pytest.approx(10 / 9600)
+    assert rtu.silent_interval == pytest.approx(3.5 * 10 / 9600)
+    assert RtuTransport("/dev/null", baudrate=38400).silent_interval == 1.75e-3
+    assert rtu.bus_rate == pytest.approx(960)
+    # 13 bytes de trama + 7 caracteres de silêncio + 48 de turnaround
+    assert rtu.overhead_chars() == pytest.approx(13 + 7 + 48)
+    assert rtu.read_cost(10) == pytest.approx(rtu.overhead_chars() + 20)
+    assert rtu.default_gap() == min(MAX_SERIAL_GAP, 34)
+    assert RtuTransport("/dev/null", baudrate=9600, turnaround=0).default_gap() == 10
+
+
+def test_connection_limits_and_pacing():
+    assert TcpTransport("h").max_connections is None and TcpTransport("h").inter_frame == 0
+    bridge = RtuOverTcpTransport("h")
+    assert bridge.max_connections == 1 and not bridge.checks_tid
+    assert bridge.inter_frame == bridge.silent_interval
+    assert DeviceClient("rtu+tcp://h:1", pool_size=4).pool_size == 1
+    assert plan_kwargs(DeviceClient("rtu+tcp://h:1?max_count=60&max_gap=3")) == {
+        "max_count": 60, "max_gap": 3}
+    assert plan_kwargs(object()) == {}
+
+
+@pytest.mark.simulator(framer="rtu")
+def test_rtu_over_tcp_against_the_simulator(simulator):
+    client = DeviceClient(f"rtu+tcp://{HOST}:{simulator['port']}", timeout=TIMEOUT,
+                          request_timeout=5)
+    assert client.connect()
+    try:
+        blocks = compile_blocks(readwrite_registers, **plan_kwargs(client))
+        values, errors = read_values(client, blocks, slave=1)
+        assert errors == {} and set(values) == set(readwrite_registers)
+        values, errors = read_values(client, blocks[:1], slave=2)
+        assert errors == {}
+    finally:
+        client.close()
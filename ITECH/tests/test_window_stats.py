@@ -0,0 +1,81 @@
+import statistics
+import threading
+
+import pytest
+
+from window_stats import RollingEnergy, RollingStats, StatsEngine, default_keys, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5 and percentile(values, 95) == 10
+    assert percentile(values, 0) == 1 and percentile([], 50) is None
+
+
+def test_rolling_stats_over_the_window():
+    stats = RollingStats(window=10)
+    values = [5, 1, 9, 3, 7, 2, 8]
+    for t, x in enumerate(values):
+        stats.add(t, x)
+    summary = stats.summary()
+    assert summary["count"] == 7 and summary["mean"] == pytest.approx(statistics.mean(values))
+    assert summary["std"] == pytest.approx(statistics.pstdev(values))
+    assert (summary["min"], summary["max"], summary["p50"]) == (1, 9, 5)
+
+    stats.add(12, 4)          # as amostras anteriores a t=2 saem da janela
+    summary = stats.summary()
+    assert summary["count"] == 6 and (summary["min"], summary["max"]) == (2, 9)
+    assert summary["mean"] == pytest.approx(statistics.mean([9, 3, 7, 2, 8, 4]))
+    assert RollingStats(10).summary() == {"count": 0}
+
+
+def test_ewma_follows_a_step():
+    stats = RollingStats(window=10)
+    stats.add(0, 0)
+    stats.add(10, 100)
+    assert stats.ewma == pytest.approx(100 * (1 - 1 / 2.718281828), rel=1e-6)
+
+
+def test_rolling_energy_skips_gaps_and_expires():
+    energy = RollingEnergy(window=3600, max_gap=10)
+    energy.add(0, 3600)
+    energy.add(10, 3600)       # 10 Wh
+    energy.add(30, 3600)       # intervalo de 20 s não é integrado
+    assert energy.total == pytest.approx(10)
+    energy.add(3620, 3600)
+    assert energy.total == pytest.approx(0)
+
+
+def test_engine_stats_and_efficiency():
+    engine = StatsEngine(windows={"w": 60})
+    for t in range(5):
+        engine.record({"timestamp": t, "values": {
+            "PV1Power [W]": 1000, "ROnGridOutPowerWatt [W]": 950, "BatVolt [V]": 50,
+            "BatPower [W]": -500 if t < 3 else 400, "Mode": True}})
+    assert engine.efficiency("pv_to_grid", "w") == pytest.approx(0.95)
+    assert engine.efficiency("pv_to_ac", "w") is None
+    # Cada lado integra max(0, sinal * BatPower): 600 W·s de descarga para 1250 W·s de carga
+    assert engine.efficiency("battery_round_trip", "w") == pytest.approx(600 / 1250)
+    snapshot = engine.snapshot()
+    assert set(snapshot["stats"]["w"]) == {"PV1Power [W]", "ROnGridOutPowerWatt [W]", "BatPower [W]"}
+    assert snapshot["stats"]["w"]["PV1Power [W]"]["count"] == 5
+    assert default_keys("BatEnergyPercent [%]") and not default_keys("BatVolt [V]")
+
+
+def test_snapshot_while_recording():
+    engine = StatsEngine(windows={"w": 60})
+    stop = threading.Event()
+
+    def record():
+        t = 0
+        while not stop.is_set():
+            t += 1
+            engine.record({"timestamp": t, "values": {f"P{t % 200} [W]": t}})
+    thread = threading.Thread(target=record)
+    thread.start()
+    try:
+        for _ in range(200):
+            engine.snapshot()
+    finally:
+        stop.set()
+        thread.join()
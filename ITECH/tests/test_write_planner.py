@@ -0,0 +1,81 @@
+from datetime import time as dt_time
+
+import pytest
+
+from write_planner import WriteError, apply_writes, plan_writes, schedule_writes, to_words
+
+
+class FailingWrites:
+    """Client wrapper whose n-th write_registers call (1-based) fails."""
+
+    def __init__(self, client, fail_on):
+        self.client = client
+        self.fail_on = fail_on
+        self.writes = 0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def write_registers(self, address, values, slave=1, **kwargs):
+        self.writes += 1
+        if self.writes == self.fail_on:
+            raise IOError("Simulated write failure")
+        return self.client.write_registers(address=address, values=values, slave=slave, **kwargs)
+
+
+def words_of(inverter, keys):
+    return {key: inverter.raw(key) for key in keys}
+
+
+def test_to_words_splits_and_rejects_conflicts():
+    registers = {"wide": {"address": 10, "scale": 1, "size": 2},
+                 "low": {"address": 11, "scale": 1, "size": 1}}
+    assert to_words({"wide": 0x00010002}, registers) == {10: 1, 11: 2}
+    with pytest.raises(ValueError):
+        to_words({"wide": 0x00010002, "low": 3}, registers)
+
+
+def test_plan_writes_coalesces_adjacent_registers():
+    writes = schedule_writes("charge", dt_time(1, 30), dt_time(5, 0), 0b1111111, 50)
+    frames = plan_writes(writes)
+    assert len(frames) < len(writes)
+    assert sum(len(frame["words"]) for frame in frames) == len(to_words(writes))
+    assert len(plan_writes(writes, max_gap=0, max_count=1)) == len(to_words(writes))
+
+
+def test_apply_writes_programs_the_schedule(simulator, client):
+    writes = schedule_writes("discharge", dt_time(18, 0), dt_time(21, 15), 0b0011111, 80)
+    frames = apply_writes(client, writes, slave=1)
+    assert frames == len(plan_writes(writes))
+    inverter = simulator["inverters"][1]
+    expected = to_words(writes)
+    assert all(inverter.registers[address] == word for address, word in expected.items())
+
+
+def test_failed_write_rolls_back_the_written_frames(simulator, client):
+    inverter = simulator["inverters"][1]
+    writes = {"AppMode": 3, "Passive_charg_enable": 2, "BatChargePower [%]": 100}
+    assert len(plan_writes(writes)) > 1
+    before = words_of(inverter, writes)
+
+    with pytest.raises(WriteError) as error:
+        apply_writes(FailingWrites(client, fail_on=2), writes, slave=1)
+    assert error.value.rolled_back
+    assert words_of(inverter, writes) == before
+
+
+def test_read_back_mismatch_rolls_back(simulator, client):
+    inverter = simulator["inverters"][1]
+    key = "Passive_charg_enable"
+    before = inverter.raw(key)
+
+    class Ignoring(FailingWrites):
+        # O inversor aceita a trama mas guarda outro valor: só a verificação o deteta
+        def write_registers(self, address, values, slave=1, **kwargs):
+            return self.client.write_registers(address=address, values=[before] * len(values),
+                                               slave=slave, **kwargs)
+
+    with pytest.raises(WriteError, match="Read-back mismatch") as error:
+        apply_writes(Ignoring(client, fail_on=None), {key: (before + 1) % 3}, slave=1)
+    assert error.value.rolled_back
+    assert inverter.raw(key) == before
@@ -0,0 +1,146 @@
+# Base de tempo do inversor: sincronização com o relógio 0x4000, offset/deriva e carimbo das leituras
+import threading
+import time
+from register_decoder import decode_words
+
+CLOCK_REGISTER = {'address': 0x4000, 'scale': 1, 'size': 4, 'datatype': 'DateTime'}
+SYNC_INTERVAL = 300.0    # segundos entre sincronizações
+SYNC_POLL = 0.05         # espaçamento das leituras enquanto se espera a mudança de segundo
+SYNC_TIMEOUT = 1.5       # o segundo do relógio tem de mudar dentro deste tempo
+WINDOW = 16              # pontos de sincronização usados na regressão
+MIN_SPAN = 600.0         # só se estima a deriva com pontos espalhados por pelo menos 10 min
+
+
+class Timebase:
+    """
+    Maps host monotonic time to the inverter clock.
+
+    The clock only has 1 s resolution, so sync() reads it repeatedly until
+    the seconds change; the new second started between the last read that
+    saw the old one and the first that saw the new one, and the middle of
+    the two is taken as its instant (error within half the read spacing
+    plus half the round trip, instead of +/-0.5 s).
+    A least-squares line over the last `window` sync points gives the
+    offset and the drift of the device clock against the host's monotonic
+    clock. The device clock is local time of the host's timezone.
+    """
+
+    def __init__(self, client, slave=1, register=CLOCK_REGISTER, window=WINDOW,
+                 interval=SYNC_INTERVAL):
+        self.client = client
+        self.slave = slave
+        self.register = register
+        self.window = window
+        self.interval = interval
+        self.points = []          # (monotónico, época do inversor)
+        self.errors = []          # incerteza de cada ponto [s]
+        self.slope = 1.0
+        self.intercept = None
+        self._lock = threading.Lock()
+
+    def read_clock(self):
+        """One clock read: (device epoch or None, request monotonic, response monotonic)."""
+        t0 = time.monotonic()
+        read = getattr(self.client, "read_fresh", None) or self.client.read_holding_registers
+        result = read(address=self.register["address"], count=self.register["size"],
+                      slave=self.slave)
+        t1 = time.monotonic()
+        if result.isError():
+            raise IOError(f"Error reading inverter clock: {result}")
+        clock = decode_words(result.registers, self.register)
+        return (None if clock is None else time.mktime(clock.timetuple())), t0, t1
+
+    def sync(self):
+        """
+        Add one sync point at a seconds transition of the device clock.
+
+        Returns:
+            Dict {'monotonic', 'device_time', 'rtt', 'uncertainty'}.
+        """
+        first, t0, t1 = self.read_clock()
+        if first is None:
+            raise ValueError("Inverter clock is not set")
+        previous_mid = (t0 + t1) / 2
+        deadline = t1 + SYNC_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(SYNC_POLL)
+            clock, t0, t1 = self.read_clock()
+            mid = (t0 + t1) / 2
+            if clock is not None and clock != first:
+                instant = (previous_mid + mid) / 2
+                uncertainty = (mid - previous_mid) / 2 + (t1 - t0) / 2
+                self.add_point(instant, clock, uncertainty)
+                return {"monotonic": instant, "device_time": clock, "rtt": t1 - t0,
+                        "uncertainty": uncertainty}
+            previous_mid = mid
+        raise TimeoutError("Inverter clock did not advance during sync")
+
+    def add_point(self, monotonic, device_time, uncertainty=0.0):
+        with self._lock:
+            self.points = (self.points + [(monotonic, device_time)])[-self.window:]
+            self.errors = (self.errors + [uncertainty])[-self.window:]
+            self._fit()
+
+    def _fit(self):
+        n = len(self.points)
+        mean_t = sum(t for t, _ in self.points) / n
+        mean_d = sum(d for _, d in self.points) / n
+        var = sum((t - mean_t) ** 2 for t, _ in self.points)
+        # Com pontos demasiado próximos o erro de sincronização domina a deriva: só offset
+        span = self.points[-1][0] - self.points[0][0]
+        if n >= 2 and span >= MIN_SPAN:
+            self.slope = sum((t - mean_t) * (d - mean_d) for t, d in self.points) / var
+        else:
+            self.slope = 1.0
+        self.intercept = mean_d - self.slope * mean_t
+
+    @property
+    def synced(self):
+        return self.intercept is not None
+
+    def device_time(self, monotonic=None):
+        """Estimated inverter clock (epoch seconds) at a host monotonic instant."""
+        monotonic = time.monotonic() if monotonic is None else monotonic
+        with self._lock:
+            if self.intercept is None:
+                return None
+            return self.intercept + self.slope * monotonic
+
+    def offset(self):
+        """Device clock minus host wall clock [s], now."""
+        device = self.device_time()
+        return None if device is None else device - time.time()
+
+    def drift_ppm(self):
+        return (self.slope - 1.0) * 1e6
+
+    def stamp(self, t_request, t_response):
+        """Timestamp of a read: midpoint, round trip and device-time estimate."""
+        mid = (t_request + t_response) / 2
+        return {"monotonic": mid, "rtt": t_response - t_request,
+                "device_time": self.device_time(mid)}
+
+    def run(self, stop_event):
+        """Sync every `interval` seconds until stop_event is set (retries sooner on failure)."""
+        while not stop_event.is_set():
+            try:
+                self.sync()
+                wait = self.interval
+            except Exception as e:
+                print(f"⚠️ Clock sync failed: {e}")
+                wait = min(self.interval, 30.0)
+            stop_event.wait(wait)
+
+    def start(self):
+        """Run the periodic sync in a daemon thread. Returns the stop event."""
+        stop_event = threading.Event()
+        threading.Thread(target=self.run, args=(stop_event,), daemon=True).start()
+        return stop_event
+
+
+def block_stamp(sample, key):
+    """Stamp of the block that contained `key` in a scan sample, or None."""
+    for stamp in sample.get("stamps", ()):
+        if key in stamp["keys"]:
+            return stamp
+    return None
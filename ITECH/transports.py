@@ -0,0 +1,207 @@
+# Transportes Modbus: TCP, RTU em série (RS485) e RTU sobre TCP (conversores série-Ethernet)
+from urllib.parse import parse_qsl, urlsplit
+from block_reader import MAX_BLOCK_WORDS, MAX_GAP_WORDS
+
+# Configuration
+TCP_PORT = 502
+BAUDRATE = 9600           # velocidade por omissão do RS485 dos H2
+TURNAROUND = 0.05         # [s] tempo de resposta típico de um inversor no barramento
+MAX_SERIAL_GAP = 32       # limite das palavras não mapeadas lidas para juntar blocos em série
+
+# Tramas FC3/FC16 sem dados: TCP = MBAP (7) + PDU; RTU = endereço (1) + PDU + CRC (2)
+TCP_REQUEST_BYTES = 12
+TCP_RESPONSE_BYTES = 9    # + 2 por palavra
+RTU_REQUEST_BYTES = 8
+RTU_RESPONSE_BYTES = 5    # + 2 por palavra
+
+
+class TcpTransport:
+    """
+    Modbus TCP straight to the inverter (or to a Modbus TCP gateway).
+
+    Transports describe one physical link: how to open a pymodbus client on
+    it, the size of the frames of a read, the largest block worth reading
+    and the pacing the link needs. DeviceClient, the block planner and
+    the bandwidth budget take these from the transport instead of
+    assuming Modbus TCP.
+    """
+
+    kind = "tcp"
+    framer = "socket"
+    max_connections = None    # sem limite: uma ligação por worker
+    checks_tid = True         # o cabeçalho MBAP tem transaction ID
+    inter_frame = 0.0         # [s] silêncio imposto entre transações
+    bus_rate = None           # [bytes/s] do meio partilhado (None = não limitado pelo meio)
+
+    def __init__(self, host, port=TCP_PORT, max_count=MAX_BLOCK_WORDS, max_gap=MAX_GAP_WORDS):
+        self.host = host
+        self.port = port
+        self.max_count = max_count
+        self.max_gap = max_gap
+
+    def __repr__(self):
+        return f"{self.kind}://{self.host}:{self.port}"
+
+    def connection(self, timeout):
+        """A new (not yet connected) pymodbus sync client for this link."""
+        from pymodbus import FramerType
+        from pymodbus.client import ModbusTcpClient
+        return ModbusTcpClient(self.host, port=self.port, framer=FramerType(self.framer),
+                               timeout=timeout)
+
+    def frame_bytes(self, count):
+        """(request, response) bytes of a read of `count` words."""
+        return TCP_REQUEST_BYTES, TCP_RESPONSE_BYTES + 2 * count
+
+    def read_cost(self, count):
+        """Link occupancy of one read in bytes (what the bandwidth budget charges)."""
+        return sum(self.frame_bytes(count))
+
+    def plan_kwargs(self):
+        """Keyword arguments of plan_blocks/compile_blocks for this link."""
+        return {"max_count": self.max_count, "max_gap": self.max_gap}
+
+
+class RtuTransport(TcpTransport):
+    """
+    Modbus RTU on a serial port (RS485 adapter, or a pty for tests).
+
+    The bus is half duplex and shared, so there is only one connection and
+    everything is paced in character times: each transaction also costs
+    the 3.5 character silence after each frame and the inverter's turnaround.
+    Joining two blocks is worth it whenever the unmapped words between them
+    take less time than that overhead, so the gap tolerated by the planner
+    is derived from the baud rate.
+    """
+
+    kind = "rtu"
+    framer = "rtu"
+    max_connections = 1
+    checks_tid = False        # RTU não tem transaction ID
+
+    def __init__(self, device, baudrate=BAUDRATE, parity="N", bytesize=8, stopbits=1,
+                 turnaround=TURNAROUND, max_count=MAX_BLOCK_WORDS, max_gap=None):
+        self.device = device
+        self.baudrate = baudrate
+        self.parity = parity
+        self.bytesize = bytesize
+        self.stopbits = stopbits
+        self.turnaround = turnaround
+        self.max_count = max_count
+        self.max_gap = self.default_gap() if max_gap is None else max_gap
+
+    def __repr__(self):
+        return f"{self.kind}://{self.device}?baudrate={self.baudrate}"
+
+    @property
+    def char_time(self):
+        """Seconds per character: start bit + data bits + parity + stop bits."""
+        bits = 1 + self.bytesize + (self.parity != "N") + self.stopbits
+        return bits / self.baudrate
+
+    @property
+    def silent_interval(self):
+        # Acima de 19200 baud a norma fixa o silêncio em 1.75 ms
+        return 1.75e-3 if self.baudrate > 19200 else 3.5 * self.char_time
+
+    @property
+    def bus_rate(self):
+        return 1.0 / self.char_time
+
+    def connection(self, timeout):
+        # O cliente série do pymodbus já respeita os 3.5 caracteres entre tramas
+        from pymodbus import FramerType
+        from pymodbus.client import ModbusSerialClient
+        return ModbusSerialClient(self.device, framer=FramerType.RTU, baudrate=self.baudrate,
+                                  parity=self.parity, bytesize=self.bytesize,
+                                  stopbits=self.stopbits, timeout=timeout)
+
+    def frame_bytes(self, count):
+        return RTU_REQUEST_BYTES, RTU_RESPONSE_BYTES + 2 * count
+
+    def overhead_chars(self):
+        """Bus time of one transaction besides its payload, in character times."""
+        request, response = self.frame_bytes(0)
+        silences = 2 * self.silent_interval + self.turnaround
+        return request + response + silences / self.char_time
+
+    def read_cost(self, count):
+        return self.overhead_chars() + 2 * count
+
+    def default_gap(self):
+        return min(MAX_SERIAL_GAP, int(self.overhead_chars() / 2))
+
+
+class RtuOverTcpTransport(RtuTransport):
+    """
+    RTU frames tunnelled through a TCP socket (transparent serial-to-Ethernet
+    converters). The timing is the serial bus behind the converter; the
+    converter does not pace frames itself, so DeviceClient keeps the silent
+    interval between transactions.
+    """
+
+    kind = "rtu+tcp"
+
+    def __init__(self, host, port=TCP_PORT, **serial_kwargs):
+        super().__init__(None, **serial_kwargs)
+        self.host = host
+        self.port = port
+
+    def __repr__(self):
+        return f"{self.kind}://{self.host}:{self.port}?baudrate={self.baudrate}"
+
+    @property
+    def inter_frame(self):
+        return self.silent_interval
+
+    def connection(self, timeout):
+        return TcpTransport.connection(self, timeout)
+
+
+TRANSPORTS = {"tcp": TcpTransport, "rtu": RtuTransport, "rtu+tcp": RtuOverTcpTransport}
+
+# Parâmetros aceites na query string e respetivos tipos
+_OPTIONS = {"baudrate": int, "parity": str, "bytesize": int, "stopbits": int,
+            "turnaround": float, "max_count": int, "max_gap": int}
+
+
+def make_transport(target, port=TCP_PORT):
+    """
+    Build a transport from a URL or a bare host name.
+
+    Examples:
+        '192.168.31.238'                          Modbus TCP on `port`
+        'tcp://192.168.31.238:502'
+        'rtu:///dev/ttyUSB0?baudrate=9600'        serial RTU
+        'rtu+tcp://192.168.31.240:8899?baudrate=9600'   RTU over a TCP socket
+
+    Raises:
+        ValueError: Unknown scheme or option.
+    """
+    if not isinstance(target, str):
+        return target
+    if "://" not in target:
+        return TcpTransport(target, port)
+
+    url = urlsplit(target)
+    if url.scheme not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{url.scheme}' (use {', '.join(TRANSPORTS)})")
+    options = {}
+    for name, value in parse_qsl(url.query):
+        if name not in _OPTIONS:
+            raise ValueError(f"Unknown transport option '{name}'")
+        options[name] = _OPTIONS[name](value)
+
+    if url.scheme == "rtu":
+        return RtuTransport(url.path or url.netloc, **options)
+    if url.scheme == "tcp":
+        serial = set(options) - {"max_count", "max_gap"}
+        if serial:
+            raise ValueError(f"Serial options on a TCP transport: {sorted(serial)}")
+    return TRANSPORTS[url.scheme](url.hostname, url.port or port, **options)
+
+
+def plan_kwargs(client):
+    """Block planner limits of the transport behind a client ({} for a plain pymodbus client)."""
+    transport = getattr(client, "transport", None)
+    return transport.plan_kwargs() if transport is not None else {}
@@ -0,0 +1,211 @@
+# Estatísticas em janelas deslizantes sobre as amostras do scan (média, extremos, desvio, percentis, EWMA)
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+
+WINDOWS = {"1m": 60.0, "15m": 900.0}
+MAX_GAP = 10.0   # segundos sem amostras a partir dos quais um intervalo não entra nos integrais
+PERCENTILES = (5, 50, 95)
+
+# Eficiências como razão de energias na janela: sum(output) / sum(input).
+# Cada termo é (registo, sinal): conta max(0, sinal * valor), ex.: BatPower > 0 é descarga.
+EFFICIENCIES = {
+    "pv_to_ac": {"output": [("TotalInvPowerWatt [W]", 1)],
+                 "input": [("TotalPVPower [W]", 1)]},
+    # Equivalente ao antigo read_eff_pv (fase R)
+    "pv_to_grid": {"output": [("ROnGridOutPowerWatt [W]", 1)],
+                   "input": [("PV1Power [W]", 1)]},
+    "battery_round_trip": {"output": [("BatPower [W]", 1)],
+                           "input": [("BatPower [W]", -1)]},
+}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (None if empty)."""
+    if not sorted_values:
+        return None
+    n = len(sorted_values)
+    return sorted_values[max(0, min(n - 1, math.ceil(p / 100 * n) - 1))]
+
+
+def default_keys(key):
+    """Registers tracked by default: powers and percentages."""
+    return key.endswith("[W]") or key.endswith("[%]")
+
+
+class RollingStats:
+    """
+    Statistics of the samples of the last `window` seconds, updated incrementally.
+
+    Mean and standard deviation come from running sums (shifted by the first
+    value for numerical stability), min/max from monotonic deques and EWMA
+    with a time constant equal to the window, so each add() is amortised
+    O(1). Percentiles use a sorted copy of the window (bisect insert/remove).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.samples = deque()     # (t, x)
+        self.sorted = []
+        self.mins = deque()
+        self.maxs = deque()
+        self.shift = None
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.ewma = None
+        self.last_t = None
+
+    def add(self, t, x):
+        if self.shift is None:
+            self.shift = x
+        d = x - self.shift
+        self.samples.append((t, x))
+        self.sum += d
+        self.sum_sq += d * d
+        insort(self.sorted, x)
+        while self.mins and self.mins[-1][1] >= x:
+            self.mins.pop()
+        self.mins.append((t, x))
+        while self.maxs and self.maxs[-1][1] <= x:
+            self.maxs.pop()
+        self.maxs.append((t, x))
+
+        if self.ewma is None:
+            self.ewma = x
+        elif t > self.last_t:
+            alpha = 1.0 - math.exp(-(t - self.last_t) / self.window)
+            self.ewma += alpha * (x - self.ewma)
+        self.last_t = t
+        self.expire(t)
+
+    def expire(self, now):
+        limit = now - self.window
+        while self.samples and self.samples[0][0] < limit:
+            _, x = self.samples.popleft()
+            d = x - self.shift
+            self.sum -= d
+            self.sum_sq -= d * d
+            del self.sorted[bisect_left(self.sorted, x)]
+        while self.mins and self.mins[0][0] < limit:
+            self.mins.popleft()
+        while self.maxs and self.maxs[0][0] < limit:
+            self.maxs.popleft()
+
+    def percentile(self, p):
+        """Nearest-rank percentile of the window."""
+        return percentile(self.sorted, p)
+
+    def summary(self):
+        n = len(self.samples)
+        if not n:
+            return {"count": 0}
+        mean_d = self.sum / n
+        variance = max(0.0, self.sum_sq / n - mean_d * mean_d)
+        result = {"count": n, "mean": self.shift + mean_d, "min": self.mins[0][1],
+                  "max": self.maxs[0][1], "std": math.sqrt(variance), "ewma": self.ewma}
+        for p in PERCENTILES:
+            result[f"p{p}"] = self.percentile(p)
+        return result
+
+
+class RollingEnergy:
+    """Trapezoidal energy [Wh] of a power series over the last `window` seconds."""
+
+    def __init__(self, window, max_gap=MAX_GAP):
+        self.window = window
+        self.max_gap = max_gap
+        self.segments = deque()    # (t_fim, energia Wh)
+        self.total = 0.0
+        self.last = None
+
+    def add(self, t, power):
+        if self.last is not None:
+            t0, p0 = self.last
+            if 0 < t - t0 <= self.max_gap:
+                energy = (p0 + power) / 2 * (t - t0) / 3600.0
+                self.segments.append((t, energy))
+                self.total += energy
+        self.last = (t, power)
+        limit = t - self.window
+        while self.segments and self.segments[0][0] < limit:
+            self.total -= self.segments.popleft()[1]
+
+
+class StatsEngine:
+    """
+    Rolling statistics and efficiencies over scan samples (use record as a listener).
+
+    Args:
+        keys: Predicate selecting the registers to track (default: [W] and [%]).
+        windows: {name: seconds}.
+        efficiencies: {name: {'output': terms, 'input': terms}}, see EFFICIENCIES.
+    """
+
+    def __init__(self, keys=default_keys, windows=WINDOWS, efficiencies=EFFICIENCIES,
+                 max_gap=MAX_GAP):
+        self.keys = keys
+        self.windows = dict(windows)
+        self.efficiencies = efficiencies
+        self.max_gap = max_gap
+        self.stats = {}        # (chave, janela) -> RollingStats
+        self.energy = {}       # (eficiência, 'output'/'input', janela) -> RollingEnergy
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _power(values, terms):
+        if not all(key in values for key, _ in terms):
+            return None
+        return sum(max(0.0, sign * values[key]) for key, sign in terms)
+
+    def record(self, sample):
+        values = {key: value for key, value in sample["values"].items()
+                  if isinstance(value, (int, float)) and not isinstance(value, bool)}
+        t = sample.get("monotonic", sample["timestamp"])
+        with self._lock:
+            for key, value in values.items():
+                if not self.keys(key):
+                    continue
+                for window, seconds in self.windows.items():
+                    stats = self.stats.get((key, window))
+                    if stats is None:
+                        stats = self.stats[(key, window)] = RollingStats(seconds)
+                    stats.add(t, value)
+
+            for name, definition in self.efficiencies.items():
+                for side in ("output", "input"):
+                    power = self._power(values, definition[side])
+                    if power is None:
+                        continue
+                    for window, seconds in self.windows.items():
+                        energy = self.energy.get((name, side, window))
+                        if energy is None:
+                            energy = self.energy[(name, side, window)] = RollingEnergy(
+                                seconds, self.max_gap)
+                        energy.add(t, power)
+
+    def summary(self, key, window):
+        with self._lock:
+            stats = self.stats.get((key, window))
+            return stats.summary() if stats is not None else {"count": 0}
+
+    def efficiency(self, name, window):
+        """Output/input energy ratio over a window, or None while the input is 0."""
+        with self._lock:
+            output = self.energy.get((name, "output", window))
+            source = self.energy.get((name, "input", window))
+            if output is None or source is None or source.total <= 0:
+                return None
+            return output.total / source.total
+
+    def snapshot(self):
+        """{'stats': {window: {key: summary}}, 'efficiency': {window: {name: ratio}}}."""
+        with self._lock:
+            keys = sorted({key for key, _ in self.stats})
+        return {
+            "stats": {window: {key: self.summary(key, window) for key in keys}
+                      for window in self.windows},
+            "efficiency": {window: {name: self.efficiency(name, window)
+                                    for name in self.efficiencies}
+                           for window in self.windows},
+        }
@@ -0,0 +1,147 @@
+# Escritas agrupadas: registos adjacentes numa só trama write_registers (FC16), com verificação e rollback
+from block_reader import MAX_GAP_WORDS
+from py_rw_registers import readwrite_registers
+from register_decoder import encode_words
+
+MAX_WRITE_WORDS = 123   # limite do protocolo para write_registers (FC16)
+# Máscaras de ativação e os slots de carga/descarga (lidos num só bloco)
+SCHEDULE_REGISTERS = {key: reg for key, reg in readwrite_registers.items()
+                      if key.endswith(("_time", "_time_enable_control"))}
+
+
+class WriteError(IOError):
+    """A planned write failed; `rolled_back` tells whether the old values were restored."""
+
+    def __init__(self, message, rolled_back=False):
+        super().__init__(message)
+        self.rolled_back = rolled_back
+
+
+def to_words(writes, register_dict=readwrite_registers):
+    """
+    Convert {key: value} into {address: word}, splitting multi-word registers.
+
+    Integers are written as raw values; other values (datetime.time,
+    DayPercent, ...) go through the register's composite encoder.
+    """
+    words = {}
+    for key, value in writes.items():
+        reg_info = register_dict[key]
+        size = reg_info["size"]
+        encoded = None if isinstance(value, int) else encode_words(value, reg_info)
+        for i in range(size):
+            address = reg_info["address"] + i
+            word = (encoded[i] if encoded is not None
+                    else (value >> (16 * (size - 1 - i))) & 0xFFFF)
+            if words.get(address, word) != word:
+                raise ValueError(f"Conflicting writes to address {address} ('{key}')")
+            words[address] = word
+    return words
+
+
+def schedule_writes(mode, start, end, days, percent):
+    """
+    Writes that program the first charge or discharge slot and enable it alone.
+
+    Args:
+        mode: 'charge' or 'discharge'.
+        start, end: datetime.time (or anything the HHMM encoder accepts).
+        days: Weekday bitmask.
+        percent: Power as % of the rated power.
+    """
+    from composite_types import DayPercent
+    if mode not in ("charge", "discharge"):
+        raise ValueError(f"Invalid schedule mode '{mode}'")
+    return {
+        f"{mode.capitalize()}_time_enable_control": 0b00000001,
+        f"First_{mode}_start_time": start,
+        f"First_{mode}_end_time": end,
+        f"First_{mode}_power_time": DayPercent(days, percent),
+    }
+
+
+def plan_writes(writes, register_dict=readwrite_registers, max_gap=MAX_GAP_WORDS,
+                max_count=MAX_WRITE_WORDS):
+    """
+    Coalesce writes into FC16 frames.
+
+    Args:
+        writes: {key: value} using the keys of register_dict (see to_words).
+        max_gap: Unwritten words allowed inside a frame; they are filled with
+            their current value, read just before writing.
+
+    Returns:
+        List of frames {'address', 'count', 'words': {address: word}}.
+    """
+    frames = []
+    frame = None
+    for address, word in sorted(to_words(writes, register_dict).items()):
+        if frame is not None:
+            end = frame["address"] + frame["count"]
+            if address - end <= max_gap and address + 1 - frame["address"] <= max_count:
+                frame["count"] = address + 1 - frame["address"]
+                frame["words"][address] = word
+                continue
+        frame = {"address": address, "count": 1, "words": {address: word}}
+        frames.append(frame)
+    return frames
+
+
+def _read(client, address, count, slave):
+    # Sempre do inversor, nunca da cache: estes valores servem para o rollback e a verificação
+    read = getattr(client, "read_fresh", None) or client.read_holding_registers
+    result = read(address=address, count=count, slave=slave)
+    if result.isError():
+        raise IOError(f"Error reading {count} words at {address}: {result}")
+    return list(result.registers[:count])
+
+
+def _write(client, address, values, slave):
+    result = client.write_registers(address=address, values=values, slave=slave)
+    if result.isError():
+        raise IOError(f"Error writing {len(values)} words at {address}: {result}")
+
+
+def apply_writes(client, writes, register_dict=readwrite_registers, slave=1, verify=True):
+    """
+    Program a set of registers atomically, one FC16 frame per adjacent group.
+
+    Each frame's range is read first (previous values, gap filling), written
+    with write_registers and read back once. If a write or the verification
+    fails, every frame already written is restored to its previous values.
+
+    Returns:
+        Number of frames written.
+
+    Raises:
+        WriteError if the writes could not be applied.
+    """
+    frames = plan_writes(writes, register_dict)
+    previous = []
+    try:
+        for frame in frames:
+            before = _read(client, frame["address"], frame["count"], slave)
+            values = [frame["words"].get(frame["address"] + i, old)
+                      for i, old in enumerate(before)]
+            previous.append((frame["address"], before))
+            _write(client, frame["address"], values, slave)
+            if verify:
+                after = _read(client, frame["address"], frame["count"], slave)
+                if after != values:
+                    raise IOError(
+                        f"Read-back mismatch at {frame['address']}: wrote {values}, read {after}")
+    except Exception as e:
+        rolled_back = rollback(client, previous, slave)
+        raise WriteError(f"{e} (rolled back: {rolled_back})", rolled_back) from e
+    return len(frames)
+
+
+def rollback(client, previous, slave=1):
+    """Write back the saved [(address, words)] in reverse order. Returns True if all succeeded."""
+    ok = True
+    for address, words in reversed(previous):
+        try:
+            _write(client, address, words, slave)
+        except Exception:
+            ok = False
+    return ok